@@ -0,0 +1 @@
+"""Бенчмарки производительности (не входят в пакет)."""
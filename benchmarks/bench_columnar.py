@@ -0,0 +1,130 @@
+"""Бенчмарк: загрузка CSV/XLSX в словари и в столбцовую таблицу.
+
+Сравнивает read() (словарь на строку) и read_table() (ColumnarTable) по
+времени загрузки, времени рендеринга всех записей и пиковой памяти.
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_columnar --rows 500000 --extra-columns 20
+"""
+
+import argparse
+import csv
+import gc
+import random
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from pdfgenerator.adapters import get_adapter
+from pdfgenerator.templates import TemplateRenderer
+
+TEMPLATE_PATH = Path("templates/invoice_template.html")
+
+
+def write_wide_csv(path: Path, rows: int, extra_columns: int) -> None:
+    """Записать CSV со счетом в строке и дополнительными столбцами."""
+    rng = random.Random(0)
+    extra = [f"erp_field_{i}" for i in range(extra_columns)]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "invoice_id",
+                "date",
+                "customer_name",
+                "customer_address",
+                "total",
+                "tax",
+                "grand_total",
+                *extra,
+            ]
+        )
+        for index in range(rows):
+            total = round(rng.uniform(100, 10000), 2)
+            writer.writerow(
+                [
+                    f"INV-{index:07d}",
+                    "2024-01-15",
+                    f"Клиент {index}",
+                    f"г. Москва, д. {index % 100}",
+                    total,
+                    round(total * 0.2, 2),
+                    round(total * 1.2, 2),
+                    *(rng.randint(0, 10**6) for _ in extra),
+                ]
+            )
+
+
+def _run(
+    load: Callable[[], Sequence[Mapping[str, Any]]], render_limit: int
+) -> tuple[float, float]:
+    """Загрузить данные и отрендерить записи: (загрузка, рендеринг)."""
+    renderer = TemplateRenderer()
+    template = renderer.load(TEMPLATE_PATH)
+    start = time.perf_counter()
+    records = load()
+    loaded = time.perf_counter()
+    for record in records[:render_limit]:
+        renderer.render(template, record)
+    return loaded - start, time.perf_counter() - loaded
+
+
+def _measure(
+    load: Callable[[], Sequence[Mapping[str, Any]]], render_limit: int
+) -> tuple[float, float, float]:
+    """Замерить время (загрузка, рендеринг) и пиковую память в МБ."""
+    gc.collect()
+    load_time, render_time = _run(load, render_limit)
+    # tracemalloc замедляет выделение памяти, поэтому память меряется
+    # отдельным прогоном
+    gc.collect()
+    tracemalloc.start()
+    _run(load, render_limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return load_time, render_time, peak / (1024 * 1024)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Сравнить загрузку в словари и в столбцовую таблицу."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--extra-columns", type=int, default=20)
+    parser.add_argument(
+        "--render", type=int, default=10_000, help="рендерить N записей"
+    )
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "wide.csv"
+        write_wide_csv(path, args.rows, args.extra_columns)
+        if args.format == "xlsx":
+            import pandas as pd
+
+            xlsx_path = path.with_suffix(".xlsx")
+            pd.read_csv(path).to_excel(xlsx_path, index=False)
+            path = xlsx_path
+
+        adapter = get_adapter(path)
+        modes: list[tuple[str, Callable[[], Sequence[Mapping[str, Any]]]]] = [
+            ("словари (read)", lambda: adapter.read(path)),
+            ("столбцы (read_table)", lambda: adapter.read_table(path)),
+        ]
+        print(
+            f"{args.rows} строк, {args.extra_columns + 7} столбцов, "
+            f"рендеринг {min(args.render, args.rows)} записей"
+        )
+        for label, load in modes:
+            load_time, render_time, peak_mb = _measure(load, args.render)
+            print(
+                f"{label:>22}: загрузка {load_time:.2f} с, "
+                f"рендеринг {render_time:.2f} с, пик памяти {peak_mb:.1f} МБ"
+            )
+
+
+if __name__ == "__main__":
+    main()
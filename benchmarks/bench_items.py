@@ -0,0 +1,136 @@
+"""Бенчмарк: таблица позиций (items_html) для счетов с тысячами строк.
+
+Сравнивает построение items_html прежним способом (склейка строк через
++=), склейкой списка строк для списка словарей и для позиций-столбцов
+(ItemColumns, суммы считаются numpy), а также массовую проверку сумм.
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_items --lines 10000 --invoices 100000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from pdfgenerator.adapters import ItemColumns
+from pdfgenerator.core.validation import validate_totals
+from pdfgenerator.templates import TemplateRenderer
+
+TEMPLATE_PATH = Path("templates/invoice_template.html")
+
+
+def make_items(lines: int, seed: int = 0) -> list[dict[str, Any]]:
+    """Сгенерировать позиции счета (например, детализацию звонков)."""
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"Звонок {index}",
+            "quantity": rng.randint(1, 60),
+            "price": round(rng.uniform(0.5, 15), 2),
+        }
+        for index in range(lines)
+    ]
+
+
+def to_columns(items: list[dict[str, Any]]) -> ItemColumns:
+    """Представить позиции столбцами."""
+    import numpy as np
+
+    return ItemColumns(
+        [item["name"] for item in items],
+        np.array([item["quantity"] for item in items], dtype=float),
+        np.array([item["price"] for item in items], dtype=float),
+    )
+
+
+def concat_items_html(items: list[dict[str, Any]]) -> str:
+    """Прежний способ: склейка строки через += в цикле."""
+    items_html = ""
+    for item in items:
+        name = item.get("name", "")
+        quantity = item.get("quantity", 0)
+        price = item.get("price", 0.0)
+        item_total = quantity * price
+        items_html += (
+            f"<tr><td>{name}</td><td>{quantity}</td>"
+            f"<td>{price:.2f} ₽</td><td>{item_total:.2f} ₽</td></tr>\n"
+        )
+    return items_html
+
+
+def _median_ms(func: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def _invoice(items: Any) -> Mapping[str, Any]:
+    total = sum(item["quantity"] * item["price"] for item in items)
+    return {
+        "invoice_id": "INV-1",
+        "items": items,
+        "total": total,
+        "tax": total * 0.2,
+        "grand_total": total * 1.2,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Замерить построение items_html и проверку сумм."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=10_000)
+    parser.add_argument("--invoices", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    items = make_items(args.lines)
+    columns = to_columns(items)
+    renderer = TemplateRenderer()
+    template = renderer.load(TEMPLATE_PATH)
+
+    print(f"Счет на {args.lines} позиций, медиана {args.repeat} запусков:")
+    modes: list[tuple[str, Callable[[], Any]]] = [
+        (
+            "склейка += (прежний способ)",
+            lambda: renderer.render(
+                template, {"items_html": concat_items_html(items)}
+            ),
+        ),
+        (
+            "список словарей",
+            lambda: renderer.render(template, {"items": items}),
+        ),
+        (
+            "столбцы (ItemColumns)",
+            lambda: renderer.render(template, {"items": columns}),
+        ),
+    ]
+    for label, func in modes:
+        print(f"{label:>30}: {_median_ms(func, args.repeat):8.2f} мс")
+
+    # Счета по 5 позиций; каждая десятая сумма испорчена
+    records = []
+    for index in range(args.invoices):
+        invoice = dict(_invoice(make_items(5, seed=index)))
+        invoice["invoice_id"] = f"INV-{index}"
+        if index % 10 == 0:
+            invoice["grand_total"] += 1
+        records.append(invoice)
+    start = time.perf_counter()
+    errors = validate_totals(records)
+    elapsed = time.perf_counter() - start
+    print(
+        f"Проверка сумм {args.invoices} счетов: {elapsed * 1000:.1f} мс, "
+        f"ошибок {len(errors)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
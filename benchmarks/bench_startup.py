@@ -0,0 +1,141 @@
+"""Бенчмарк времени запуска: какие модули импортирует каждый сценарий.
+
+Каждый сценарий выполняется в отдельном интерпретаторе с -X importtime.
+Бенчмарк выводит медианное время импорта и число модулей и завершается
+с кодом 1, если сценарий импортировал
+запрещенный для него модуль (например, pandas при чтении JSON) или
+превысил бюджет --max-ms. Запуск из корня репозитория:
+
+    python -m benchmarks.bench_startup --max-ms 300
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+# Тяжелые зависимости, которые не должны импортироваться без нужды
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "weasyprint")
+
+_LOAD = (
+    "from pathlib import Path\n"
+    "from pdfgenerator.core import FileManager\n"
+    "FileManager(data_dir={data_dir!r}, templates_dir={data_dir!r}, "
+    "output_dir={data_dir!r}, csv_engine={engine!r})"
+    ".load_data_file(Path({path!r}))\n"
+)
+
+# Сценарий: (код, файл данных или None, способ чтения CSV, запрещенные модули)
+SCENARIOS: dict[str, tuple[str, Optional[str], str, tuple[str, ...]]] = {
+    "cli": ("import pdfgenerator.cli", None, "auto", HEAVY_MODULES),
+    "load.json": (_LOAD, "invoices.json", "auto", HEAVY_MODULES),
+    "load.csv-stdlib": (_LOAD, "invoices.csv", "stdlib", HEAVY_MODULES),
+    "load.csv-pandas": (_LOAD, "invoices.csv", "pandas", ("weasyprint",)),
+}
+
+DATA_DIR = Path("data")
+
+
+def parse_importtime(stderr: str) -> dict[str, float]:
+    """Получить накопленное время импорта (мс) модулей верхнего уровня.
+
+    Модуль верхнего уровня - импортированный самим сценарием, а не другим
+    модулем; его накопленное время включает все вложенные импорты.
+    """
+    result: dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # строка заголовка
+        # Вложенность обозначается отступом имени модуля
+        if name.startswith("  "):
+            continue
+        result[name.strip()] = int(cumulative) / 1000
+    return result
+
+
+def imported_modules(stderr: str) -> set[str]:
+    """Получить имена всех импортированных модулей."""
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in stderr.splitlines()
+        if line.startswith("import time:") and line.count("|") == 2
+    }
+
+
+def run_scenario(code: str) -> tuple[float, set[str]]:
+    """Выполнить код с -X importtime: (время импорта, мс; модули)."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    # site импортируется интерпретатором до запуска сценария
+    times = parse_importtime(completed.stderr)
+    times.pop("site", None)
+    return sum(times.values()), imported_modules(completed.stderr)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Замерить время запуска сценариев и проверить импорты."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="число запусков (5)"
+    )
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        help="бюджет времени импорта для сценариев без pandas (мс)",
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help="сценарии через запятую",
+    )
+    args = parser.parse_args(argv)
+
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.scenarios.split(","):
+            template, data_file, engine, forbidden = SCENARIOS[name]
+            code = template.format(
+                data_dir=tmp,
+                path=str(DATA_DIR / data_file) if data_file else "",
+                engine=engine,
+            )
+            timings = []
+            modules: set[str] = set()
+            for _ in range(args.repeat):
+                elapsed, modules = run_scenario(code)
+                timings.append(elapsed)
+            median = statistics.median(timings)
+            heavy = sorted(modules.intersection(forbidden))
+            print(f"{name:>18}: {median:8.1f} мс, модулей {len(modules)}")
+
+            if heavy:
+                failures.append(
+                    f"{name}: импортированы лишние модули {', '.join(heavy)}"
+                )
+            elif (
+                args.max_ms is not None
+                and forbidden == HEAVY_MODULES
+                and median > args.max_ms
+            ):
+                failures.append(
+                    f"{name}: {median:.1f} мс больше бюджета {args.max_ms} мс"
+                )
+
+    for failure in failures:
+        print(f"ОШИБКА {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+"""Бенчмарк: генерация PDF с общими (заранее разобранными) стилями и без них.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_styles --count 50
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from pdfgenerator.core import FileManager
+from pdfgenerator.core.generator import PDFGenerator
+from pdfgenerator.templates import TemplateRenderer
+
+
+def _measure(
+    generator: PDFGenerator, documents: list[str], output_dir: Path
+) -> list[float]:
+    """Сгенерировать документы и вернуть время генерации каждого."""
+    generator.warm_up()
+    timings = []
+    for i, html_content in enumerate(documents):
+        start = time.perf_counter()
+        generator.generate(html_content, output_dir / f"doc_{i}.pdf")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Сравнить время генерации документа в двух режимах."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--data", default="data/invoices.json")
+    parser.add_argument("--template", default="templates/invoice_template.html")
+    args = parser.parse_args(argv)
+
+    file_manager = FileManager()
+    renderer = TemplateRenderer()
+    records = file_manager.load_data_file(Path(args.data))
+    template = renderer.load(Path(args.template))
+    documents = [
+        renderer.render(template, records[i % len(records)])
+        for i in range(args.count)
+    ]
+
+    medians = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for share_styles in (False, True):
+            timings = _measure(
+                PDFGenerator(share_styles=share_styles), documents, Path(tmp)
+            )
+            medians[share_styles] = statistics.median(timings)
+            label = "общие стили" if share_styles else "стили в документе"
+            print(
+                f"{label:>18}: медиана {medians[share_styles] * 1000:.1f} мс, "
+                f"всего {sum(timings):.2f} с на {len(timings)} документов"
+            )
+
+    saving = medians[False] - medians[True]
+    print(
+        f"Экономия на документ: {saving * 1000:.1f} мс "
+        f"({saving / medians[False] * 100:.1f}%)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Общие функции бенчмарков: метрики, сохранение и сравнение результатов."""
+
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import resource
+
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Пиковое потребление памяти процессом (МБ)."""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux возвращает килобайты, macOS - байты
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Перцентиль (ближайший ранг) отсортированной выборки."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def time_calls(func: Callable[[Any], Any], args: Iterable[Any]) -> list[float]:
+    """Вызвать функцию для каждого аргумента и вернуть времена вызовов."""
+    timings = []
+    for arg in args:
+        start = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(
+    name: str, timings: list[float], records_per_call: int = 1
+) -> dict[str, Any]:
+    """Собрать метрики сценария: записей/с, p50/p99 и пиковую память."""
+    total = sum(timings)
+    records = records_per_call * len(timings)
+    return {
+        "name": name,
+        "calls": len(timings),
+        "records": records,
+        "records_per_s": records / total if total > 0 else 0.0,
+        "p50_ms": statistics.median(timings) * 1000 if timings else 0.0,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def environment() -> dict[str, Any]:
+    """Описание окружения, в котором запускались бенчмарки."""
+    from pdfgenerator.core.generator import _weasyprint_version
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "weasyprint": _weasyprint_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_results(path: Path, results: list[dict[str, Any]]) -> None:
+    """Сохранить результаты запуска в JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"environment": environment(), "results": results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def load_results(path: Path) -> dict[str, dict[str, Any]]:
+    """Загрузить результаты запуска: имя сценария -> метрики."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {result["name"]: result for result in data["results"]}
+
+
+def compare(
+    results: list[dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    threshold: float = 0.1,
+) -> list[str]:
+    """Сравнить с базовым запуском и вернуть список регрессий.
+
+    Регрессия - падение пропускной способности больше чем на threshold.
+    """
+    regressions = []
+    print(f"\n{'сценарий':<44} {'база':>12} {'сейчас':>12} {'изм.':>8}")
+    for result in results:
+        base = baseline.get(result["name"])
+        if base is None or not base["records_per_s"]:
+            continue
+        change = result["records_per_s"] / base["records_per_s"] - 1
+        print(
+            f"{result['name']:<44} {base['records_per_s']:>12.1f} "
+            f"{result['records_per_s']:>12.1f} {change * 100:>7.1f}%"
+        )
+        if change < -threshold:
+            regressions.append(result["name"])
+    return regressions
@@ -0,0 +1,240 @@
+"""Бенчмарки конвейера: загрузка данных -> рендеринг шаблона -> PDF.
+
+Каждый сценарий запускается в отдельном процессе, чтобы пиковое потребление
+памяти (peak RSS) относилось только к нему. Запуск из корня репозитория:
+
+    python -m benchmarks.run --out benchmarks/results/latest.json
+    python -m benchmarks.run --full --baseline benchmarks/results/base.json
+"""
+
+import argparse
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+from benchmarks.harness import (
+    compare,
+    load_results,
+    save_results,
+    summarize,
+    time_calls,
+)
+from benchmarks.synthetic import iter_invoices, write_data_file
+
+TEMPLATE_PATH = Path("templates/invoice_template.html")
+STAGES = ("load", "render", "pdf")
+LOAD_FORMATS: tuple[str, ...] = (".json", ".ndjson", ".csv", ".xlsx")
+if importlib.util.find_spec("pyarrow") is not None:
+    LOAD_FORMATS += (".parquet",)
+
+
+def _data_path(data_dir: Path, size: int, items: int, fmt: str) -> Path:
+    return data_dir / f"invoices_{size}_{items}{fmt}"
+
+
+def _scenario_name(stage: str, size: int, items: int, fmt: str) -> str:
+    label = f"{stage}{fmt}" if fmt else stage
+    return f"{label}/n={size}/items={items}"
+
+
+def run_scenario(
+    stage: str,
+    size: int,
+    items: int,
+    fmt: str,
+    data_dir: Path,
+    repeat: int,
+    pdf_limit: int,
+) -> dict[str, Any]:
+    """Выполнить один сценарий в текущем процессе."""
+    from pdfgenerator.core import FileManager
+    from pdfgenerator.templates import TemplateRenderer
+
+    name = _scenario_name(stage, size, items, fmt)
+
+    if stage == "load":
+        file_manager = FileManager(
+            data_dir=str(data_dir),
+            templates_dir=str(data_dir),
+            output_dir=str(data_dir),
+        )
+        path = _data_path(data_dir, size, items, fmt)
+        timings = time_calls(
+            lambda _: file_manager.load_data_file(path), range(repeat)
+        )
+        return summarize(name, timings, records_per_call=size)
+
+    renderer = TemplateRenderer()
+    template = renderer.load(TEMPLATE_PATH)
+
+    if stage == "render":
+        records = list(iter_invoices(size, items))
+        timings = time_calls(
+            lambda record: renderer.render(template, record), records
+        )
+        return summarize(name, timings)
+
+    from pdfgenerator.core.generator import PDFGenerator
+
+    generator = PDFGenerator()
+    generator.warm_up()
+    documents = [
+        renderer.render(template, record)
+        for record in iter_invoices(min(size, pdf_limit), items)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = Path(tmp) / "invoice.pdf"
+        timings = time_calls(
+            lambda html: generator.generate(html, output_path), documents
+        )
+    return summarize(name, timings)
+
+
+def _run_isolated(
+    scenario: tuple[str, int, int, str], args: argparse.Namespace
+) -> Optional[dict[str, Any]]:
+    """Запустить сценарий в отдельном процессе."""
+    stage, size, items, fmt = scenario
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.run",
+        "--scenario",
+        f"{stage}:{size}:{items}:{fmt}",
+        "--data-dir",
+        str(args.data_dir),
+        "--repeat",
+        str(args.repeat),
+        "--pdf-limit",
+        str(args.pdf_limit),
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()
+        print(f"  ошибка: {error[-1] if error else completed.returncode}")
+        return None
+    result: dict[str, Any] = json.loads(completed.stdout)
+    return result
+
+
+def _parse_ints(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Запустить набор сценариев и сохранить результаты."""
+    parser = argparse.ArgumentParser(
+        description="Бенчмарки конвейера загрузка -> рендеринг -> PDF"
+    )
+    parser.add_argument(
+        "--stages", default=",".join(STAGES), help="этапы через запятую"
+    )
+    parser.add_argument("--sizes", help="число записей через запятую (1,1000)")
+    parser.add_argument(
+        "--items", help="число позиций в счете через запятую (1,50)"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="полный набор: 1/1k/100k записей, 1/50/500 позиций",
+    )
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        default=5_000_000,
+        help="пропускать сценарии, где записей*позиций больше N",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="повторы для этапа load"
+    )
+    parser.add_argument(
+        "--pdf-limit",
+        type=int,
+        default=100,
+        help="не более N документов для этапа pdf",
+    )
+    parser.add_argument("--out", type=Path, help="файл для результатов")
+    parser.add_argument(
+        "--baseline", type=Path, help="результаты для сравнения"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="допустимое падение пропускной способности (0.1 = 10%%)",
+    )
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    # Дочерний процесс: выполнить один сценарий и вывести JSON
+    if args.scenario:
+        stage, size, items, fmt = args.scenario.split(":")
+        scenario_result = run_scenario(
+            stage,
+            int(size),
+            int(items),
+            fmt,
+            args.data_dir,
+            args.repeat,
+            args.pdf_limit,
+        )
+        print(json.dumps(scenario_result))
+        return 0
+
+    sizes = _parse_ints(
+        args.sizes or ("1,1000,100000" if args.full else "1,1000")
+    )
+    items_counts = _parse_ints(
+        args.items or ("1,50,500" if args.full else "1,50")
+    )
+    stages = [stage for stage in args.stages.split(",") if stage]
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="pdfgen-bench-") as tmp:
+        args.data_dir = Path(tmp)
+        for stage in stages:
+            for size in sizes:
+                for items in items_counts:
+                    if size * items > args.max_rows:
+                        continue
+                    formats = LOAD_FORMATS if stage == "load" else ("",)
+                    for fmt in formats:
+                        if fmt:
+                            path = _data_path(args.data_dir, size, items, fmt)
+                            write_data_file(path, size, items)
+                        name = _scenario_name(stage, size, items, fmt)
+                        print(f"{name}...")
+                        result = _run_isolated((stage, size, items, fmt), args)
+                        if result is None:
+                            continue
+                        results.append(result)
+                        print(
+                            f"  {result['records_per_s']:.1f} записей/с, "
+                            f"p50 {result['p50_ms']:.3f} мс, "
+                            f"p99 {result['p99_ms']:.3f} мс, "
+                            f"peak RSS {result['peak_rss_mb'] or 0:.1f} МБ"
+                        )
+                        if fmt:
+                            path.unlink()
+
+    if args.out:
+        save_results(args.out, results)
+        print(f"\nРезультаты сохранены: {args.out}")
+
+    if args.baseline:
+        regressions = compare(
+            results, load_results(args.baseline), args.threshold
+        )
+        if regressions:
+            print(f"\nРегрессии ({len(regressions)}): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
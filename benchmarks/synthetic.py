@@ -0,0 +1,122 @@
+"""Генераторы синтетических счетов для бенчмарков."""
+
+import csv
+import json
+import random
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+# Поля счета в плоском формате (CSV/XLSX): по строке на позицию
+FLAT_COLUMNS = [
+    "invoice_id",
+    "date",
+    "customer_name",
+    "customer_address",
+    "item_name",
+    "quantity",
+    "price",
+    "total",
+    "tax",
+    "grand_total",
+]
+
+
+def make_invoice(index: int, items: int, rng: random.Random) -> dict[str, Any]:
+    """Создать счет с заданным числом позиций."""
+    line_items: list[dict[str, Any]] = [
+        {
+            "name": f"Позиция {number + 1}",
+            "quantity": rng.randint(1, 10),
+            "price": round(rng.uniform(10, 5000), 2),
+        }
+        for number in range(items)
+    ]
+    total = round(sum(i["quantity"] * i["price"] for i in line_items), 2)
+    tax = round(total * 0.2, 2)
+    return {
+        "invoice_id": f"INV-{index:07d}",
+        "date": "2024-01-15",
+        "customer_name": f"Клиент {index}",
+        "customer_address": f"г. Москва, ул. Ленина, д. {index % 100 + 1}",
+        "items": line_items,
+        "total": total,
+        "tax": tax,
+        "grand_total": round(total + tax, 2),
+    }
+
+
+def iter_invoices(
+    count: int, items: int, seed: int = 0
+) -> Iterator[dict[str, Any]]:
+    """Сгенерировать поток счетов (детерминированно для одного seed)."""
+    rng = random.Random(seed)
+    for index in range(1, count + 1):
+        yield make_invoice(index, items, rng)
+
+
+def iter_flat_rows(
+    invoices: Iterable[dict[str, Any]],
+) -> Iterator[list[Any]]:
+    """Развернуть счета в строки плоского формата (по строке на позицию)."""
+    for invoice in invoices:
+        for item in invoice["items"]:
+            yield [
+                invoice["invoice_id"],
+                invoice["date"],
+                invoice["customer_name"],
+                invoice["customer_address"],
+                item["name"],
+                item["quantity"],
+                item["price"],
+                invoice["total"],
+                invoice["tax"],
+                invoice["grand_total"],
+            ]
+
+
+def write_data_file(path: Path, count: int, items: int, seed: int = 0) -> Path:
+    """Записать синтетические счета в файл (формат по расширению)."""
+    invoices = iter_invoices(count, items, seed)
+    suffix = path.suffix.lower()
+
+    if suffix == ".json":
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[\n")
+            for number, invoice in enumerate(invoices):
+                if number:
+                    f.write(",\n")
+                json.dump(invoice, f, ensure_ascii=False)
+            f.write("\n]\n")
+    elif suffix in (".ndjson", ".jsonl"):
+        with open(path, "w", encoding="utf-8") as f:
+            for invoice in invoices:
+                json.dump(invoice, f, ensure_ascii=False)
+                f.write("\n")
+    elif suffix == ".csv":
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(FLAT_COLUMNS)
+            writer.writerows(iter_flat_rows(invoices))
+    elif suffix == ".xlsx":
+        from openpyxl import Workbook  # type: ignore
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(FLAT_COLUMNS)
+        for row in iter_flat_rows(invoices):
+            sheet.append(row)
+        workbook.save(path)
+    elif suffix == ".parquet":
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+
+        columns = list(zip(*iter_flat_rows(invoices)))
+        table = pa.table(
+            {name: list(values) for name, values in zip(FLAT_COLUMNS, columns)}
+        )
+        pq.write_table(table, path)
+    else:
+        raise ValueError(f"Неподдерживаемый формат файла: {path.suffix}")
+
+    return path
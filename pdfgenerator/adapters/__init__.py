@@ -1,10 +1,27 @@
 """Адаптеры для чтения файлов разных форматов."""
 
 from .base import DataAdapter
-from .factory import get_adapter
+from .columnar import ColumnarTable, ItemColumns, RowView
+from .factory import get_adapter, register_adapter, supported_extensions
+from .grouping import (
+    group_line_items,
+    group_line_items_table,
+    has_line_items,
+)
+from .registry import AdapterRegistry
 
-# Адаптеры импортируются лениво в factory для ускорения запуска
+# Адаптеры импортируются лениво в factory: модуль адаптера (и pandas)
+# загружается только при чтении файла его формата
 __all__ = [
+    "AdapterRegistry",
+    "ColumnarTable",
     "DataAdapter",
+    "ItemColumns",
+    "RowView",
     "get_adapter",
+    "group_line_items",
+    "group_line_items_table",
+    "has_line_items",
+    "register_adapter",
+    "supported_extensions",
 ]
@@ -1,8 +1,16 @@
 """Базовый класс для адаптеров чтения данных."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Collection, Iterator, Mapping, Sequence
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
+
+
+def project_record(
+    record: Mapping[str, Any], fields: Collection[str]
+) -> dict[str, Any]:
+    """Оставить в записи только перечисленные поля."""
+    return {key: value for key, value in record.items() if key in fields}
 
 
 class DataAdapter(ABC):
@@ -18,6 +26,66 @@ class DataAdapter(ABC):
         """Прочитать данные из файла."""
         pass
 
+    def read_table(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> Sequence[Mapping[str, Any]]:
+        """Прочитать все записи файла в наиболее компактном представлении.
+
+        По умолчанию возвращает результат read(); табличные адаптеры
+        возвращают ColumnarTable без словаря на каждую строку. Если задан
+        fields, в записях остаются только эти поля.
+        """
+        records = self.read(file_path)
+        if fields is None:
+            return records
+        return [project_record(record, fields) for record in records]
+
+    def iter_records(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> Iterator[dict[str, Any]]:
+        """Читать данные из файла по одной записи.
+
+        По умолчанию читает файл целиком через read(); адаптеры переопределяют
+        метод, чтобы не держать в памяти все записи сразу. Если задан
+        fields, в записях остаются только эти поля.
+        """
+        for record in self.read(file_path):
+            yield record if fields is None else project_record(record, fields)
+
+    def iter_positions(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Читать записи вместе с их позициями в файле.
+
+        По позиции запись потом читается через read_at без чтения всего
+        файла. По умолчанию позиция - порядковый номер записи; адаптеры
+        построчных форматов возвращают смещение строки в байтах или номер
+        строки листа.
+        """
+        return enumerate(self.iter_records(file_path, fields))
+
+    def read_at(
+        self,
+        file_path: Path,
+        positions: Collection[int],
+        fields: Optional[Collection[str]] = None,
+    ) -> list[dict[str, Any]]:
+        """Прочитать записи по позициям из iter_positions (в порядке файла).
+
+        По умолчанию файл читается с начала до последней нужной записи.
+        """
+        wanted = set(positions)
+        if not wanted:
+            return []
+        last = max(wanted)
+        records = []
+        for position, record in self.iter_positions(file_path, fields):
+            if position in wanted:
+                records.append(record)
+            if position >= last:
+                break
+        return records
+
     @property
     @abstractmethod
     def supported_extensions(self) -> list[str]:
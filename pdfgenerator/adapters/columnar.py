@@ -0,0 +1,189 @@
+"""Столбцовое представление табличных данных (CSV/XLSX).
+
+Вместо словаря на каждую строку данные хранятся по столбцам: числовые
+столбцы - массивами numpy, остальные - списками. Строка таблицы доступна
+через легкий RowView, который читает значения из столбцов только при
+обращении по ключу, поэтому шаблон материализует лишь те поля, которые
+в нем используются.
+"""
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any, Callable, Union, overload
+
+# Типы numpy, которые хранятся массивами (bool, целые и вещественные)
+_NUMERIC_KINDS = "biuf"
+
+
+class RowView(Mapping[str, Any]):
+    """Строка столбцовой таблицы, доступная как словарь (только чтение)."""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "ColumnarTable", row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        return self._table._getters[self._table._index[key]](self._row)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._table._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.columns)
+
+    def __len__(self) -> int:
+        return len(self._table.columns)
+
+    def __repr__(self) -> str:
+        return f"RowView({self.to_dict()!r})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # При передаче в другой процесс строка превращается в словарь,
+        # чтобы не копировать всю таблицу
+        return dict, (self.to_dict(),)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Материализовать строку в словарь."""
+        row = self._row
+        return {
+            column: getter(row)
+            for column, getter in zip(self._table.columns, self._table._getters)
+        }
+
+
+class ColumnarTable(Sequence[RowView]):
+    """Таблица, хранящая данные по столбцам.
+
+    Ведет себя как список записей: len(), индексация и итерация
+    возвращают RowView.
+    """
+
+    def __init__(self, columns: list[str], data: list[Any]):
+        """Создать таблицу из имен столбцов и столбцов одинаковой длины.
+
+        Столбец - список или одномерный массив numpy.
+        """
+        if len(columns) != len(data):
+            raise ValueError("Число имен столбцов не совпадает с данными")
+        self.columns = columns
+        self._data = data
+        self._length = len(data[0]) if data else 0
+        self._index = {column: i for i, column in enumerate(columns)}
+        # Массив numpy отдает значение как объект Python через item(),
+        # список - через обычную индексацию
+        self._getters: list[Callable[[int], Any]] = [
+            column.item if hasattr(column, "item") else column.__getitem__
+            for column in data
+        ]
+
+    @classmethod
+    def from_rows(
+        cls, columns: list[str], rows: Iterable[Sequence[Any]]
+    ) -> "ColumnarTable":
+        """Собрать таблицу из строк (например, из csv.reader)."""
+        data: list[list[Any]] = [[] for _ in columns]
+        appends = [column.append for column in data]
+        width = len(columns)
+        for row in rows:
+            for i in range(width):
+                appends[i](row[i] if i < len(row) else None)
+        return cls(columns, data)
+
+    @classmethod
+    def from_frame(cls, df: Any) -> "ColumnarTable":
+        """Собрать таблицу из pandas DataFrame без словарей на строку."""
+        data: list[Any] = []
+        for name in df.columns:
+            series = df[name]
+            if series.dtype.kind in _NUMERIC_KINDS:
+                data.append(series.to_numpy())
+            else:
+                # Даты, строки и смешанные столбцы - объектами Python,
+                # как в to_dict("records")
+                data.append(series.tolist())
+        return cls([str(name) for name in df.columns], data)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> RowView: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[RowView]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[RowView, list[RowView]]:
+        if isinstance(index, slice):
+            return [RowView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("Индекс строки вне таблицы")
+        return RowView(self, index)
+
+    def __iter__(self) -> Iterator[RowView]:
+        for row in range(self._length):
+            yield RowView(self, row)
+
+    def column(self, name: str) -> Any:
+        """Получить столбец целиком (список или массив numpy)."""
+        return self._data[self._index[name]]
+
+    def is_numeric(self, name: str) -> bool:
+        """Проверить, что столбец хранится числовым массивом numpy."""
+        return name in self._index and hasattr(self.column(name), "dtype")
+
+
+class ItemColumns(Sequence[dict[str, Any]]):
+    """Позиции счета, хранящиеся столбцами: названия, количества и цены.
+
+    Количества и цены - массивы numpy (float), поэтому суммы позиций
+    считаются одной операцией. Как последовательность ведет себя как
+    список словарей {"name", "quantity", "price"}.
+    """
+
+    __slots__ = ("names", "quantities", "prices")
+
+    def __init__(self, names: list[Any], quantities: Any, prices: Any):
+        if not len(names) == len(quantities) == len(prices):
+            raise ValueError("Столбцы позиций разной длины")
+        self.names = names
+        self.quantities = quantities
+        self.prices = prices
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[dict[str, Any]]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[dict[str, Any], list[dict[str, Any]]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        quantity = self.quantities.item(index)
+        return {
+            "name": self.names[index],
+            # Целое количество - без дробной части, как в списке позиций
+            "quantity": int(quantity) if quantity.is_integer() else quantity,
+            "price": self.prices.item(index),
+        }
+
+    def __repr__(self) -> str:
+        return f"ItemColumns({list(self)!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def totals(self) -> Any:
+        """Суммы позиций (количество * цена) массивом numpy."""
+        return self.quantities * self.prices
@@ -1,21 +1,93 @@
 """Адаптер для чтения CSV файлов."""
 
 import csv
+import re
+from collections.abc import Collection, Iterator
 from pathlib import Path
-from typing import Any, cast
+from typing import IO, Any, Optional, cast
 
 from .base import DataAdapter
+from .columnar import ColumnarTable
+from .optional import get_pandas, has_pandas
 
-try:
-    import pandas as pd
+# Способы чтения CSV: pandas, стандартный модуль csv или pandas при наличии
+ENGINES = ("auto", "pandas", "stdlib")
 
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
+# Числа без ведущих нулей (чтобы не превращать коды вроде "007" в 7)
+_NUMBER_PATTERN = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?")
+
+
+def parse_value(value: Any) -> Any:
+    """Привести строковое значение CSV к числу, как это делает pandas."""
+    if not isinstance(value, str):
+        return value
+    match = _NUMBER_PATTERN.fullmatch(value.strip())
+    if match is None:
+        return value
+    if match.group(2):
+        return float(value)
+    return int(value)
+
+
+def _select_columns(
+    header: list[str], fields: Optional[Collection[str]]
+) -> list[int]:
+    """Получить номера столбцов, которые нужно прочитать."""
+    if fields is None:
+        return list(range(len(header)))
+    return [i for i, name in enumerate(header) if name in fields]
+
+
+def _make_record(
+    header: list[str], indices: list[int], row: list[str]
+) -> dict[str, Any]:
+    """Собрать запись из строки CSV (только столбцы indices)."""
+    return {
+        header[i]: parse_value(row[i]) if i < len(row) else None
+        for i in indices
+    }
+
+
+class _OffsetLines:
+    """Строки бинарного файла как текст со смещением следующей строки.
+
+    csv.reader берет строки по одной и не читает вперед, поэтому перед
+    каждой записью offset указывает на ее начало в файле.
+    """
+
+    def __init__(self, f: IO[bytes]):
+        self._f = f
+        self.offset = f.tell()
+
+    def __iter__(self) -> "_OffsetLines":
+        return self
+
+    def __next__(self) -> str:
+        line = self._f.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode("utf-8")
 
 
 class CSVAdapter(DataAdapter):
-    """Адаптер для чтения CSV файлов."""
+    """Адаптер для чтения CSV файлов.
+
+    engine выбирает способ чтения целого файла: "pandas", "stdlib"
+    (модуль csv, без импорта pandas) или "auto" - pandas, если он
+    установлен. Потоковое чтение (iter_records) всегда идет через csv.
+    """
+
+    def __init__(self, engine: str = "auto"):
+        if engine not in ENGINES:
+            raise ValueError(f"Неизвестный способ чтения CSV: {engine}")
+        self.engine = engine
+
+    def _use_pandas(self) -> bool:
+        """Проверить, читать ли файл через pandas."""
+        if self.engine == "auto":
+            return has_pandas()
+        return self.engine == "pandas"
 
     @property
     def supported_extensions(self) -> list[str]:
@@ -28,15 +100,87 @@ class CSVAdapter(DataAdapter):
 
     def read(self, file_path: Path) -> list[dict[str, Any]]:
         """Прочитать данные из CSV файла."""
-        if PANDAS_AVAILABLE:
+        if self._use_pandas():
+            pd = get_pandas("чтения CSV через pandas")
             df = pd.read_csv(file_path, encoding="utf-8")
             records = df.to_dict("records")
             return cast(list[dict[str, Any]], records)
         else:
             # Используем стандартную библиотеку csv
-            csv_data: list[dict[str, Any]] = []
-            with open(file_path, encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    csv_data.append(dict(row))
-            return csv_data
+            return list(self.iter_records(file_path))
+
+    def read_table(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> ColumnarTable:
+        """Прочитать CSV файл в столбцовую таблицу (только столбцы fields)."""
+        if self._use_pandas():
+            pd = get_pandas("чтения CSV через pandas")
+            # Ненужные столбцы pandas пропускает еще при разборе
+            usecols = None if fields is None else fields.__contains__
+            return ColumnarTable.from_frame(
+                pd.read_csv(file_path, encoding="utf-8", usecols=usecols)
+            )
+        with open(file_path, encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            indices = _select_columns(header, fields)
+            return ColumnarTable.from_rows(
+                [header[i] for i in indices],
+                (
+                    [
+                        parse_value(row[i]) if i < len(row) else None
+                        for i in indices
+                    ]
+                    for row in reader
+                    if row
+                ),
+            )
+
+    def iter_records(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> Iterator[dict[str, Any]]:
+        """Читать CSV файл построчно, не загружая его целиком."""
+        with open(file_path, encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            indices = _select_columns(header, fields)
+            for row in reader:
+                # Пустые строки пропускаются, как в csv.DictReader
+                if not row:
+                    continue
+                yield _make_record(header, indices, row)
+
+    def iter_positions(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Читать CSV файл построчно вместе со смещениями строк в байтах."""
+        with open(file_path, "rb") as f:
+            lines = _OffsetLines(f)
+            reader = csv.reader(lines)
+            header = next(reader, [])
+            indices = _select_columns(header, fields)
+            while True:
+                position = lines.offset
+                row = next(reader, None)
+                if row is None:
+                    return
+                if row:
+                    yield position, _make_record(header, indices, row)
+
+    def read_at(
+        self,
+        file_path: Path,
+        positions: Collection[int],
+        fields: Optional[Collection[str]] = None,
+    ) -> list[dict[str, Any]]:
+        """Прочитать строки CSV по смещениям, не читая файл целиком."""
+        with open(file_path, "rb") as f:
+            header = next(csv.reader(_OffsetLines(f)), [])
+            indices = _select_columns(header, fields)
+            records = []
+            for position in sorted(set(positions)):
+                f.seek(position)
+                row = next(csv.reader(_OffsetLines(f)), None)
+                if row:
+                    records.append(_make_record(header, indices, row))
+            return records
@@ -1,31 +1,37 @@
 """Фабрика для создания адаптеров."""
 
+from collections.abc import Collection
 from pathlib import Path
-from typing import TYPE_CHECKING
 
 from .base import DataAdapter
+from .registry import AdapterRegistry
 
-if TYPE_CHECKING:
-    from .csv_adapter import CSVAdapter
-    from .json_adapter import JSONAdapter
-    from .xlsx_adapter import XLSXAdapter
+# Реестр адаптеров по умолчанию. Встроенные адаптеры импортируются только
+# для файла своего формата, поэтому чтение JSON не тянет за собой pandas
+registry = AdapterRegistry()
+registry.register_lazy([".json"], ".json_adapter:JSONAdapter")
+registry.register_lazy([".csv"], ".csv_adapter:CSVAdapter")
+registry.register_lazy([".xlsx"], ".xlsx_adapter:XLSXAdapter")
+registry.register_lazy([".ndjson", ".jsonl"], ".ndjson_adapter:NDJSONAdapter")
+registry.register_lazy([".parquet"], ".parquet_adapter:ParquetAdapter")
 
 
-def get_adapter(file_path: Path) -> DataAdapter:
-    """Получить подходящий адаптер для файла."""
-    # Ленивый импорт адаптеров для ускорения запуска
-    from .csv_adapter import CSVAdapter
-    from .json_adapter import JSONAdapter
-    from .xlsx_adapter import XLSXAdapter
+def register_adapter(adapter: DataAdapter) -> None:
+    """Зарегистрировать адаптер для его supported_extensions."""
+    registry.register(adapter)
 
-    adapters: list[DataAdapter] = [
-        JSONAdapter(),
-        CSVAdapter(),
-        XLSXAdapter(),
-    ]
 
-    for adapter in adapters:
-        if adapter.can_read(file_path):
-            return adapter
+def supported_extensions() -> Collection[str]:
+    """Получить расширения файлов, для которых есть адаптеры."""
+    return registry.extensions()
 
-    raise ValueError(f"Неподдерживаемый формат файла: {file_path.suffix}")
+
+def get_adapter(file_path: Path, csv_engine: str = "auto") -> DataAdapter:
+    """Получить подходящий адаптер для файла.
+
+    Адаптеры создаются один раз и переиспользуются. csv_engine - способ
+    чтения CSV ("auto", "pandas" или "stdlib").
+    """
+    if csv_engine != "auto" and file_path.suffix.lower() == ".csv":
+        return registry.get(file_path, engine=csv_engine)
+    return registry.get(file_path)
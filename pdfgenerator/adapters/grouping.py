@@ -0,0 +1,245 @@
+"""Группировка строк с позициями (item_name) в многострочные счета."""
+
+import pickle
+import tempfile
+import zlib
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import chain, groupby
+from pathlib import Path
+from typing import IO, Any, Optional
+
+from ..core.invoices import find_invoice_key
+from .columnar import ColumnarTable, ItemColumns
+
+# Поля позиции в плоском формате и соответствующие ключи в items
+ITEM_FIELDS = {"item_name": "name", "quantity": "quantity", "price": "price"}
+
+
+def _to_number(value: Any) -> Any:
+    """Количество или цена позиции числом (пропуск - 0).
+
+    Нечисловое значение остается как есть: ошибка возникает при генерации
+    только этого счета, а не прерывает чтение всего файла.
+    """
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return value
+
+
+def _make_item(row: Mapping[str, Any]) -> dict[str, Any]:
+    """Собрать позицию счета из плоской строки."""
+    quantity = _to_number(row.get("quantity"))
+    # Целое количество выводим без дробной части, как для плоских строк
+    if isinstance(quantity, float) and quantity.is_integer():
+        quantity = int(quantity)
+    return {
+        "name": row.get("item_name", ""),
+        "quantity": quantity,
+        "price": _to_number(row.get("price")),
+    }
+
+
+def _make_invoice(rows: list[Mapping[str, Any]]) -> dict[str, Any]:
+    """Собрать счет из строк с одинаковым invoice ID."""
+    # Поля уровня счета берем из первой строки
+    invoice = {
+        key: value for key, value in rows[0].items() if key not in ITEM_FIELDS
+    }
+    invoice["items"] = [_make_item(row) for row in rows]
+    return invoice
+
+
+class _SpillBuckets:
+    """Временные файлы-корзины для группировки неотсортированных строк."""
+
+    def __init__(self, invoice_key: str, count: int):
+        self.invoice_key = invoice_key
+        self.count = count
+        self._dir = tempfile.TemporaryDirectory(prefix="pdfgen-group-")
+        self._files: dict[int, IO[bytes]] = {}
+
+    def _path(self, bucket: int) -> Path:
+        return Path(self._dir.name) / f"bucket_{bucket}.pickle"
+
+    def write(self, row: Mapping[str, Any]) -> None:
+        """Записать строку в корзину по хешу invoice ID."""
+        invoice_id = str(row.get(self.invoice_key)).encode("utf-8")
+        bucket = zlib.crc32(invoice_id) % self.count
+        f = self._files.get(bucket)
+        if f is None:
+            # Файлы корзин остаются открытыми до конца группировки
+            f = self._files[bucket] = open(  # noqa: SIM115
+                self._path(bucket), "wb"
+            )
+        pickle.dump(row, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def iter_invoices(self) -> Iterator[dict[str, Any]]:
+        """Прочитать корзины по одной и собрать из них счета."""
+        try:
+            for f in self._files.values():
+                f.close()
+
+            for bucket in sorted(self._files):
+                groups: dict[Any, list[Mapping[str, Any]]] = {}
+                with open(self._path(bucket), "rb") as f:
+                    while True:
+                        try:
+                            row = pickle.load(f)
+                        except EOFError:
+                            break
+                        invoice_id = row.get(self.invoice_key)
+                        groups.setdefault(invoice_id, []).append(row)
+
+                for rows in groups.values():
+                    yield _make_invoice(rows)
+        finally:
+            self._dir.cleanup()
+
+
+def _group_sorted(
+    rows: Iterable[Mapping[str, Any]], invoice_key: str
+) -> Iterator[dict[str, Any]]:
+    """Сгруппировать строки, идущие подряд с одинаковым invoice ID."""
+    for _, group in groupby(rows, key=lambda row: row.get(invoice_key)):
+        yield _make_invoice(list(group))
+
+
+def _group_unsorted(
+    rows: Iterable[Mapping[str, Any]],
+    invoice_key: str,
+    max_rows_in_memory: Optional[int],
+    buckets: int,
+) -> Iterator[dict[str, Any]]:
+    """Сгруппировать строки в произвольном порядке (с выгрузкой на диск)."""
+    groups: dict[Any, list[Mapping[str, Any]]] = {}
+    spill: Optional[_SpillBuckets] = None
+    count = 0
+
+    for row in rows:
+        if spill is not None:
+            spill.write(row)
+            continue
+
+        groups.setdefault(row.get(invoice_key), []).append(row)
+        count += 1
+
+        # Слишком много строк для памяти - переносим все в корзины на диске
+        if max_rows_in_memory is not None and count > max_rows_in_memory:
+            spill = _SpillBuckets(invoice_key, buckets)
+            for group in groups.values():
+                for grouped_row in group:
+                    spill.write(grouped_row)
+            groups.clear()
+
+    if spill is not None:
+        yield from spill.iter_invoices()
+    else:
+        for group in groups.values():
+            yield _make_invoice(group)
+
+
+def has_line_items(
+    record: Mapping[str, Any], invoice_key: Optional[str] = None
+) -> bool:
+    """Проверить, что запись - строка плоского формата (позиция счета)."""
+    return (
+        "item_name" in record
+        and "items" not in record
+        and (invoice_key or find_invoice_key([record])) is not None
+    )
+
+
+def group_line_items(
+    records: Iterable[Mapping[str, Any]],
+    invoice_key: Optional[str] = None,
+    assume_sorted: bool = True,
+    max_rows_in_memory: Optional[int] = 100_000,
+    buckets: int = 64,
+) -> Iterator[Mapping[str, Any]]:
+    """Собрать строки плоского формата (по строке на позицию) в счета.
+
+    Записи без поля item_name (например, JSON с items) возвращаются как есть.
+    Если assume_sorted=True, строки одного счета должны идти подряд, и
+    группировка выполняется за один потоковый проход. Иначе строки
+    группируются в словаре, а при превышении max_rows_in_memory
+    раскладываются по временным файлам по хешу invoice ID.
+    """
+    iterator = iter(records)
+    first = next(iterator, None)
+    if first is None:
+        return
+    rows = chain([first], iterator)
+
+    invoice_key = invoice_key or find_invoice_key([first])
+    if invoice_key is None or not has_line_items(first, invoice_key):
+        yield from rows
+        return
+
+    if assume_sorted:
+        yield from _group_sorted(rows, invoice_key)
+    else:
+        yield from _group_unsorted(
+            rows, invoice_key, max_rows_in_memory, buckets
+        )
+
+
+def _item_numbers(table: ColumnarTable, name: str) -> Any:
+    """Столбец количеств или цен массивом float (пропуски - 0)."""
+    import numpy as np
+
+    values = np.asarray(table.column(name), dtype=float)
+    # Как в _make_item: отсутствующее значение (NaN) считается нулем
+    return np.nan_to_num(values, nan=0.0)
+
+
+def group_line_items_table(
+    table: ColumnarTable, invoice_key: Optional[str] = None
+) -> list[Mapping[str, Any]]:
+    """Собрать строки столбцовой таблицы в счета.
+
+    Если количества и цены хранятся массивами numpy, позиции счетов
+    остаются столбцами (ItemColumns) и не превращаются в словари; иначе
+    строки группируются обычным образом (group_line_items). Порядок счетов
+    - по первой строке каждого счета.
+    """
+    invoice_key = invoice_key or find_invoice_key(table)
+    if (
+        invoice_key is None
+        or not table
+        or not has_line_items(table[0], invoice_key)
+        or not table.is_numeric("quantity")
+        or not table.is_numeric("price")
+    ):
+        return list(
+            group_line_items(
+                table, invoice_key, assume_sorted=False, max_rows_in_memory=None
+            )
+        )
+
+    import numpy as np
+
+    rows_by_id: dict[Any, list[int]] = {}
+    for row, invoice_id in enumerate(table.column(invoice_key)):
+        rows_by_id.setdefault(invoice_id, []).append(row)
+
+    names = table.column("item_name")
+    quantities = _item_numbers(table, "quantity")
+    prices = _item_numbers(table, "price")
+    invoice_columns = [
+        column for column in table.columns if column not in ITEM_FIELDS
+    ]
+
+    invoices: list[Mapping[str, Any]] = []
+    for rows in rows_by_id.values():
+        # Поля уровня счета берем из первой строки
+        first = table[rows[0]]
+        invoice = {column: first[column] for column in invoice_columns}
+        indices = np.array(rows)
+        invoice["items"] = ItemColumns(
+            [names[row] for row in rows],
+            quantities[indices],
+            prices[indices],
+        )
+        invoices.append(invoice)
+    return invoices
@@ -1,10 +1,89 @@
 """Адаптер для чтения JSON файлов."""
 
 import json
+import re
+from collections.abc import Collection, Iterator
 from pathlib import Path
-from typing import Any, cast
+from typing import IO, Any, Optional, cast
 
-from .base import DataAdapter
+from .base import DataAdapter, project_record
+
+# Размер порции при потоковом чтении JSON
+_CHUNK_SIZE = 64 * 1024
+# Пробельные символы JSON
+_WHITESPACE_PATTERN = re.compile(r"[ \t\n\r]*")
+
+
+def _check_trailing(f: IO[str], rest: str) -> None:
+    """Проверить, что после JSON массива в файле только пробелы."""
+    while rest:
+        if _WHITESPACE_PATTERN.fullmatch(rest) is None:
+            raise ValueError("Лишние данные после JSON массива")
+        rest = f.read(_CHUNK_SIZE)
+
+
+def _iter_json_array(f: IO[str], buffer: str) -> Iterator[Any]:
+    """Разбирать элементы JSON массива по мере чтения файла.
+
+    buffer - уже прочитанные данные сразу после открывающей скобки.
+    Синтаксис проверяется так же строго, как json.load: элементы
+    разделяются ровно одной запятой, после массива - только пробелы.
+    """
+    decoder = json.JSONDecoder()
+    position = 0
+    eof = False
+    # Ожидается элемент (после "[" или ","), иначе - "," или "]"
+    expect_value = True
+    # Массив еще пуст: "]" допустима сразу после "["
+    empty = True
+
+    while True:
+        whitespace = _WHITESPACE_PATTERN.match(buffer, position)
+        # Шаблон совпадает и с пустой строкой
+        assert whitespace is not None
+        position = whitespace.end()
+
+        if position < len(buffer):
+            char = buffer[position]
+            if char == "]" and (empty or not expect_value):
+                _check_trailing(f, buffer[position + 1 :])
+                return
+            if not expect_value:
+                if char != ",":
+                    raise ValueError(
+                        f"Ожидается ',' или ']' в JSON массиве, а не {char!r}"
+                    )
+                position += 1
+                expect_value = True
+                continue
+            if char == "]":
+                raise ValueError("Лишняя запятая в конце JSON массива")
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Элемент мог не поместиться в буфер целиком - дочитываем
+                if eof:
+                    raise
+            else:
+                # Число в конце буфера может быть обрезано - тоже дочитываем
+                if end < len(buffer) or eof:
+                    yield value
+                    position = end
+                    expect_value = empty = False
+                    # Отбрасываем уже разобранную часть буфера
+                    if position > _CHUNK_SIZE:
+                        buffer = buffer[position:]
+                        position = 0
+                    continue
+
+        if eof:
+            raise ValueError("Неожиданный конец JSON массива")
+        # Порция растет вместе с недоразобранным элементом: иначе большая
+        # запись разбиралась бы заново после каждых _CHUNK_SIZE символов
+        chunk = f.read(max(_CHUNK_SIZE, len(buffer) - position))
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
 
 
 class JSONAdapter(DataAdapter):
@@ -31,3 +110,26 @@ class JSONAdapter(DataAdapter):
                 return [cast(dict[str, Any], data)]
             else:
                 return []
+
+    def iter_records(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> Iterator[dict[str, Any]]:
+        """Читать JSON массив по одному элементу, не загружая файл целиком."""
+        with open(file_path, encoding="utf-8") as f:
+            buffer = ""
+            while True:
+                chunk = f.read(_CHUNK_SIZE)
+                buffer = (buffer + chunk).lstrip()
+                if buffer or not chunk:
+                    break
+
+            if buffer.startswith("["):
+                for record in _iter_json_array(f, buffer[1:]):
+                    # Ненужные поля отбрасываются сразу после разбора записи
+                    if fields is not None and isinstance(record, dict):
+                        record = project_record(record, fields)
+                    yield record
+                return
+
+        # Не массив - читаем обычным способом
+        yield from super().iter_records(file_path, fields)
@@ -0,0 +1,95 @@
+"""Адаптер для чтения NDJSON (JSON Lines) файлов."""
+
+import json
+from collections.abc import Collection, Iterator
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .base import DataAdapter, project_record
+
+try:
+    import orjson  # type: ignore
+
+    # orjson разбирает строки в несколько раз быстрее модуля json
+    _loads: Callable[[bytes], Any] = orjson.loads
+    _DECODE_ERRORS: tuple[type[Exception], ...] = (orjson.JSONDecodeError,)
+except ImportError:
+    _loads = json.loads
+    _DECODE_ERRORS = (json.JSONDecodeError, UnicodeDecodeError)
+
+
+def _parse_line(
+    line: bytes, where: str, fields: Optional[Collection[str]]
+) -> dict[str, Any]:
+    """Разобрать строку NDJSON (where - место строки для сообщений)."""
+    try:
+        record = _loads(line)
+    except _DECODE_ERRORS as e:
+        raise ValueError(f"Ошибка разбора JSON {where}: {e}") from None
+    if not isinstance(record, dict):
+        raise ValueError(f"Ошибка {where}: ожидается JSON объект")
+    if fields is not None:
+        record = project_record(record, fields)
+    return record
+
+
+class NDJSONAdapter(DataAdapter):
+    """Адаптер для чтения NDJSON файлов: одна JSON запись на строку.
+
+    Файл читается построчно, поэтому память не зависит от его размера.
+    Если установлен orjson, строки разбираются через него.
+    """
+
+    @property
+    def supported_extensions(self) -> list[str]:
+        """Получить список поддерживаемых расширений."""
+        return [".ndjson", ".jsonl"]
+
+    def can_read(self, file_path: Path) -> bool:
+        """Проверить, может ли адаптер прочитать файл."""
+        return file_path.suffix.lower() in self.supported_extensions
+
+    def read(self, file_path: Path) -> list[dict[str, Any]]:
+        """Прочитать все записи NDJSON файла."""
+        return list(self.iter_records(file_path))
+
+    def iter_records(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> Iterator[dict[str, Any]]:
+        """Читать NDJSON файл по одной строке."""
+        for _, record in self.iter_positions(file_path, fields):
+            yield record
+
+    def iter_positions(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Читать NDJSON файл вместе со смещениями строк в байтах."""
+        # Строки читаются байтами: и json, и orjson разбирают UTF-8 сами
+        with open(file_path, "rb") as f:
+            offset = 0
+            for number, line in enumerate(f, 1):
+                position = offset
+                offset += len(line)
+                line = line.strip()
+                if line:
+                    yield position, _parse_line(
+                        line, f"в строке {number}", fields
+                    )
+
+    def read_at(
+        self,
+        file_path: Path,
+        positions: Collection[int],
+        fields: Optional[Collection[str]] = None,
+    ) -> list[dict[str, Any]]:
+        """Прочитать строки NDJSON по смещениям, не читая файл целиком."""
+        records = []
+        with open(file_path, "rb") as f:
+            for position in sorted(set(positions)):
+                f.seek(position)
+                line = f.readline().strip()
+                if line:
+                    records.append(
+                        _parse_line(line, f"по смещению {position}", fields)
+                    )
+        return records
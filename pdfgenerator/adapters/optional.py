@@ -0,0 +1,34 @@
+"""Ленивый импорт необязательных зависимостей адаптеров (pandas).
+
+pandas импортируется около 0,3-0,5 с, поэтому модули адаптеров не
+импортируют его при загрузке: импорт выполняется при первом чтении файла,
+которому pandas действительно нужен, и кешируется.
+"""
+
+from functools import lru_cache
+from typing import Any
+
+
+@lru_cache(maxsize=None)
+def _import_pandas() -> Any:
+    """Импортировать pandas один раз (None, если он не установлен)."""
+    try:
+        import pandas
+    except ImportError:
+        return None
+    return pandas
+
+
+def has_pandas() -> bool:
+    """Проверить, установлен ли pandas (импортирует его при первом вызове)."""
+    return _import_pandas() is not None
+
+
+def get_pandas(purpose: str = "этой операции") -> Any:
+    """Получить модуль pandas или выбросить ImportError с подсказкой."""
+    pandas = _import_pandas()
+    if pandas is None:
+        raise ImportError(
+            f"Для {purpose} требуется pandas. Установите: pip install pandas"
+        )
+    return pandas
@@ -0,0 +1,87 @@
+"""Адаптер для чтения Parquet файлов (требуется pyarrow)."""
+
+from collections.abc import Collection, Iterator
+from pathlib import Path
+from typing import Any, Optional
+
+from .base import DataAdapter
+from .columnar import ColumnarTable
+
+# Число строк в одной порции при потоковом чтении
+_BATCH_SIZE = 10_000
+
+
+def _open(file_path: Path) -> Any:
+    """Открыть Parquet файл (pyarrow импортируется только здесь)."""
+    try:
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError:
+        raise ImportError(
+            "Для чтения Parquet файлов требуется pyarrow. "
+            "Установите: pip install pyarrow"
+        ) from None
+    return pq.ParquetFile(file_path)
+
+
+def _select_columns(
+    parquet_file: Any, fields: Optional[Collection[str]]
+) -> Optional[list[str]]:
+    """Получить столбцы для чтения (None - все)."""
+    if fields is None:
+        return None
+    return [name for name in parquet_file.schema_arrow.names if name in fields]
+
+
+class ParquetAdapter(DataAdapter):
+    """Адаптер для чтения Parquet файлов.
+
+    Потоковое чтение идет порциями внутри групп строк, поэтому файл не
+    загружается в память целиком; ненужные столбцы не читаются с диска.
+    """
+
+    @property
+    def supported_extensions(self) -> list[str]:
+        """Получить список поддерживаемых расширений."""
+        return [".parquet"]
+
+    def can_read(self, file_path: Path) -> bool:
+        """Проверить, может ли адаптер прочитать файл."""
+        return file_path.suffix.lower() == ".parquet"
+
+    def read(self, file_path: Path) -> list[dict[str, Any]]:
+        """Прочитать все записи Parquet файла."""
+        return list(self.iter_records(file_path))
+
+    def read_table(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> ColumnarTable:
+        """Прочитать Parquet файл в столбцовую таблицу (столбцы fields)."""
+        parquet_file = _open(file_path)
+        import pyarrow as pa  # type: ignore
+
+        table = parquet_file.read(columns=_select_columns(parquet_file, fields))
+        data: list[Any] = []
+        for column in table.columns:
+            numeric = (
+                pa.types.is_integer(column.type)
+                or pa.types.is_floating(column.type)
+                or pa.types.is_boolean(column.type)
+            )
+            if numeric and column.null_count == 0:
+                data.append(column.to_numpy())
+            else:
+                # Строки, даты и столбцы с пропусками - объектами Python
+                data.append(column.to_pylist())
+        return ColumnarTable(list(table.column_names), data)
+
+    def iter_records(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> Iterator[dict[str, Any]]:
+        """Читать Parquet файл порциями по _BATCH_SIZE строк."""
+        parquet_file = _open(file_path)
+        batches = parquet_file.iter_batches(
+            batch_size=_BATCH_SIZE,
+            columns=_select_columns(parquet_file, fields),
+        )
+        for batch in batches:
+            yield from batch.to_pylist()
@@ -0,0 +1,176 @@
+"""Реестр адаптеров: расширение файла -> адаптер.
+
+Встроенные адаптеры регистрируются строкой "модуль:Класс" и импортируются
+при первом обращении к своему формату. Сторонние адаптеры подключаются
+через entry points группы "pdfgenerator.adapters":
+
+    [project.entry-points."pdfgenerator.adapters"]
+    parquet = "my_package.adapters:ParquetAdapter"
+
+Entry point указывает на класс адаптера (или готовый экземпляр) и
+называется по расширению файла; адаптер для нескольких расширений
+объявляется несколькими entry points. Список расширений (для поиска
+файлов данных) строится по именам entry points без импорта плагинов.
+Плагины загружаются один раз, когда запрошен адаптер для неизвестного
+реестру расширения; адаптер регистрируется для своих
+supported_extensions. Экземпляры адаптеров создаются один раз и
+переиспользуются.
+"""
+
+import importlib
+import threading
+import warnings
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Optional
+
+from .base import DataAdapter
+
+ENTRY_POINT_GROUP = "pdfgenerator.adapters"
+
+
+def _entry_points(group: str) -> list[Any]:
+    """Получить entry points группы (API Python 3.8-3.9 и 3.10+)."""
+    from importlib import metadata
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return list(entry_points.select(group=group))
+    return list(entry_points.get(group, []))  # type: ignore[attr-defined]
+
+
+def _normalize(extension: str) -> str:
+    """Привести расширение к виду ".ext"."""
+    extension = extension.lower()
+    return extension if extension.startswith(".") else f".{extension}"
+
+
+class AdapterRegistry:
+    """Соответствие расширений файлов адаптерам с кешем экземпляров."""
+
+    def __init__(self, entry_point_group: Optional[str] = ENTRY_POINT_GROUP):
+        self.entry_point_group = entry_point_group
+        # Расширение -> "модуль:Класс" (адаптер еще не импортирован)
+        self._specs: dict[str, str] = {}
+        # Расширение -> готовый адаптер
+        self._adapters: dict[str, DataAdapter] = {}
+        # (модуль:Класс, параметры) -> экземпляр
+        self._instances: dict[tuple[str, tuple[Any, ...]], DataAdapter] = {}
+        self._plugins_loaded = entry_point_group is None
+        # Расширения из имен entry points (читаются при первом запросе)
+        self._declared: Optional[frozenset[str]] = None
+        self._lock = threading.RLock()
+
+    def register_lazy(self, extensions: Iterable[str], spec: str) -> None:
+        """Зарегистрировать адаптер строкой "модуль:Класс" без импорта."""
+        with self._lock:
+            for extension in extensions:
+                extension = _normalize(extension)
+                self._specs[extension] = spec
+                self._adapters.pop(extension, None)
+
+    def register(
+        self,
+        adapter: DataAdapter,
+        extensions: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Зарегистрировать экземпляр адаптера.
+
+        По умолчанию адаптер получает расширения из supported_extensions
+        и заменяет ранее зарегистрированные для них адаптеры.
+        """
+        if extensions is None:
+            extensions = adapter.supported_extensions
+        with self._lock:
+            for extension in extensions:
+                extension = _normalize(extension)
+                self._adapters[extension] = adapter
+                self._specs.pop(extension, None)
+
+    def _load_plugins(self) -> None:
+        """Загрузить адаптеры из entry points (один раз)."""
+        with self._lock:
+            if self._plugins_loaded:
+                return
+            self._plugins_loaded = True
+            assert self.entry_point_group is not None
+            for entry_point in _entry_points(self.entry_point_group):
+                try:
+                    loaded = entry_point.load()
+                    adapter = loaded() if isinstance(loaded, type) else loaded
+                    if not isinstance(adapter, DataAdapter):
+                        raise TypeError("ожидается DataAdapter")
+                    extensions = [
+                        _normalize(extension)
+                        for extension in adapter.supported_extensions
+                    ]
+                except Exception as e:
+                    # Неисправный плагин не должен мешать остальным форматам
+                    warnings.warn(
+                        f"Не удалось загрузить адаптер {entry_point.name}: {e}",
+                        RuntimeWarning,
+                        stacklevel=2,
+                    )
+                    continue
+                # Встроенные и явно зарегистрированные адаптеры важнее
+                for extension in extensions:
+                    if (
+                        extension not in self._specs
+                        and extension not in self._adapters
+                    ):
+                        self._adapters[extension] = adapter
+
+    def _instantiate(self, spec: str, options: dict[str, Any]) -> DataAdapter:
+        """Получить экземпляр адаптера "модуль:Класс" с параметрами."""
+        key = (spec, tuple(sorted(options.items())))
+        adapter = self._instances.get(key)
+        if adapter is None:
+            with self._lock:
+                adapter = self._instances.get(key)
+                if adapter is None:
+                    module_name, class_name = spec.split(":")
+                    module = importlib.import_module(module_name, __package__)
+                    adapter = getattr(module, class_name)(**options)
+                    self._instances[key] = adapter
+        return adapter
+
+    def get(self, file_path: Path, **options: Any) -> DataAdapter:
+        """Получить адаптер для файла.
+
+        options передаются конструктору встроенного адаптера; для каждого
+        набора параметров создается один экземпляр.
+        """
+        extension = file_path.suffix.lower()
+        spec = self._specs.get(extension)
+        if spec is not None:
+            return self._instantiate(spec, options)
+        adapter = self._adapters.get(extension)
+        if adapter is None and not self._plugins_loaded:
+            self._load_plugins()
+            adapter = self._adapters.get(extension)
+        if adapter is None:
+            raise ValueError(
+                f"Неподдерживаемый формат файла: {file_path.suffix}"
+            )
+        return adapter
+
+    def _declared_extensions(self) -> frozenset[str]:
+        """Расширения плагинов по именам entry points (без их импорта)."""
+        if self._declared is None:
+            names: list[str] = []
+            if self.entry_point_group is not None:
+                names = [
+                    entry_point.name
+                    for entry_point in _entry_points(self.entry_point_group)
+                ]
+            self._declared = frozenset(_normalize(name) for name in names)
+        return self._declared
+
+    def extensions(self) -> list[str]:
+        """Получить все поддерживаемые расширения (с учетом плагинов).
+
+        Модули плагинов при этом не импортируются.
+        """
+        return sorted(
+            {*self._specs, *self._adapters, *self._declared_extensions()}
+        )
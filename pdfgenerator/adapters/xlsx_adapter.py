@@ -1,16 +1,42 @@
 """Адаптер для чтения XLSX файлов."""
 
+from collections.abc import Collection, Iterator, Sequence
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, Optional, cast
 
 from .base import DataAdapter
+from .columnar import ColumnarTable
+from .optional import get_pandas
 
-try:
-    import pandas as pd
 
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
+def _load_workbook(file_path: Path) -> Any:
+    """Открыть XLSX файл в режиме read_only."""
+    try:
+        from openpyxl import load_workbook  # type: ignore
+    except ImportError:
+        raise ImportError(
+            "Для чтения XLSX файлов требуется openpyxl. "
+            "Установите: pip install openpyxl"
+        ) from None
+    return load_workbook(file_path, read_only=True, data_only=True)
+
+
+def _select_columns(
+    header: Sequence[Any], fields: Optional[Collection[str]]
+) -> tuple[list[str], list[int]]:
+    """Получить имена столбцов и номера столбцов, которые нужно прочитать."""
+    columns = [str(name) for name in header]
+    indices = [
+        i for i, name in enumerate(columns) if fields is None or name in fields
+    ]
+    return columns, indices
+
+
+def _make_record(
+    columns: list[str], indices: list[int], row: Sequence[Any]
+) -> dict[str, Any]:
+    """Собрать запись из строки листа (только столбцы indices)."""
+    return {columns[i]: row[i] if i < len(row) else None for i in indices}
 
 
 class XLSXAdapter(DataAdapter):
@@ -25,15 +51,80 @@ class XLSXAdapter(DataAdapter):
         """Проверить, может ли адаптер прочитать файл."""
         return file_path.suffix.lower() == ".xlsx"
 
+    def _read_frame(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> Any:
+        """Прочитать первый лист XLSX файла в DataFrame."""
+        pd = get_pandas("чтения XLSX файлов")
+        # Ненужные столбцы не попадают в DataFrame
+        usecols = None if fields is None else fields.__contains__
+        return pd.read_excel(file_path, engine="openpyxl", usecols=usecols)
+
     def read(self, file_path: Path) -> list[dict[str, Any]]:
         """Прочитать данные из XLSX файла."""
-        if not PANDAS_AVAILABLE:
-            raise ImportError(
-                "Для чтения XLSX файлов требуется pandas. "
-                "Установите: pip install pandas openpyxl"
-            )
-
-        # Читаем первый лист Excel файла
-        df = pd.read_excel(file_path, engine="openpyxl")
-        records = df.to_dict("records")
+        records = self._read_frame(file_path).to_dict("records")
         return cast(list[dict[str, Any]], records)
+
+    def read_table(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> ColumnarTable:
+        """Прочитать XLSX файл в столбцовую таблицу (только столбцы fields)."""
+        return ColumnarTable.from_frame(self._read_frame(file_path, fields))
+
+    def iter_records(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> Iterator[dict[str, Any]]:
+        """Читать первый лист XLSX файла построчно (режим read_only)."""
+        for _, record in self.iter_positions(file_path, fields):
+            yield record
+
+    def iter_positions(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Читать первый лист построчно вместе с номерами строк листа."""
+        workbook = _load_workbook(file_path)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns, indices = _select_columns(header, fields)
+
+            # Первая строка листа - заголовки
+            for number, row in enumerate(rows, 2):
+                # Пропускаем пустые строки
+                if all(value is None for value in row):
+                    continue
+                yield number, _make_record(columns, indices, row)
+        finally:
+            workbook.close()
+
+    def read_at(
+        self,
+        file_path: Path,
+        positions: Collection[int],
+        fields: Optional[Collection[str]] = None,
+    ) -> list[dict[str, Any]]:
+        """Прочитать строки первого листа по их номерам."""
+        wanted = set(positions)
+        if not wanted:
+            return []
+        workbook = _load_workbook(file_path)
+        try:
+            sheet = workbook.worksheets[0]
+            header = next(sheet.iter_rows(max_row=1, values_only=True), None)
+            if header is None:
+                return []
+            columns, indices = _select_columns(header, fields)
+            # Строки до первой нужной пропускаются без создания ячеек
+            first = min(wanted)
+            rows = sheet.iter_rows(
+                min_row=first, max_row=max(wanted), values_only=True
+            )
+            return [
+                _make_record(columns, indices, row)
+                for number, row in enumerate(rows, first)
+                if number in wanted
+            ]
+        finally:
+            workbook.close()
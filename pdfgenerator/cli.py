@@ -1,30 +1,38 @@
 #!/usr/bin/env python3
 """Точка входа в приложение PDF Generator."""
 
-from typing import Any, Optional, TYPE_CHECKING
+import argparse
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 from pdfgenerator.core import FileManager
+from pdfgenerator.core.invoices import (
+    find_invoice_key,
+    get_invoice_id,
+    make_output_filename,
+)
 from pdfgenerator.templates import TemplateRenderer
-from pdfgenerator.ui import Menu
+from pdfgenerator.ui import InvoicePicker, Menu
 
 if TYPE_CHECKING:
+    from pdfgenerator.core.batch import BatchStats
     from pdfgenerator.core.generator import PDFGenerator
 
+__all__ = ["find_invoice_key", "main"]
 
-def find_invoice_key(data: list[dict[str, Any]]) -> Optional[str]:
-    """Найти ключ для invoice ID в данных."""
-    if not data:
-        return None
+# Сколько пропущенных записей выводить в merge-manifests
+_MAX_LISTED = 20
 
-    for key in ["invoice_id", "invoiceId", "invoice", "id", "ID"]:
-        if key in data[0]:
-            return key
-    return None
+_SHARED_STYLES_HELP = (
+    "разбирать стили шаблона один раз для всех документов; стили шаблона "
+    "получают приоритет пользовательских, и их начинают переопределять "
+    "атрибуты оформления HTML (width, bgcolor) и стили из <link>"
+)
 
 
-def main():
-    """Основная функция программы."""
-    file_manager = FileManager()
+def interactive(csv_engine: str = "auto") -> None:
+    """Интерактивный режим: генерация одного PDF через консольное меню."""
+    file_manager = FileManager(csv_engine=csv_engine)
     template_renderer = TemplateRenderer()
     # PDFGenerator создаем только когда нужно генерировать PDF
     pdf_generator: Optional[PDFGenerator] = None
@@ -41,7 +49,7 @@ def main():
     if not data_files:
         print(
             "\nОшибка: не найдено ни одного файла данных "
-            "(CSV/JSON/XLSX) в директории 'data'"
+            "(CSV/JSON/NDJSON/XLSX/Parquet) в директории 'data'"
         )
         print("Пожалуйста, добавьте файлы данных в директорию 'data'")
         return
@@ -80,10 +88,17 @@ def main():
     if not selected_template:
         return
 
-    # Загружаем данные и шаблон
-    print(f"\nЗагрузка данных из {selected_data_file.name}...")
+    # Загружаем шаблон и данные: из файла читаются только поля,
+    # которые использует шаблон
+    print(f"\nЗагрузка шаблона {selected_template.name}...")
+    template = file_manager.load_template(selected_template)
+
+    print(f"Загрузка данных из {selected_data_file.name}...")
     try:
-        data = file_manager.load_data_file(selected_data_file)
+        data = file_manager.load_data_file(
+            selected_data_file,
+            fields=template_renderer.required_fields(template),
+        )
     except Exception as e:
         print(f"Ошибка при загрузке файла: {e}")
         return
@@ -92,9 +107,6 @@ def main():
         print("Ошибка: файл данных пуст или не содержит данных")
         return
 
-    print(f"Загрузка шаблона {selected_template.name}...")
-    template = file_manager.load_template(selected_template)
-
     # Извлекаем invoice_id из данных
     invoice_key = find_invoice_key(data)
 
@@ -103,64 +115,824 @@ def main():
             "Предупреждение: не найдено поле с invoice ID. "
             "Используется порядковый номер."
         )
-        invoices = [(i + 1, f"Запись #{i+1}") for i in range(len(data))]
-    else:
-        invoices = [
-            (i, str(record.get(invoice_key, f"Запись #{i+1}")))
-            for i, record in enumerate(data)
-        ]
-
-    # Выводим меню выбора invoice
-    Menu.print_menu(
-        "Доступные счета (invoices)",
-        invoices,
-        item_formatter=lambda item: f"ID: {item[1]}",
+
+    # Индекс invoice ID строится один раз на файл: счет ищется по ID, его
+    # началу или части, а выводится только страница результатов
+    invoice_ids = [
+        get_invoice_id(record, invoice_key, index)
+        for index, record in enumerate(data)
+    ]
+    picker = InvoicePicker(invoice_ids)
+
+    while True:
+        invoice_index = picker.pick("Выберите invoice ID")
+        if invoice_index is None:
+            return
+
+        invoice_data = data[invoice_index]
+        invoice_id = invoice_ids[invoice_index]
+
+        # Генерируем PDF
+        print(f"\nГенерация PDF для invoice ID: {invoice_id}...")
+
+        try:
+            # Ленивая загрузка PDFGenerator только когда нужно
+            if pdf_generator is None:
+                from pdfgenerator.core import generator
+
+                # Ссылки шаблона (логотип, шрифты, CSS) - от директории
+                # шаблонов
+                pdf_generator = generator.PDFGenerator(
+                    base_url=file_manager.templates_dir
+                )
+
+            html_content = template_renderer.render(template, invoice_data)
+            output_path = file_manager.get_output_path(
+                make_output_filename(invoice_id)
+            )
+
+            pdf_generator.generate(html_content, output_path)
+            print(f"✓ PDF успешно создан: {output_path}")
+
+            # Открываем PDF
+            print("Открытие PDF...")
+            pdf_generator.open_pdf(output_path)
+
+        except Exception as e:
+            print(f"Ошибка при генерации PDF: {e}")
+            import traceback
+
+            traceback.print_exc()
+
+        print("\nМожно выбрать следующий счет из этого файла (q - выход).")
+
+
+def _print_progress(stats: "BatchStats") -> None:
+    """Вывести прогресс пакетной генерации."""
+    print(
+        f"  обработано: {stats.processed} "
+        f"(ошибок: {stats.failed}, {stats.rate:.1f} записей/с)"
     )
 
-    selected_invoice_index = Menu.get_user_choice(
-        invoices, "Выберите invoice ID"
+
+def run_batch(args: argparse.Namespace) -> int:
+    """Пакетный режим: сгенерировать PDF для всех записей файла данных."""
+    from pdfgenerator.core import metrics
+    from pdfgenerator.core.batch import BatchRenderer
+    from pdfgenerator.core.journal import JOURNAL_NAME, BatchJournal
+    from pdfgenerator.core.render_cache import MANIFEST_NAME, RenderCache
+    from pdfgenerator.core.shards import ShardManifest, parse_shard
+
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            print(f"Ошибка: {e}")
+            return 1
+        if args.combined:
+            print("Ошибка: --shard нельзя использовать вместе с --combined")
+            return 1
+    if args.resume and args.combined:
+        print("Ошибка: --resume нельзя использовать вместе с --combined")
+        return 1
+
+    # Замеры включаются до чтения данных, чтобы учесть все этапы
+    collected = metrics.enable() if args.stats or args.metrics_file else None
+
+    data_path = Path(args.data)
+    template_path = Path(args.template)
+    file_manager = FileManager(
+        data_dir=str(data_path.parent),
+        templates_dir=str(template_path.parent),
+        output_dir=args.out,
+        csv_engine=args.csv_engine,
     )
 
-    if not selected_invoice_index:
-        return
+    ids = set(args.ids.split(",")) if args.ids else None
 
-    invoice_index = selected_invoice_index[0]
-    invoice_data = data[invoice_index]
+    # Шарды пишут в общую директорию одновременно, поэтому у каждого
+    # шарда свои манифест хешей и журнал
+    cache_name = MANIFEST_NAME
+    journal_name = JOURNAL_NAME
+    if shard is not None:
+        suffix = f"shard-{shard[0]}-of-{shard[1]}"
+        cache_name = f".render_manifest.{suffix}.json"
+        journal_name = f".batch_journal.{suffix}.jsonl"
 
-    # Генерируем PDF
-    print(f"\nГенерация PDF для invoice ID: {selected_invoice_index[1]}...")
+    render_cache = None
+    if args.incremental:
+        render_cache = RenderCache(file_manager.output_dir, name=cache_name)
+        render_cache.prune()
 
+    journal = None
+    shard_manifest = None
     try:
-        # Ленивая загрузка PDFGenerator только когда нужно
-        if pdf_generator is None:
-            from pdfgenerator.core.generator import PDFGenerator
+        # Журнал ведется для генерации по отдельным PDF; с --resume
+        # завершенные в прошлых запусках записи пропускаются
+        if not args.combined:
+            journal = BatchJournal(
+                file_manager.output_dir,
+                data_path,
+                resume=args.resume,
+                max_retries=args.max_retries,
+                name=journal_name,
+                workers=args.workers,
+            )
+        if shard is not None:
+            shard_manifest = ShardManifest(
+                file_manager.output_dir, shard, data_path
+            )
+            # Записи, сгенерированные до сбоя, известны только журналу
+            if journal is not None:
+                for invoice_id, name in journal.completed.items():
+                    shard_manifest.add(
+                        invoice_id,
+                        file_manager.get_output_path(name),
+                        None,
+                        None,
+                    )
+    except (OSError, ValueError) as e:
+        if journal is not None:
+            journal.close()
+        print(f"Ошибка при загрузке файла: {e}")
+        return 1
+
+    batch = BatchRenderer(
+        file_manager,
+        progress_every=args.progress_every,
+        on_progress=_print_progress,
+        render_cache=render_cache,
+        generator_options={
+            "share_styles": args.shared_styles,
+            "base_url": str(file_manager.templates_dir),
+        },
+        shard_manifest=shard_manifest,
+        journal=journal,
+    )
 
-            pdf_generator = PDFGenerator()
+    if shard is not None:
+        print(f"Шард {shard[0]} из {shard[1]}")
+    print(f"Генерация PDF по данным из {data_path.name}...")
+    combined_parts: list[Path] = []
+    try:
+        # Данные читаются потоково: генерация начинается сразу,
+        # а все записи файла не держатся в памяти одновременно.
+        # Столбцы, которые шаблон не использует, не читаются
+        template = batch.template_renderer.load(template_path)
+        data = file_manager.iter_data_file(
+            data_path,
+            assume_sorted=not args.unsorted,
+            fields=template.required_fields,
+        )
+    except Exception as e:
+        if journal is not None:
+            journal.close()
+        print(f"Ошибка при загрузке файла: {e}")
+        return 1
 
-        html_content = template_renderer.render(template, invoice_data)
-        invoice_id = str(
-            invoice_data.get(invoice_key, invoice_index + 1)
-            if invoice_key
-            else invoice_index + 1
+    # Ошибки отдельных записей попадают в stats.errors, а ошибка, прервавшая
+    # запуск (чтение данных, падение пула), - в stats.aborted
+    try:
+        if args.combined:
+            stats, combined_parts = batch.run_combined(
+                data,
+                template_path,
+                file_manager.get_output_path(args.combined),
+                ids=ids,
+                limit=args.limit,
+                max_documents=args.per_file,
+                max_bytes=(
+                    int(args.max_size_mb * 1024 * 1024)
+                    if args.max_size_mb
+                    else None
+                ),
+            )
+        else:
+            stats = batch.run(
+                data,
+                template_path,
+                ids=ids,
+                limit=args.limit,
+                workers=args.workers,
+                chunksize=args.chunksize,
+                shard=shard,
+            )
+    finally:
+        if journal is not None:
+            journal.close()
+
+    resumed = journal.skipped_completed if journal is not None else 0
+    exhausted = journal.skipped_exhausted if journal is not None else []
+    if stats.aborted is not None and not stats.processed:
+        print(f"Ошибка: генерация прервана: {stats.aborted}")
+        return 1
+    if resumed and not stats.processed and not exhausted:
+        print(f"Все записи ({resumed}) уже сгенерированы")
+        return 0
+    if not stats.processed and not exhausted:
+        # Шарду маленького файла может не достаться ни одной записи
+        if shard is not None:
+            print("В шард не попало ни одной записи")
+            return 0
+        print("Ошибка: в файле данных не найдено записей для генерации")
+        return 1
+
+    print(f"\n{'=' * 60}")
+    print(f"  Обработано записей: {stats.processed}")
+    print(
+        f"  Успешно: {stats.succeeded}, без изменений: {stats.skipped}, "
+        f"ошибок: {stats.failed}"
+    )
+    if resumed:
+        print(f"  Пропущено (сгенерированы в прошлых запусках): {resumed}")
+    print(f"  Время: {stats.elapsed:.2f} с ({stats.rate:.1f} записей/с)")
+    print(f"  Результаты: {file_manager.output_dir}")
+    if shard_manifest is not None:
+        print(f"  Манифест шарда: {shard_manifest.path}")
+    for part in combined_parts:
+        print(f"  Общий PDF: {part}")
+    print(f"{'=' * 60}")
+    for invoice_id, error in stats.errors:
+        print(f"Ошибка для invoice ID {invoice_id}: {error}")
+    for invoice_id in exhausted:
+        assert journal is not None
+        print(
+            f"Ошибка для invoice ID {invoice_id}: исчерпан лимит повторов "
+            f"(--max-retries), последняя ошибка: {journal.errors[invoice_id]}"
         )
-        safe_invoice_id = "".join(
-            c for c in invoice_id if c.isalnum() or c in ("-", "_")
+    if stats.aborted is not None:
+        print(
+            f"Ошибка: генерация прервана после {stats.processed} записей: "
+            f"{stats.aborted}"
         )
-        output_filename = f"invoice_{safe_invoice_id}.pdf"
-        output_path = file_manager.get_output_path(output_filename)
 
-        pdf_generator.generate(html_content, output_path)
-        print(f"✓ PDF успешно создан: {output_path}")
+    if collected is not None:
+        if args.stats:
+            print("\nВремя по этапам:")
+            print(collected.report())
+        if args.metrics_file:
+            collected.dump(Path(args.metrics_file))
+            print(f"Замеры сохранены: {args.metrics_file}")
 
-        # Открываем PDF
-        print("Открытие PDF...")
-        pdf_generator.open_pdf(output_path)
+    return 1 if stats.failed or exhausted or stats.aborted else 0
 
+
+def run_render(args: argparse.Namespace) -> int:
+    """Сгенерировать PDF для одного счета, найденного по invoice ID."""
+    from pdfgenerator.core.generator import PDFGenerator
+
+    data_path = Path(args.data)
+    template_path = Path(args.template)
+    file_manager = FileManager(
+        data_dir=str(data_path.parent),
+        templates_dir=str(template_path.parent),
+        output_dir=args.out,
+        csv_engine=args.csv_engine,
+    )
+    template_renderer = TemplateRenderer()
+
+    try:
+        template = template_renderer.load(template_path)
+        # Индекс строится при первом обращении к файлу и дальше позволяет
+        # читать только строки нужного счета
+        record = file_manager.find_record(
+            data_path,
+            args.id,
+            fields=template.required_fields,
+            use_index=not args.no_index,
+        )
+    except Exception as e:
+        print(f"Ошибка при загрузке файла: {e}")
+        return 1
+
+    if record is None:
+        print(f"Ошибка: счет {args.id} не найден в {data_path.name}")
+        return 1
+
+    try:
+        pdf_generator = PDFGenerator(base_url=file_manager.templates_dir)
+        output_path = file_manager.get_output_path(
+            make_output_filename(args.id)
+        )
+        pdf_generator.generate(
+            template_renderer.render(template, record), output_path
+        )
     except Exception as e:
         print(f"Ошибка при генерации PDF: {e}")
-        import traceback
+        return 1
+
+    print(f"✓ PDF успешно создан: {output_path}")
+    if args.open:
+        pdf_generator.open_pdf(output_path)
+    return 0
+
+
+def run_validate(args: argparse.Namespace) -> int:
+    """Проверить суммы всех счетов файла данных."""
+    from pdfgenerator.core.validation import VALIDATION_FIELDS, validate_totals
+
+    data_path = Path(args.data)
+    file_manager = FileManager(
+        data_dir=str(data_path.parent),
+        templates_dir=str(data_path.parent),
+        output_dir=str(data_path.parent),
+        csv_engine=args.csv_engine,
+    )
+    try:
+        records = file_manager.load_data_file(
+            data_path, fields=VALIDATION_FIELDS
+        )
+    except Exception as e:
+        print(f"Ошибка при загрузке файла: {e}")
+        return 1
+
+    errors = validate_totals(records, tolerance=args.tolerance)
+    for invoice_id, error in errors:
+        print(f"Ошибка для invoice ID {invoice_id}: {error}")
+    print(f"Проверено счетов: {len(records)}, ошибок: {len(errors)}")
+    return 1 if errors else 0
+
+
+def run_merge_manifests(args: argparse.Namespace) -> int:
+    """Проверить, что шарды сгенерировали каждую запись ровно один раз."""
+    from pdfgenerator.core.invoices import find_invoice_key, get_invoice_id
+    from pdfgenerator.core.shards import MANIFEST_GLOB, merge_manifests
+
+    output_dir = Path(args.out)
+    expected_ids = None
+    try:
+        if args.data:
+            data_path = Path(args.data)
+            file_manager = FileManager(
+                data_dir=str(data_path.parent),
+                templates_dir=str(data_path.parent),
+                output_dir=str(output_dir),
+                csv_engine=args.csv_engine,
+            )
+            # Для списка записей нужны только invoice ID. Файл читается
+            # так же, как в batch: типы значений (ID "007") сохраняются,
+            # а ключ invoice ID ищется по первой записи
+            expected_ids = set()
+            invoice_key = None
+            records = file_manager.iter_data_file(
+                data_path, assume_sorted=not args.unsorted, fields=()
+            )
+            for index, record in enumerate(records):
+                if index == 0:
+                    invoice_key = find_invoice_key([record])
+                expected_ids.add(get_invoice_id(record, invoice_key, index))
+        report = merge_manifests(
+            sorted(output_dir.glob(MANIFEST_GLOB)), expected_ids, args.shards
+        )
+    except Exception as e:
+        print(f"Ошибка при загрузке файла: {e}")
+        return 1
+
+    for problem in report.problems:
+        print(f"Ошибка: {problem}")
+    for invoice_id, shards in sorted(report.duplicates.items()):
+        print(
+            f"Ошибка для invoice ID {invoice_id}: сгенерирован несколькими "
+            f"шардами ({', '.join(map(str, shards))})"
+        )
+    # Без шарда пропущенных записей может быть очень много
+    for invoice_id in report.missing[:_MAX_LISTED]:
+        print(f"Ошибка для invoice ID {invoice_id}: не сгенерирован")
+    if len(report.missing) > _MAX_LISTED:
+        print(
+            f"... и еще {len(report.missing) - _MAX_LISTED} "
+            "несгенерированных записей"
+        )
+    for invoice_id, error in report.failed:
+        print(f"Ошибка для invoice ID {invoice_id}: {error}")
+    print(f"Записей в манифестах: {len(report.owners)}")
+    if report.ok:
+        print("✓ Каждая запись сгенерирована ровно одним шардом")
+        return 0
+    return 1
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    """Следить за директорией данных и генерировать PDF для новых записей."""
+    from pdfgenerator.core.batch import BatchRenderer
+    from pdfgenerator.core.watch import DataWatcher, make_waiter
+
+    template_path = Path(args.template)
+    if not template_path.is_file():
+        print(f"Ошибка: шаблон не найден: {template_path}")
+        return 1
+    file_manager = FileManager(
+        data_dir=args.data_dir,
+        templates_dir=str(template_path.parent),
+        output_dir=args.out,
+        csv_engine=args.csv_engine,
+    )
+    batch = BatchRenderer(
+        file_manager,
+        generator_options={
+            "share_styles": args.shared_styles,
+            "base_url": str(file_manager.templates_dir),
+        },
+    )
+
+    def on_file(path: Path, changed: int, stats: "BatchStats") -> None:
+        print(
+            f"{path.name}: новых и измененных счетов {changed}, "
+            f"создано PDF {stats.succeeded}, ошибок {stats.failed}"
+        )
+        for invoice_id, error in stats.errors:
+            print(f"Ошибка для invoice ID {invoice_id}: {error}")
+
+    def on_error(path: Path, error: Exception) -> None:
+        print(f"Ошибка при загрузке файла {path.name}: {error}")
+
+    watcher = DataWatcher(
+        batch,
+        template_path,
+        settle=args.settle,
+        interval=args.interval,
+        assume_sorted=not args.unsorted,
+        workers=args.workers,
+        on_file=on_file,
+        on_error=on_error,
+    )
+    if args.once:
+        watcher.run_once()
+        return 0
+
+    waiter = make_waiter(file_manager.data_dir, polling=args.polling)
+    print(
+        f"Наблюдение за {file_manager.data_dir} ({waiter.name}), "
+        f"PDF в {file_manager.output_dir} (Ctrl+C - остановить)"
+    )
+    try:
+        watcher.run(waiter)
+    except KeyboardInterrupt:
+        print("\nОстановка наблюдения...")
+    return 0
+
+
+def run_server(args: argparse.Namespace) -> int:
+    """Режим сервера: генерация PDF по запросам с прогретыми процессами."""
+    from pdfgenerator.server import RenderService, make_server
+
+    service = RenderService(
+        Path(args.templates),
+        Path(args.out),
+        workers=args.workers or None,
+        queue_size=args.queue_size,
+        timeout=args.timeout,
+        generator_options={
+            "share_styles": args.shared_styles,
+            "base_url": args.templates,
+        },
+    )
+    print(f"Запуск {service.pool.workers} процессов генерации...")
+    try:
+        service.start()
+        server = make_server(service, args.host, args.port, args.socket)
+    except Exception as e:
+        service.close()
+        print(f"Ошибка при запуске сервера: {e}")
+        return 1
+
+    address = args.socket or f"http://{args.host}:{args.port}"
+    print(f"Сервер генерации PDF запущен: {address} (Ctrl+C - остановить)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nОстановка сервера...")
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+def _int_argument(text: str) -> int:
+    """Разобрать целое число из аргумента командной строки."""
+    try:
+        return int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"ожидается целое число: {text}"
+        ) from None
+
+
+def _positive_int(text: str) -> int:
+    """Аргумент командной строки: целое число больше нуля."""
+    value = _int_argument(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"ожидается число больше 0: {text}")
+    return value
+
+
+def _non_negative_int(text: str) -> int:
+    """Аргумент командной строки: целое число не меньше нуля."""
+    value = _int_argument(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"ожидается число от 0: {text}")
+    return value
+
+
+def _positive_float(text: str) -> float:
+    """Аргумент командной строки: число больше нуля."""
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается число: {text}") from None
+    # Сравнение отсекает и nan
+    if not value > 0 or value == float("inf"):
+        raise argparse.ArgumentTypeError(f"ожидается число больше 0: {text}")
+    return value
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Построить парсер аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        prog="pdfgen",
+        description="Генерация PDF документов из данных и HTML-шаблонов. "
+        "Без аргументов запускается интерактивный режим.",
+    )
+    parser.add_argument(
+        "--csv-engine",
+        choices=["auto", "pandas", "stdlib"],
+        default="auto",
+        help="чем читать CSV: pandas, модулем csv без импорта pandas "
+        "или auto - pandas, если установлен (auto)",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch = subparsers.add_parser(
+        "batch", help="сгенерировать PDF для всех записей файла данных"
+    )
+    batch.add_argument(
+        "--data",
+        required=True,
+        help="файл с данными (CSV/JSON/NDJSON/XLSX/Parquet)",
+    )
+    batch.add_argument("--template", required=True, help="HTML шаблон")
+    batch.add_argument(
+        "--out", default="output", help="директория для PDF (output)"
+    )
+    batch.add_argument(
+        "--ids", help="список invoice ID через запятую (по умолчанию все)"
+    )
+    batch.add_argument(
+        "--limit",
+        type=_non_negative_int,
+        help="обработать не более N записей",
+    )
+    batch.add_argument(
+        "--incremental",
+        action="store_true",
+        help="не генерировать заново PDF, содержимое которых не изменилось",
+    )
+    batch.add_argument(
+        "--shared-styles",
+        action="store_true",
+        help=_SHARED_STYLES_HELP,
+    )
+    batch.add_argument(
+        "--unsorted",
+        action="store_true",
+        help="строки одного счета в CSV/XLSX идут не подряд",
+    )
+    batch.add_argument(
+        "--combined",
+        metavar="FILE",
+        help="собрать все счета в один PDF с этим именем в --out",
+    )
+    batch.add_argument(
+        "--per-file",
+        type=_non_negative_int,
+        help="для --combined: не более N счетов в одном PDF (1000); "
+        "0 - один PDF, все страницы которого держатся в памяти",
+    )
+    batch.add_argument(
+        "--max-size-mb",
+        type=_positive_float,
+        help="для --combined: примерный предельный размер одного PDF (МБ)",
+    )
+    batch.add_argument(
+        "--workers",
+        type=_non_negative_int,
+        default=1,
+        help="число процессов для генерации (1; 0 - по числу ядер)",
+    )
+    batch.add_argument(
+        "--chunksize",
+        type=_positive_int,
+        default=16,
+        help="число записей в одной пачке для процесса (16)",
+    )
+    batch.add_argument(
+        "--resume",
+        action="store_true",
+        help="продолжить прерванный запуск по журналу в --out: пропустить "
+        "созданные PDF и повторить записи с ошибками",
+    )
+    batch.add_argument(
+        "--max-retries",
+        type=_non_negative_int,
+        default=2,
+        help="для --resume: сколько раз повторять запись с ошибкой (2)",
+    )
+    batch.add_argument(
+        "--shard",
+        metavar="K/N",
+        help="обработать только шард K из N (для генерации на нескольких "
+        "машинах; проверка - merge-manifests)",
+    )
+    batch.add_argument(
+        "--progress-every",
+        type=_positive_int,
+        default=100,
+        help="выводить прогресс каждые N записей (100)",
+    )
+    batch.add_argument(
+        "--stats",
+        action="store_true",
+        help="вывести разбивку времени по этапам генерации",
+    )
+    batch.add_argument(
+        "--metrics-file",
+        metavar="FILE",
+        help="сохранить замеры этапов (.json - JSON, иначе Prometheus)",
+    )
+    batch.set_defaults(func=run_batch)
 
-        traceback.print_exc()
+    render = subparsers.add_parser(
+        "render", help="сгенерировать PDF для одного счета по invoice ID"
+    )
+    render.add_argument(
+        "--data",
+        required=True,
+        help="файл с данными (CSV/JSON/NDJSON/XLSX/Parquet)",
+    )
+    render.add_argument("--template", required=True, help="HTML шаблон")
+    render.add_argument("--id", required=True, help="invoice ID счета")
+    render.add_argument(
+        "--out", default="output", help="директория для PDF (output)"
+    )
+    render.add_argument(
+        "--no-index",
+        action="store_true",
+        help="искать счет перебором, не создавая индекс рядом с файлом",
+    )
+    render.add_argument(
+        "--open", action="store_true", help="открыть PDF после генерации"
+    )
+    render.set_defaults(func=run_render)
+
+    validate = subparsers.add_parser(
+        "validate", help="проверить total/tax/grand_total всех счетов"
+    )
+    validate.add_argument(
+        "--data",
+        required=True,
+        help="файл с данными (CSV/JSON/NDJSON/XLSX/Parquet)",
+    )
+    validate.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.01,
+        help="допустимое расхождение сумм (0.01)",
+    )
+    validate.set_defaults(func=run_validate)
+
+    merge = subparsers.add_parser(
+        "merge-manifests",
+        help="проверить, что шарды сгенерировали каждую запись ровно раз",
+    )
+    merge.add_argument(
+        "--out",
+        default="output",
+        help="директория с PDF и манифестами шардов (output)",
+    )
+    merge.add_argument(
+        "--data",
+        help="файл с данными: проверить, что не пропущена ни одна запись",
+    )
+    merge.add_argument(
+        "--unsorted",
+        action="store_true",
+        help="строки одного счета в CSV/XLSX идут не подряд (как в batch)",
+    )
+    merge.add_argument(
+        "--shards",
+        type=_positive_int,
+        metavar="N",
+        help="число шардов запуска: манифесты других разбиений в --out "
+        "не учитываются",
+    )
+    merge.set_defaults(func=run_merge_manifests)
+
+    watch = subparsers.add_parser(
+        "watch",
+        help="следить за директорией данных и генерировать PDF "
+        "для новых и измененных записей",
+    )
+    watch.add_argument(
+        "--data-dir", default="data", help="директория с данными (data)"
+    )
+    watch.add_argument("--template", required=True, help="HTML шаблон")
+    watch.add_argument(
+        "--out", default="output", help="директория для PDF (output)"
+    )
+    watch.add_argument(
+        "--settle",
+        type=float,
+        default=1.0,
+        help="сколько секунд файл не должен меняться перед обработкой (1)",
+    )
+    watch.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="период опроса директории без inotify в секундах (1)",
+    )
+    watch.add_argument(
+        "--polling",
+        action="store_true",
+        help="опрашивать директорию, даже если доступен inotify",
+    )
+    watch.add_argument(
+        "--once",
+        action="store_true",
+        help="обработать новые и измененные файлы один раз и выйти",
+    )
+    watch.add_argument(
+        "--shared-styles",
+        action="store_true",
+        help=_SHARED_STYLES_HELP,
+    )
+    watch.add_argument(
+        "--unsorted",
+        action="store_true",
+        help="строки одного счета в CSV/XLSX идут не подряд",
+    )
+    watch.add_argument(
+        "--workers",
+        type=_non_negative_int,
+        default=1,
+        help="число процессов для генерации (1; 0 - по числу ядер)",
+    )
+    watch.set_defaults(func=run_watch)
+
+    serve = subparsers.add_parser(
+        "serve", help="запустить сервер генерации PDF (HTTP или Unix-сокет)"
+    )
+    serve.add_argument("--host", default="127.0.0.1", help="адрес (127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8000, help="порт (8000)")
+    serve.add_argument(
+        "--socket", help="путь к Unix-сокету (вместо --host/--port)"
+    )
+    serve.add_argument(
+        "--templates",
+        default="templates",
+        help="директория с HTML шаблонами (templates)",
+    )
+    serve.add_argument(
+        "--out",
+        default="output",
+        help="директория для PDF, записываемых в файл (output)",
+    )
+    serve.add_argument(
+        "--workers",
+        type=_non_negative_int,
+        default=2,
+        help="число процессов генерации (2; 0 - по числу ядер)",
+    )
+    serve.add_argument(
+        "--queue-size",
+        type=_non_negative_int,
+        default=32,
+        help="сколько запросов может ждать свободного процесса (32)",
+    )
+    serve.add_argument(
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="предельное время генерации одного PDF в секундах (60)",
+    )
+    serve.add_argument(
+        "--shared-styles",
+        action="store_true",
+        help=_SHARED_STYLES_HELP,
+    )
+    serve.set_defaults(func=run_server)
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Основная функция программы."""
+    args = _build_parser().parse_args(argv)
+    if args.command is None:
+        interactive(args.csv_engine)
+        return
+    raise SystemExit(args.func(args))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,229 @@
+"""Кеш ресурсов шаблонов (изображения, шрифты, стили) для WeasyPrint.
+
+WeasyPrint загружает ресурсы документа (логотип, @font-face, <link> на
+CSS) через url_fetcher. Без кеша каждый документ заново читает их с диска.
+make_url_fetcher возвращает url_fetcher, который берет локальные файлы
+(file://) из общего для процесса LRU кеша, ограниченного по размеру:
+ресурс читается один раз на процесс (воркер), пока не изменится файл.
+Остальные URL загружаются стандартным url_fetcher WeasyPrint.
+
+resources_digest дает хеш ресурсов, на которые ссылается документ, для
+отпечатка PDF (см. PDFGenerator.fingerprint): изменение логотипа или файла
+стилей меняет отпечаток документов, которые их используют.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+import stat as stat_module
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Union
+from urllib.parse import urljoin, urlsplit
+from urllib.request import url2pathname
+
+from . import metrics
+
+# Размер общего кеша ресурсов по умолчанию
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Ресурс: (содержимое, MIME тип)
+Asset = tuple[bytes, str]
+
+# Ссылки на ресурсы: <link href>, src, url(...) и @import "..."
+_REFERENCE_PATTERN = re.compile(
+    r"""<link\b[^>]*?\bhref\s*=\s*["']([^"']+)["']"""
+    r"""|\bsrc\s*=\s*["']([^"']+)["']"""
+    r"""|\burl\(\s*["']?([^"')]+?)["']?\s*\)"""
+    r"""|@import\s+["']([^"']+)["']""",
+    re.IGNORECASE,
+)
+
+
+class AssetCache:
+    """LRU кеш локальных ресурсов: (путь, время изменения) -> содержимое."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, int], Asset] = OrderedDict()
+        # Кешем пользуются генераторы разных потоков (AsyncPDFGenerator)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path: Path) -> Asset:
+        """Получить содержимое файла (с диска - только при промахе).
+
+        Изменившийся файл (другое время изменения) читается заново, а его
+        устаревшая версия вытесняется из кеша со временем.
+        """
+        resolved = os.path.realpath(path)
+        key = (resolved, os.stat(resolved).st_mtime_ns)
+        with self._lock:
+            asset = self._entries.get(key)
+            if asset is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return asset
+            self.misses += 1
+
+        with metrics.stage("asset.read"), open(resolved, "rb") as f:
+            data = f.read()
+        metrics.add_bytes("asset.read", len(data))
+        mime_type, _ = mimetypes.guess_type(resolved)
+        asset = (data, mime_type or "application/octet-stream")
+
+        # Ресурс больше всего кеша не кешируется
+        if len(data) <= self.max_bytes:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = asset
+                    self.size += len(data)
+                while self.size > self.max_bytes:
+                    _, (evicted, _) = self._entries.popitem(last=False)
+                    self.size -= len(evicted)
+        return asset
+
+    def clear(self) -> None:
+        """Очистить кеш."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+_shared_cache: Optional[AssetCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_asset_cache() -> AssetCache:
+    """Получить общий для процесса кеш ресурсов."""
+    global _shared_cache
+
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = AssetCache()
+    return _shared_cache
+
+
+def to_base_url(base: Union[str, Path]) -> str:
+    """Получить base_url для WeasyPrint из пути или URL.
+
+    К URL директории добавляется "/", иначе относительные ссылки
+    разрешались бы от ее родителя.
+    """
+    if isinstance(base, str) and "://" in base:
+        return base
+    path = Path(base).resolve()
+    url = path.as_uri()
+    return f"{url}/" if path.is_dir() else url
+
+
+def _local_path(url: str) -> Optional[Path]:
+    """Получить путь к файлу для URL file:// (None для прочих URL)."""
+    parts = urlsplit(url)
+    if parts.scheme != "file":
+        return None
+    return Path(url2pathname(parts.path))
+
+
+def resource_references(text: str) -> list[str]:
+    """Найти ссылки на ресурсы в HTML или CSS.
+
+    Учитываются <link href>, атрибуты src, url(...) и @import - то, что
+    загружает WeasyPrint; ссылки <a href> ресурсами не считаются.
+    """
+    return [
+        next(group for group in match.groups() if group is not None)
+        for match in _REFERENCE_PATTERN.finditer(text)
+    ]
+
+
+def resources_digest(html_content: str, base_url: str) -> str:
+    """Хеш локальных ресурсов документа: пути, размеры и время изменения.
+
+    Учитываются файлы, на которые ссылается HTML, и файлы, на которые
+    ссылаются подключенные CSS (шрифты @font-face, @import). Удаленные
+    URL и data: не учитываются.
+    """
+    entries = set()
+    queue = [(url, base_url) for url in resource_references(html_content)]
+    seen = set()
+    while queue:
+        url, base = queue.pop()
+        if url.startswith("#"):
+            # Ссылка внутри документа (url(#gradient) в SVG)
+            continue
+        path = _local_path(urljoin(base, url.strip()))
+        if path is None or path in seen:
+            continue
+        seen.add(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # Отсутствующий ресурс тоже входит в хеш: его появление
+            # меняет документ
+            entries.add((str(path), -1, -1))
+            continue
+        if stat_module.S_ISDIR(stat.st_mode):
+            continue
+        entries.add((str(path), stat.st_size, stat.st_mtime_ns))
+        if path.suffix.lower() == ".css":
+            with open(path, encoding="utf-8", errors="replace") as f:
+                css = f.read()
+            css_url = path.as_uri()
+            queue.extend((ref, css_url) for ref in resource_references(css))
+
+    digest = hashlib.sha256()
+    for name, size, mtime_ns in sorted(entries):
+        digest.update(f"{name}\0{size}\0{mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def make_url_fetcher(cache: Optional[AssetCache] = None) -> Any:
+    """Создать url_fetcher WeasyPrint, читающий локальные файлы из кеша.
+
+    Поддерживаются оба API WeasyPrint: класс URLFetcher (68+) и функция,
+    возвращающая словарь (более ранние версии).
+    """
+    assets = cache if cache is not None else shared_asset_cache()
+
+    try:
+        from weasyprint.urls import (  # type: ignore
+            URLFetcher,
+            URLFetcherResponse,
+        )
+    except ImportError:
+        from weasyprint import default_url_fetcher  # type: ignore
+
+        def fetch(url: str, *args: Any, **kwargs: Any) -> dict[str, Any]:
+            path = _local_path(url)
+            if path is None:
+                return default_url_fetcher(url, *args, **kwargs)
+            data, mime_type = assets.get(path)
+            return {
+                "string": data,
+                "mime_type": mime_type,
+                "redirected_url": url,
+                "filename": path.name,
+            }
+
+        return fetch
+
+    class CachingURLFetcher(URLFetcher):  # type: ignore[misc, valid-type]
+        """URLFetcher, читающий локальные файлы из кеша ресурсов."""
+
+        def fetch(self, url: str, headers: Optional[Any] = None) -> Any:
+            path = _local_path(url)
+            if path is None:
+                return super().fetch(url, headers)
+            data, mime_type = assets.get(path)
+            return URLFetcherResponse(url, data, {"Content-Type": mime_type})
+
+    return CachingURLFetcher()
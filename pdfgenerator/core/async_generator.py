@@ -0,0 +1,206 @@
+"""Асинхронная генерация PDF для приложений на asyncio."""
+
+import asyncio
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from .file_manager import atomic_write
+
+if TYPE_CHECKING:
+    from .generator import PDFGenerator
+    from .pool import RenderPool
+
+# PDFGenerator каждого потока (режим executor="thread")
+_thread_state = threading.local()
+
+
+def _thread_generator(generator_options: dict[str, Any]) -> "PDFGenerator":
+    """Получить PDFGenerator текущего потока (создается один раз)."""
+    generator = getattr(_thread_state, "generator", None)
+    if generator is None:
+        from .generator import PDFGenerator
+
+        generator = PDFGenerator(**generator_options)
+        generator.warm_up()
+        _thread_state.generator = generator
+    return generator
+
+
+def _render_in_thread(
+    html_content: str, generator_options: dict[str, Any]
+) -> bytes:
+    """Сгенерировать PDF в потоке пула."""
+    return _thread_generator(generator_options).generate_bytes(html_content)
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    """Записать файл атомарно (выполняется вне цикла событий)."""
+    with atomic_write(path) as f:
+        f.write(data)
+
+
+class AsyncPDFGenerator:
+    """Генерация PDF без блокировки цикла событий asyncio.
+
+    Верстка выполняется в пуле процессов (executor="process", по умолчанию)
+    или потоков (executor="thread") с прогретыми экземплярами PDFGenerator.
+    Число одновременных генераций ограничено max_concurrency: остальные
+    вызовы ждут своей очереди, не занимая пул.
+
+    Отмена вызова (или истечение timeout) снимает задание, если оно еще не
+    начато; уже начатая верстка в процессе доводится до конца, но результат
+    отбрасывается.
+
+    Если процесс пула упал (OOM, сбой в WeasyPrint), затронутые вызовы
+    завершаются с RuntimeError, а следующие получают новый пул.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        workers: Optional[int] = None,
+        executor: str = "process",
+        timeout: Optional[float] = None,
+        generator_options: Optional[dict[str, Any]] = None,
+    ):
+        if executor not in ("process", "thread"):
+            raise ValueError(f"Неизвестный тип пула: {executor}")
+        self.max_concurrency = max(1, max_concurrency)
+        self.workers = workers or self.max_concurrency
+        self.executor = executor
+        self.timeout = timeout
+        self.generator_options = generator_options or {}
+        self._pool: Optional[RenderPool] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        # Семафор создается внутри цикла событий при первом вызове
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncPDFGenerator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def _get_pool(self) -> "RenderPool":
+        """Получить (или создать) пул процессов."""
+        if self._pool is None:
+            from .pool import RenderPool
+
+            self._pool = RenderPool(
+                self.workers,
+                generator_options=self.generator_options,
+                collect_metrics=False,
+            )
+        return self._pool
+
+    def _get_threads(self) -> ThreadPoolExecutor:
+        """Получить (или создать) пул потоков."""
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="pdfgen"
+            )
+        return self._threads
+
+    def _submit(self, html_content: str) -> "Future[bytes]":
+        """Отправить HTML в пул и получить future с байтами PDF."""
+        if self.executor == "thread":
+            return self._get_threads().submit(
+                _render_in_thread, html_content, self.generator_options
+            )
+        return self._get_pool().submit_html(html_content)
+
+    async def start(self) -> None:
+        """Заранее запустить пул и загрузить WeasyPrint."""
+        if self.executor == "process":
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._get_pool().warm_up)
+            return
+
+        # Одновременные задания заставляют пул запустить все потоки
+        threads = self._get_threads()
+        await asyncio.gather(
+            *(
+                asyncio.wrap_future(
+                    threads.submit(_thread_generator, self.generator_options)
+                )
+                for _ in range(self.workers)
+            )
+        )
+
+    async def aclose(self) -> None:
+        """Остановить пул (дождавшись начатых заданий)."""
+        loop = asyncio.get_running_loop()
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await loop.run_in_executor(None, pool.close)
+        if self._threads is not None:
+            threads, self._threads = self._threads, None
+            await loop.run_in_executor(None, threads.shutdown)
+
+    async def _generate(
+        self, html_content: str, output_path: Optional[Path]
+    ) -> Optional[bytes]:
+        """Сгенерировать PDF, соблюдая ограничение параллельности."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            try:
+                # Отмена asyncio future отменяет и задание в пуле
+                pdf_bytes = await asyncio.wrap_future(
+                    self._submit(html_content)
+                )
+            except BrokenProcessPool:
+                # Следующие вызовы получат новый пул процессов
+                if self._pool is not None:
+                    self._pool.recover()
+                raise RuntimeError(
+                    "процесс генерации завершился аварийно, пул перезапущен"
+                ) from None
+
+        if output_path is None:
+            return pdf_bytes
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _write_file, output_path, pdf_bytes)
+        return None
+
+    async def generate(
+        self,
+        html_content: str,
+        output_path: Optional[Path] = None,
+        timeout: Optional[float] = None,
+    ) -> Optional[bytes]:
+        """Сгенерировать PDF: записать в output_path или вернуть байты.
+
+        timeout (по умолчанию - заданный в конструкторе) ограничивает
+        общее время ожидания, включая очередь; по его истечении
+        выбрасывается asyncio.TimeoutError.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        return await asyncio.wait_for(
+            self._generate(html_content, output_path), timeout
+        )
+
+    async def generate_many(
+        self,
+        documents: Iterable[tuple[str, Optional[Path]]],
+        timeout: Optional[float] = None,
+    ) -> list[Union[bytes, None, BaseException]]:
+        """Сгенерировать несколько PDF параллельно.
+
+        documents - пары (HTML, путь к PDF или None). Результаты идут в
+        порядке документов; ошибка одного документа возвращается как
+        исключение на его месте и не прерывает остальные.
+        """
+        return await asyncio.gather(
+            *(
+                self.generate(html_content, output_path, timeout)
+                for html_content, output_path in documents
+            ),
+            return_exceptions=True,
+        )
@@ -0,0 +1,333 @@
+"""Пакетная генерация PDF для всех записей файла данных."""
+
+import time
+from collections import deque
+from collections.abc import Collection, Iterable, Iterator, Mapping
+from itertools import chain
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from ..templates import TemplateRenderer
+from .file_manager import FileManager
+from .invoices import find_invoice_key, get_invoice_id, make_output_filename
+from .shards import Shard, ShardManifest, shard_of
+
+if TYPE_CHECKING:
+    from .generator import PDFGenerator
+    from .journal import BatchJournal
+    from .render_cache import RenderCache
+
+# Задача: (invoice ID, запись, путь к выходному PDF)
+Task = tuple[str, Mapping[str, Any], Path]
+# Результат: (invoice ID, путь к PDF, хеш содержимого, пропущен ли PDF
+# как актуальный, текст ошибки или None)
+TaskResult = tuple[str, Path, Optional[str], bool, Optional[str]]
+
+
+class BatchStats:
+    """Статистика пакетного запуска."""
+
+    def __init__(self) -> None:
+        self.processed = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.errors: list[tuple[str, str]] = []
+        # Ошибка, прервавшая запуск (чтение данных, падение пула процессов);
+        # результаты записей до нее сохраняются
+        self.aborted: Optional[str] = None
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+
+    def finish(self) -> None:
+        """Зафиксировать время окончания запуска."""
+        self._finished = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        """Время работы в секундах."""
+        if self._finished is not None:
+            return self._finished - self._started
+        return time.perf_counter() - self._started
+
+    @property
+    def rate(self) -> float:
+        """Пропускная способность (записей в секунду)."""
+        elapsed = self.elapsed
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+
+class BatchRenderer:
+    """Генерация PDF для множества записей за один запуск."""
+
+    def __init__(
+        self,
+        file_manager: FileManager,
+        template_renderer: Optional[TemplateRenderer] = None,
+        pdf_generator: Optional["PDFGenerator"] = None,
+        progress_every: int = 100,
+        on_progress: Optional[Callable[[BatchStats], None]] = None,
+        render_cache: Optional["RenderCache"] = None,
+        generator_options: Optional[dict[str, Any]] = None,
+        shard_manifest: Optional[ShardManifest] = None,
+        journal: Optional["BatchJournal"] = None,
+    ):
+        self.file_manager = file_manager
+        self.template_renderer = template_renderer or TemplateRenderer()
+        self._pdf_generator = pdf_generator
+        self.progress_every = max(1, progress_every)
+        self.on_progress = on_progress
+        # Если задан, PDF с неизменившимся содержимым не генерируются заново
+        self.render_cache = render_cache
+        # Параметры PDFGenerator (в том числе для воркеров пула)
+        self.generator_options = generator_options or {}
+        # Если задан, в него записываются результаты всех записей шарда
+        self.shard_manifest = shard_manifest
+        # Если задан, результаты записей дописываются в журнал, а записи,
+        # завершенные в прошлых запусках, пропускаются (см. core.journal)
+        self.journal = journal
+
+    @property
+    def pdf_generator(self) -> "PDFGenerator":
+        """Единственный PDFGenerator на весь запуск (ленивая загрузка)."""
+        if self._pdf_generator is None:
+            from .generator import PDFGenerator
+
+            self._pdf_generator = PDFGenerator(**self.generator_options)
+        return self._pdf_generator
+
+    def run(
+        self,
+        data: Iterable[Mapping[str, Any]],
+        template_path: Path,
+        ids: Optional[Collection[str]] = None,
+        limit: Optional[int] = None,
+        workers: int = 1,
+        chunksize: int = 16,
+        shard: Optional[Shard] = None,
+    ) -> BatchStats:
+        """Сгенерировать PDF для всех записей (или для выбранных ID).
+
+        shard=(K, N) - обработать только записи шарда K из N (см.
+        core.shards).
+        """
+        stats = BatchStats()
+        tasks = self._iter_tasks(data, ids, limit, shard)
+        journal = self.journal
+        if journal is not None:
+            tasks = journal.filter(tasks)
+        if self.shard_manifest is not None:
+            # Упавший шард должен быть виден как незавершенный
+            self.shard_manifest.save(complete=False)
+
+        if workers != 1:
+            results = self._run_pool(tasks, template_path, workers, chunksize)
+        else:
+            results = self._run_serial(tasks, template_path)
+
+        cache = self.render_cache
+        manifest = self.shard_manifest
+        try:
+            for invoice_id, output_path, digest, skipped, error in results:
+                stats.processed += 1
+                if manifest is not None:
+                    manifest.add(invoice_id, output_path, digest, error)
+                if journal is not None:
+                    journal.record(invoice_id, output_path, error)
+                if error is not None:
+                    stats.failed += 1
+                    stats.errors.append((invoice_id, error))
+                    if cache is not None:
+                        cache.discard(output_path)
+                elif skipped:
+                    stats.skipped += 1
+                else:
+                    stats.succeeded += 1
+                    if cache is not None and digest is not None:
+                        cache.update(output_path, digest)
+
+                self._report_progress(stats)
+        except Exception as e:
+            stats.aborted = str(e)
+
+        if cache is not None:
+            cache.save()
+        if manifest is not None:
+            manifest.save(complete=stats.aborted is None)
+        stats.finish()
+        return stats
+
+    def run_combined(
+        self,
+        data: Iterable[Mapping[str, Any]],
+        template_path: Path,
+        output_path: Path,
+        ids: Optional[Collection[str]] = None,
+        limit: Optional[int] = None,
+        max_documents: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> tuple[BatchStats, list[Path]]:
+        """Сгенерировать один общий PDF (или несколько частей) для записей.
+
+        Страницы документов не передаются между процессами, поэтому этот
+        режим работает в текущем процессе.
+        max_documents и max_bytes - размер частей (см. CombinedPDFWriter).
+        Счет считается успешным, только когда записана его часть; ошибка
+        записи части прерывает запуск, а счета этой части - ошибки.
+        """
+        from .combined import CombinedPDFWriter, PartWriteError
+
+        stats = BatchStats()
+        template = self.template_renderer.load(template_path)
+        writer = CombinedPDFWriter(
+            self.pdf_generator, output_path, max_documents, max_bytes
+        )
+        # Счета части, которая еще не записана
+        pending: list[str] = []
+
+        def part_written() -> None:
+            stats.succeeded += len(pending)
+            pending.clear()
+
+        def part_lost(error: PartWriteError) -> None:
+            stats.aborted = str(error)
+            stats.failed += len(pending)
+            stats.errors.extend(
+                (invoice_id, str(error)) for invoice_id in pending
+            )
+            pending.clear()
+
+        tasks = self._iter_tasks(data, ids, limit)
+        try:
+            for invoice_id, record, _ in tasks:
+                stats.processed += 1
+                parts = len(writer.parts)
+                try:
+                    html_content = self.template_renderer.render(
+                        template, record
+                    )
+                    # Заполненная часть записывается внутри add
+                    writer.add(html_content)
+                except PartWriteError:
+                    pending.append(invoice_id)
+                    raise
+                except Exception as e:
+                    stats.failed += 1
+                    stats.errors.append((invoice_id, str(e)))
+                else:
+                    pending.append(invoice_id)
+                    if len(writer.parts) > parts:
+                        part_written()
+                self._report_progress(stats)
+        except PartWriteError as e:
+            part_lost(e)
+        except Exception as e:
+            # Уже собранные страницы записываются ниже
+            stats.aborted = str(e)
+
+        try:
+            writer.close()
+        except PartWriteError as e:
+            part_lost(e)
+        else:
+            part_written()
+
+        stats.finish()
+        return stats, writer.parts
+
+    def _report_progress(self, stats: BatchStats) -> None:
+        """Сообщить о прогрессе каждые progress_every записей."""
+        if (
+            self.on_progress is not None
+            and stats.processed % self.progress_every == 0
+        ):
+            self.on_progress(stats)
+
+    def _iter_tasks(
+        self,
+        data: Iterable[Mapping[str, Any]],
+        ids: Optional[Collection[str]],
+        limit: Optional[int],
+        shard: Optional[Shard] = None,
+    ) -> Iterator[Task]:
+        """Отобрать записи и вычислить пути к выходным файлам."""
+
+        # Данные могут быть потоком: ключ invoice ID ищем по первой записи
+        records = iter(data)
+        first = next(records, None)
+        if first is None:
+            return
+        invoice_key = find_invoice_key([first])
+        count = 0
+
+        for index, record in enumerate(chain([first], records)):
+            if limit is not None and count >= limit:
+                return
+
+            invoice_id = get_invoice_id(record, invoice_key, index)
+            if ids is not None and invoice_id not in ids:
+                continue
+            if shard is not None:
+                shard_index, shard_count = shard
+                if shard_of(invoice_id, shard_count) != shard_index:
+                    continue
+
+            count += 1
+            output_path = self.file_manager.get_output_path(
+                make_output_filename(invoice_id)
+            )
+            yield invoice_id, record, output_path
+
+    def _run_serial(
+        self, tasks: Iterable[Task], template_path: Path
+    ) -> Iterator[TaskResult]:
+        """Генерировать PDF последовательно в текущем процессе."""
+        template = self.template_renderer.load(template_path)
+        cache = self.render_cache
+
+        for invoice_id, record, output_path in tasks:
+            try:
+                html_content = self.template_renderer.render(template, record)
+                digest = self.pdf_generator.fingerprint(html_content)
+                if cache is not None and cache.is_fresh(output_path, digest):
+                    yield invoice_id, output_path, digest, True, None
+                    continue
+                self.pdf_generator.generate(html_content, output_path)
+                yield invoice_id, output_path, digest, False, None
+            except Exception as e:
+                yield invoice_id, output_path, None, False, str(e)
+
+    def _run_pool(
+        self,
+        tasks: Iterable[Task],
+        template_path: Path,
+        workers: int,
+        chunksize: int,
+    ) -> Iterator[TaskResult]:
+        """Генерировать PDF в пуле процессов."""
+        from .pool import RenderJob, RenderPool
+
+        # Результаты пула приходят в порядке заданий, поэтому invoice ID
+        # сопоставляются через очередь
+        pending_ids: deque[str] = deque()
+        template = str(template_path.resolve())
+        cache = self.render_cache
+
+        def jobs() -> Iterator[RenderJob]:
+            for invoice_id, record, output_path in tasks:
+                pending_ids.append(invoice_id)
+                # Сравнение с хешем из манифеста выполняется в воркере,
+                # после рендеринга HTML
+                cached_digest = (
+                    cache.get(output_path) if cache is not None else None
+                )
+                yield record, template, str(output_path), cached_digest
+
+        with RenderPool(
+            workers or None,
+            chunksize,
+            generator_options=self.generator_options,
+        ) as pool:
+            for output_path, digest, skipped, error in pool.imap(jobs()):
+                invoice_id = pending_ids.popleft()
+                yield invoice_id, Path(output_path), digest, skipped, error
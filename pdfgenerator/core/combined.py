@@ -0,0 +1,135 @@
+"""Сборка многих документов в один PDF (с разбиением на части)."""
+
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from . import metrics
+from .file_manager import atomic_write
+
+if TYPE_CHECKING:
+    from .generator import PDFGenerator
+
+# Сколько документов по умолчанию собирается в одну часть: страницы части
+# держатся в памяти до ее записи
+DEFAULT_MAX_DOCUMENTS = 1000
+
+
+class PartWriteError(RuntimeError):
+    """Не удалось записать часть общего PDF (ее страницы потеряны)."""
+
+
+class CombinedPDFWriter:
+    """Собирает страницы сверстанных документов в общий PDF.
+
+    Каждый документ (счет) начинается с новой страницы. WeasyPrint пишет
+    PDF целиком, поэтому страницы текущей части держатся в памяти до ее
+    записи, а число документов в части ограничено: max_documents (по
+    умолчанию DEFAULT_MAX_DOCUMENTS, 0 - без ограничения) и max_bytes.
+    Если частей больше одной, они называются <имя>_001.pdf, <имя>_002.pdf,
+    ...; единственная часть записывается под исходным именем.
+
+    Размер части оценивается по среднему размеру страницы: до первой
+    части - по PDF первого документа (с учетом шрифтов оценка завышена,
+    и части получаются меньше лимита), затем - по уже записанным частям.
+    Поэтому лимит по размеру приблизительный.
+    """
+
+    def __init__(
+        self,
+        pdf_generator: "PDFGenerator",
+        output_path: Path,
+        max_documents: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.pdf_generator = pdf_generator
+        self.output_path = output_path
+        if max_documents is None:
+            max_documents = DEFAULT_MAX_DOCUMENTS
+        self.max_documents = max_documents or None
+        self.max_bytes = max_bytes
+        self.parts: list[Path] = []
+        self._document: Optional[Any] = None
+        self._pages: list[Any] = []
+        self._documents = 0
+        self._bytes_per_page: Optional[float] = None
+
+    def __enter__(self) -> "CombinedPDFWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def add(self, html_content: str) -> None:
+        """Сверстать документ и добавить его страницы в текущую часть."""
+        document = self.pdf_generator.render_document(html_content)
+        if self.max_bytes is not None and self._bytes_per_page is None:
+            # Оценка размера страницы до записи первой части
+            with metrics.stage("pdf.write"):
+                size = len(document.write_pdf())
+            self._bytes_per_page = size / max(1, len(document.pages))
+        if self._document is None:
+            # Метаданные части берутся из первого документа
+            self._document = document
+        self._pages.extend(document.pages)
+        self._documents += 1
+
+        if self._is_full():
+            self.flush()
+
+    def _is_full(self) -> bool:
+        """Проверить, пора ли записать текущую часть."""
+        if (
+            self.max_documents is not None
+            and self._documents >= self.max_documents
+        ):
+            return True
+        return (
+            self.max_bytes is not None
+            and self._bytes_per_page is not None
+            and len(self._pages) * self._bytes_per_page >= self.max_bytes
+        )
+
+    def _numbered_path(self, number: int) -> Path:
+        """Получить путь к части с номером."""
+        return self.output_path.with_name(
+            f"{self.output_path.stem}_{number:03d}{self.output_path.suffix}"
+        )
+
+    def flush(self) -> None:
+        """Записать накопленные страницы в очередной PDF файл.
+
+        Если записать часть не удалось (например, нет места на диске),
+        ее страницы отбрасываются и выбрасывается PartWriteError.
+        """
+        if self._document is None:
+            return
+
+        document, pages = self._document, self._pages
+        self._document = None
+        self._pages = []
+        self._documents = 0
+        try:
+            if self.parts == [self.output_path]:
+                # Частей больше одной: первая тоже получает номер
+                first = self._numbered_path(1)
+                os.replace(self.output_path, first)
+                self.parts[0] = first
+            if self.parts:
+                path = self._numbered_path(len(self.parts) + 1)
+            else:
+                path = self.output_path
+            with metrics.stage("pdf.write"), atomic_write(path) as f:
+                document.copy(pages).write_pdf(f)
+            size = path.stat().st_size
+        except Exception as e:
+            raise PartWriteError(f"не удалось записать общий PDF: {e}") from e
+
+        # Уточняем оценку размера страницы для следующих частей
+        self._bytes_per_page = size / max(1, len(pages))
+        self.parts.append(path)
+
+    def close(self) -> list[Path]:
+        """Записать последнюю часть и вернуть список созданных файлов."""
+        self.flush()
+        return self.parts
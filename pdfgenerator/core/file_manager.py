@@ -1,7 +1,48 @@
 """Менеджер для работы с файлами."""
 
+import os
+import secrets
+from collections.abc import Collection, Iterator, Mapping, Sequence
+from contextlib import contextmanager, suppress
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Optional
+
+from . import metrics
+from .invoices import INVOICE_KEYS
+
+# Поля, которые читаются всегда: invoice ID и признак строки-позиции
+# (без них нельзя собрать строки плоского формата в счета)
+_KEY_FIELDS = frozenset([*INVOICE_KEYS, "item_name"])
+
+
+def _with_key_fields(
+    fields: Optional[Collection[str]],
+) -> Optional[frozenset[str]]:
+    """Добавить к набору полей обязательные ключевые поля."""
+    if fields is None:
+        return None
+    return _KEY_FIELDS.union(fields)
+
+
+@contextmanager
+def atomic_write(path: Path) -> Iterator[BinaryIO]:
+    """Записать файл атомарно: во временный файл рядом и затем rename.
+
+    Пока запись не завершена, файла с именем path нет (или остается его
+    прежняя версия), поэтому прерванная генерация не оставляет
+    недописанных PDF, похожих на готовые.
+    """
+    # Не mkstemp: права временного файла (и PDF) должны определяться
+    # umask, как у обычного open
+    tmp_path = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+    try:
+        with open(tmp_path, "xb") as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
 
 
 class FileManager:
@@ -12,10 +53,13 @@ class FileManager:
         data_dir: str = "data",
         templates_dir: str = "templates",
         output_dir: str = "output",
+        csv_engine: str = "auto",
     ):
         self.data_dir = Path(data_dir)
         self.templates_dir = Path(templates_dir)
         self.output_dir = Path(output_dir)
+        # Способ чтения CSV целиком: "auto", "pandas" или "stdlib"
+        self.csv_engine = csv_engine
 
         # Создаем директории, если их нет
         self.data_dir.mkdir(exist_ok=True)
@@ -24,12 +68,13 @@ class FileManager:
 
     def get_data_files(self) -> list[Path]:
         """Получить список всех файлов данных."""
+        # Список расширений берется из реестра адаптеров: модули встроенных
+        # адаптеров и плагинов при этом не импортируются
+        from ..adapters import supported_extensions
+
         data_files: list[Path] = []
         if self.data_dir.exists():
-            # Используем фиксированный список расширений для ускорения
-            # без импорта адаптеров при старте
-            extensions = [".json", ".csv", ".xlsx"]
-            for ext in extensions:
+            for ext in supported_extensions():
                 data_files.extend(self.data_dir.glob(f"*{ext}"))
         return sorted(data_files)
 
@@ -40,13 +85,105 @@ class FileManager:
             templates = list(self.templates_dir.glob("*.html"))
         return sorted(templates)
 
-    def load_data_file(self, file_path: Path) -> list[dict[str, Any]]:
-        """Загрузить данные из файла."""
+    def load_data_file(
+        self, file_path: Path, fields: Optional[Collection[str]] = None
+    ) -> Sequence[Mapping[str, Any]]:
+        """Загрузить данные из файла.
+
+        Таблицы CSV/XLSX, в которых счет занимает одну строку, остаются в
+        столбцовом представлении: записи - легкие RowView, а значения
+        читаются из столбцов только при обращении. Если задан fields
+        (например, TemplateRenderer.required_fields), читаются только эти
+        поля и поля, нужные для invoice ID и группировки позиций.
+        """
         # Ленивый импорт адаптеров только когда нужно читать файл
+        from ..adapters import (
+            ColumnarTable,
+            get_adapter,
+            group_line_items,
+            group_line_items_table,
+            has_line_items,
+        )
+
+        with metrics.stage("data.adapter"):
+            adapter = get_adapter(file_path, self.csv_engine)
+        with metrics.stage("data.read"):
+            records = adapter.read_table(file_path, _with_key_fields(fields))
+            if not records or not has_line_items(records[0]):
+                return records
+            # Строки с позициями (item_name) собираются в счета; данные уже
+            # в памяти, поэтому порядок строк не важен. Позиции из числовых
+            # столбцов таблицы остаются столбцами
+            if isinstance(records, ColumnarTable):
+                return group_line_items_table(records)
+            return list(
+                group_line_items(
+                    records, assume_sorted=False, max_rows_in_memory=None
+                )
+            )
+
+    def iter_data_file(
+        self,
+        file_path: Path,
+        assume_sorted: bool = True,
+        fields: Optional[Collection[str]] = None,
+    ) -> Iterator[Mapping[str, Any]]:
+        """Читать данные из файла потоково, по одной записи.
+
+        Если строки одного счета в плоском файле идут не подряд, нужно
+        передать assume_sorted=False. fields - как в load_data_file.
+        """
+        from ..adapters import get_adapter, group_line_items
+
+        with metrics.stage("data.adapter"):
+            adapter = get_adapter(file_path, self.csv_engine)
+        # При потоковом чтении замеряется получение каждой записи
+        return iter(
+            metrics.timed_iter(
+                "data.read",
+                group_line_items(
+                    adapter.iter_records(file_path, _with_key_fields(fields)),
+                    assume_sorted=assume_sorted,
+                ),
+            )
+        )
+
+    def find_record(
+        self,
+        file_path: Path,
+        invoice_id: str,
+        fields: Optional[Collection[str]] = None,
+        use_index: bool = True,
+    ) -> Optional[Mapping[str, Any]]:
+        """Найти счет по invoice ID (None, если его нет в файле).
+
+        С use_index=True рядом с файлом строится индекс invoice ID ->
+        позиции строк (один раз, до изменения файла), и читаются только
+        строки нужного счета. Иначе файл просматривается потоково.
+        fields - как в load_data_file.
+        """
         from ..adapters import get_adapter
+        from .invoices import find_invoice_key, get_invoice_id
+        from .record_index import RecordIndex
+
+        fields = _with_key_fields(fields)
+        if use_index:
+            with metrics.stage("data.adapter"):
+                adapter = get_adapter(file_path, self.csv_engine)
+            index = RecordIndex(file_path, adapter)
+            index.ensure()
+            return index.find(invoice_id, fields)
 
-        adapter = get_adapter(file_path)
-        return adapter.read(file_path)
+        invoice_key: Optional[str] = None
+        records = self.iter_data_file(
+            file_path, assume_sorted=False, fields=fields
+        )
+        for number, record in enumerate(records):
+            if number == 0:
+                invoice_key = find_invoice_key([record])
+            if get_invoice_id(record, invoice_key, number) == invoice_id:
+                return record
+        return None
 
     def load_template(self, template_path: Path) -> str:
         """Загрузить HTML шаблон."""
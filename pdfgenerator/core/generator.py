@@ -1,16 +1,51 @@
 """Генератор PDF документов."""
 
+import hashlib
 import os
 import platform
+import re
 import sys
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, BinaryIO, Optional, Union
+
+from . import metrics
+from .file_manager import atomic_write
 
 # Глобальные переменные для ленивой загрузки WeasyPrint
 _CSS: Optional[Any] = None
 _HTML: Optional[Any] = None
 _FontConfiguration: Optional[Any] = None
 
+# Базовые стили страницы, применяемые ко всем документам
+BASE_STYLESHEET = """
+@page {
+    size: A4;
+    margin: 2cm;
+}
+body {
+    font-family: "DejaVu Sans", "Roboto", Arial, sans-serif;
+    font-size: 12pt;
+}
+"""
+
+# Блоки <style> в HTML документе: (атрибуты, CSS)
+_STYLE_PATTERN = re.compile(
+    r"<style([^>]*)>(.*?)</style\s*>", re.IGNORECASE | re.DOTALL
+)
+# Атрибут media блока <style>
+_MEDIA_PATTERN = re.compile(
+    r"""\bmedia\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE
+)
+
+# Как часто (в секундах) пересчитывается хеш ресурсов документа
+_ASSETS_DIGEST_TTL = 2.0
+
+# Минимальный документ для прогрева шрифтов и движка верстки
+_WARM_UP_HTML = "<html><body><p>PDF Generator</p></body></html>"
+
 
 def _setup_macos_libraries() -> None:
     """Настроить пути к системным библиотекам для macOS."""
@@ -51,6 +86,17 @@ def _setup_macos_libraries() -> None:
             os.environ["DYLD_FALLBACK_LIBRARY_PATH"] = lib_path
 
 
+@lru_cache(maxsize=1)
+def _weasyprint_version() -> str:
+    """Получить версию WeasyPrint без импорта самой библиотеки."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("weasyprint")
+    except PackageNotFoundError:
+        return "unknown"
+
+
 def _import_weasyprint() -> None:
     """Ленивый импорт WeasyPrint."""
     global _CSS, _HTML, _FontConfiguration
@@ -61,8 +107,11 @@ def _import_weasyprint() -> None:
     _setup_macos_libraries()
 
     try:
-        from weasyprint import CSS, HTML  # type: ignore
-        from weasyprint.text.fonts import FontConfiguration  # type: ignore
+        with metrics.stage("weasyprint.import"):
+            from weasyprint import CSS, HTML  # type: ignore
+            from weasyprint.text.fonts import (  # type: ignore
+                FontConfiguration,
+            )
 
         _CSS = CSS
         _HTML = HTML
@@ -75,43 +124,224 @@ def _import_weasyprint() -> None:
             print("brew install cairo pango gdk-pixbuf libffi glib")
             print("\nЕсли библиотеки установлены, но ошибка сохраняется,")
             print("попробуйте установить переменные окружения:")
-            print("export DYLD_LIBRARY_PATH=/opt/homebrew/lib:$DYLD_LIBRARY_PATH")
+            print(
+                "export DYLD_LIBRARY_PATH=/opt/homebrew/lib:$DYLD_LIBRARY_PATH"
+            )
         raise
 
 
+def _block_css(attributes: str, css: str) -> str:
+    """CSS блока <style> с учетом атрибута media (оборачивается в @media)."""
+    match = _MEDIA_PATTERN.search(attributes)
+    if match is None:
+        return css
+    media = (match.group(1) or match.group(2) or "").strip()
+    if not media or media.lower() == "all":
+        return css
+    return f"@media {media} {{\n{css}\n}}"
+
+
 class PDFGenerator:
     """Класс для генерации PDF документов."""
 
-    def __init__(self):
-        """Инициализация генератора (ленивая загрузка WeasyPrint)."""
+    def __init__(
+        self,
+        share_styles: bool = False,
+        style_cache_size: int = 16,
+        base_url: Optional[Union[str, Path]] = None,
+        cache_assets: bool = True,
+    ):
+        """Инициализация генератора (ленивая загрузка WeasyPrint).
+
+        Если share_styles=True, блоки <style> извлекаются из HTML и
+        разбираются один раз: разобранные стили переиспользуются для всех
+        документов с тем же CSS (например, для всех счетов одного шаблона).
+
+        base_url (обычно директория шаблонов) - откуда разрешаются
+        относительные ссылки документа: логотип, шрифты, файлы CSS. С
+        cache_assets=True локальные ресурсы читаются один раз на процесс
+        (см. core.assets).
+        """
+        from .assets import to_base_url
+
+        self.share_styles = share_styles
+        self.style_cache_size = style_cache_size
+        self.base_url = to_base_url(base_url) if base_url else None
+        self.cache_assets = cache_assets
         self._font_config: Optional[Any] = None
         self._css: Optional[Any] = None
+        self._url_fetcher: Optional[Any] = None
+        # LRU кеш разобранных стилей: текст CSS -> объект CSS
+        self._style_cache: OrderedDict[str, Any] = OrderedDict()
+        # Ссылки документа на ресурсы -> (хеш ресурсов, время вычисления)
+        self._assets_digests: OrderedDict[
+            tuple[str, ...], tuple[str, float]
+        ] = OrderedDict()
 
     def _ensure_weasyprint(self) -> None:
         """Убедиться, что WeasyPrint загружен."""
         if self._font_config is None:
             _import_weasyprint()
+            if self.cache_assets:
+                from .assets import make_url_fetcher
+
+                self._url_fetcher = make_url_fetcher()
             self._font_config = _FontConfiguration()
             self._css = _CSS(
-                string="""
-                @page {
-                    size: A4;
-                    margin: 2cm;
-                }
-                body {
-                    font-family: "DejaVu Sans", "Roboto", Arial, sans-serif;
-                    font-size: 12pt;
-                }
-            """,
+                string=BASE_STYLESHEET, font_config=self._font_config
+            )
+
+    def warm_up(self) -> None:
+        """Заранее загрузить WeasyPrint и прогреть конфигурацию шрифтов."""
+        self._ensure_weasyprint()
+        # Верстка тестового документа загружает шрифты и кеши Pango, чтобы
+        # первый настоящий документ не платил за это
+        self._parse(_WARM_UP_HTML).render(
+            stylesheets=[self._css], font_config=self._font_config
+        )
+
+    def _extract_styles(self, html_content: str) -> tuple[str, list[Any]]:
+        """Извлечь блоки <style> из HTML и получить разобранные стили."""
+        blocks = _STYLE_PATTERN.findall(html_content)
+        if not blocks:
+            return html_content, []
+
+        css_text = "\n".join(_block_css(attrs, css) for attrs, css in blocks)
+        css = self._style_cache.get(css_text)
+        if css is None:
+            assert _CSS is not None
+            # Стили без документа: ссылки в них (url(...) в @font-face,
+            # @import) разрешаются от base_url
+            css = _CSS(
+                string=css_text,
                 font_config=self._font_config,
+                base_url=self.base_url,
+                url_fetcher=self._url_fetcher,
+            )
+            self._style_cache[css_text] = css
+            if len(self._style_cache) > self.style_cache_size:
+                self._style_cache.popitem(last=False)
+        else:
+            self._style_cache.move_to_end(css_text)
+
+        return _STYLE_PATTERN.sub("", html_content), [css]
+
+    def _get_stylesheets(self, html_content: str) -> tuple[str, list[Any]]:
+        """Получить HTML и список таблиц стилей для генерации PDF."""
+        if not self.share_styles:
+            return html_content, [self._css]
+        # Переданные в WeasyPrint стили имеют приоритет "user", поэтому
+        # стили шаблона идут после базовых, чтобы переопределять их, как
+        # это происходит со стилями внутри документа
+        html_content, shared_styles = self._extract_styles(html_content)
+        return html_content, [self._css, *shared_styles]
+
+    def fingerprint(self, html_content: str) -> str:
+        """Хеш входных данных PDF: HTML, стили, WeasyPrint и параметры."""
+        digest = hashlib.sha256()
+        parts = [html_content, BASE_STYLESHEET, _weasyprint_version()]
+        # Стили шаблона с приоритетом "user" могут изменить результат.
+        # Параметры по умолчанию в хеш не входят, чтобы не сбрасывать
+        # манифесты прошлых запусков
+        if self.share_styles:
+            parts.append("share_styles")
+        # Те же относительные ссылки в другой директории шаблонов -
+        # другие ресурсы; изменившиеся логотип, шрифты или CSS меняют хеш
+        if self.base_url:
+            parts.append(self.base_url)
+            parts.append(self._get_assets_digest(html_content))
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _get_assets_digest(self, html_content: str) -> str:
+        """Хеш ресурсов, на которые ссылается HTML (с кешем на TTL).
+
+        Документы одного шаблона ссылаются на одни и те же ресурсы, поэтому
+        хеш кешируется по набору ссылок и пересчитывается не чаще раза в
+        _ASSETS_DIGEST_TTL секунд.
+        """
+        from .assets import resource_references, resources_digest
+
+        assert self.base_url is not None
+        references = tuple(sorted(set(resource_references(html_content))))
+        now = time.monotonic()
+        cached = self._assets_digests.get(references)
+        if cached is not None and now - cached[1] < _ASSETS_DIGEST_TTL:
+            self._assets_digests.move_to_end(references)
+            return cached[0]
+
+        digest = resources_digest(html_content, self.base_url)
+        self._assets_digests[references] = (digest, now)
+        self._assets_digests.move_to_end(references)
+        if len(self._assets_digests) > self.style_cache_size:
+            self._assets_digests.popitem(last=False)
+        return digest
+
+    def _parse(self, html_content: str) -> Any:
+        """Создать HTML документ WeasyPrint с base_url и url_fetcher."""
+        return _HTML(
+            string=html_content,
+            base_url=self.base_url,
+            url_fetcher=self._url_fetcher,
+        )
+
+    def render_document(self, html_content: str) -> Any:
+        """Сверстать HTML в документ WeasyPrint (без записи PDF)."""
+        self._ensure_weasyprint()
+        html_content, stylesheets = self._get_stylesheets(html_content)
+        with metrics.stage("pdf.parse"):
+            document = self._parse(html_content)
+        with metrics.stage("pdf.layout"):
+            return document.render(
+                stylesheets=stylesheets, font_config=self._font_config
             )
 
+    def generate_bytes(self, html_content: str) -> bytes:
+        """Сгенерировать PDF из HTML контента и вернуть его байты."""
+        document = self.render_document(html_content)
+        with metrics.stage("pdf.write"):
+            pdf_bytes: bytes = document.write_pdf()
+        metrics.add_bytes("pdf.write", len(pdf_bytes))
+        return pdf_bytes
+
+    def generate_to_stream(self, html_content: str, stream: BinaryIO) -> None:
+        """Сгенерировать PDF и записать его в бинарный поток.
+
+        PDF пишется прямо в поток (сокет, файл, BytesIO), без промежуточной
+        копии в памяти.
+        """
+        document = self.render_document(html_content)
+        with metrics.stage("pdf.write"):
+            document.write_pdf(stream)
+
+    def generate_into(
+        self, html_content: str, buffer: Union[bytearray, memoryview]
+    ) -> int:
+        """Сгенерировать PDF в заранее выделенный буфер.
+
+        Возвращает размер PDF в байтах; если буфер меньше PDF,
+        выбрасывается ValueError, а буфер не изменяется.
+        """
+        pdf_bytes = self.generate_bytes(html_content)
+        view = memoryview(buffer).cast("B")
+        size = len(pdf_bytes)
+        if size > view.nbytes:
+            raise ValueError(
+                f"Буфер слишком мал для PDF: нужно {size} байт, "
+                f"доступно {view.nbytes}"
+            )
+        view[:size] = pdf_bytes
+        return size
+
     def generate(self, html_content: str, output_path: Path) -> None:
         """Сгенерировать PDF из HTML контента."""
-        self._ensure_weasyprint()
-        _HTML(string=html_content).write_pdf(
-            output_path, stylesheets=[self._css], font_config=self._font_config
-        )
+        pdf_bytes = self.generate_bytes(html_content)
+        # Запись файла замеряется отдельно от сериализации PDF
+        with metrics.stage("file.write"), atomic_write(output_path) as f:
+            f.write(pdf_bytes)
+        metrics.add_bytes("file.write", len(pdf_bytes))
 
     def open_pdf(self, pdf_path: Path) -> None:
         """Открыть PDF в системной программе."""
@@ -0,0 +1,35 @@
+"""Вспомогательные функции для работы с записями счетов."""
+
+from collections.abc import Mapping, Sequence
+from typing import Any, Optional
+
+# Возможные имена поля с invoice ID в порядке приоритета
+INVOICE_KEYS = ["invoice_id", "invoiceId", "invoice", "id", "ID"]
+
+
+def find_invoice_key(data: Sequence[Mapping[str, Any]]) -> Optional[str]:
+    """Найти ключ для invoice ID в данных."""
+    if not data:
+        return None
+
+    for key in INVOICE_KEYS:
+        if key in data[0]:
+            return key
+    return None
+
+
+def get_invoice_id(
+    record: Mapping[str, Any], invoice_key: Optional[str], index: int
+) -> str:
+    """Получить invoice ID записи (или порядковый номер, начиная с 1)."""
+    if invoice_key:
+        return str(record.get(invoice_key, index + 1))
+    return str(index + 1)
+
+
+def make_output_filename(invoice_id: str) -> str:
+    """Получить безопасное имя PDF файла для invoice ID."""
+    safe_invoice_id = "".join(
+        c for c in invoice_id if c.isalnum() or c in ("-", "_")
+    )
+    return f"invoice_{safe_invoice_id}.pdf"
@@ -0,0 +1,194 @@
+"""Журнал пакетного запуска для продолжения после сбоя (--resume).
+
+Журнал - файл JSON Lines в директории результатов, в который только
+дописываются события: начало запуска (с отпечатком файла данных), начало
+генерации записи, успешное завершение и ошибка. Каждая строка
+сбрасывается на диск сразу, поэтому после падения процесса (ошибка
+WeasyPrint, OOM) журнал содержит все завершенные записи. Недописанная
+последняя строка при чтении пропускается.
+
+При продолжении (resume=True) пропускаются записи, PDF которых уже
+созданы, а записи с ошибкой (или прерванные сбоем) генерируются заново,
+но не более max_retries повторов. Сбой последовательного запуска (один
+процесс) произошел на первой начатой, но не завершенной записи: попыткой
+считается только она. При нескольких процессах одновременно генерируется
+несколько пачек записей, и падение одного процесса прерывает их все, а
+виновника по журналу не определить, поэтому такой сбой не засчитывается
+ни одной записи; чтобы найти запись, на которой падает генерация,
+продолжите запуск с одним процессом.
+"""
+
+import json
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from .batch import Task
+
+# Имя журнала в директории результатов
+JOURNAL_NAME = ".batch_journal.jsonl"
+JOURNAL_VERSION = 1
+
+
+class BatchJournal:
+    """Журнал завершенных и неудавшихся записей пакетного запуска."""
+
+    def __init__(
+        self,
+        output_dir: Path,
+        data_path: Optional[Path] = None,
+        resume: bool = False,
+        max_retries: int = 2,
+        name: str = JOURNAL_NAME,
+        workers: int = 1,
+    ):
+        self.path = output_dir / name
+        self.max_retries = max_retries
+        self.data: dict[str, Any] = {}
+        if data_path is not None:
+            stat = data_path.stat()
+            self.data = {
+                "name": data_path.name,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+        # Записи с созданным PDF: invoice ID -> имя PDF файла
+        self.completed: dict[str, str] = {}
+        # Сколько раз начиналась генерация записи
+        self.attempts: dict[str, int] = {}
+        # Последняя ошибка записи, которая еще не сгенерирована
+        self.errors: dict[str, str] = {}
+        # Записи, пропущенные при продолжении запуска
+        self.skipped_completed = 0
+        self.skipped_exhausted: list[str] = []
+        # Начатые и не завершенные записи читаемого запуска (по порядку)
+        # и число его процессов
+        self._outstanding: dict[str, None] = {}
+        self._outstanding_workers = 1
+
+        if resume:
+            self._load()
+        self._file = open(  # noqa: SIM115
+            self.path, "a" if resume else "w", encoding="utf-8"
+        )
+        self._write(
+            {
+                "event": "run",
+                "version": JOURNAL_VERSION,
+                "workers": workers,
+                **self.data,
+            }
+        )
+
+    def __enter__(self) -> "BatchJournal":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _load(self) -> None:
+        """Прочитать журнал прошлых запусков (если он есть)."""
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # строка, недописанная при сбое
+                if isinstance(event, dict):
+                    self._apply(event)
+        self._settle_run()
+
+    def _settle_run(self) -> None:
+        """Учесть сбой, на котором оборвался запуск (если он был)."""
+        if not self._outstanding:
+            return
+        outstanding = list(self._outstanding)
+        self._outstanding = {}
+        if self._outstanding_workers == 1:
+            # Сбой произошел на первой незавершенной записи; остальные
+            # начатые записи ждали в очереди и попыткой не считаются
+            culprit, *queued = outstanding
+            self.errors.setdefault(culprit, "генерация прервана сбоем")
+        else:
+            # Упавший процесс прервал все начатые пачки: виновник неизвестен
+            queued = outstanding
+        for invoice_id in queued:
+            self.attempts[invoice_id] -= 1
+
+    def _apply(self, event: dict[str, Any]) -> None:
+        """Учесть событие журнала."""
+        kind = event.get("event")
+        if kind == "run":
+            self._settle_run()
+            # В журналах без числа процессов запуск считается
+            # последовательным
+            self._outstanding_workers = event.get("workers", 1)
+            data = {key: event.get(key) for key in self.data}
+            if event.get("version") != JOURNAL_VERSION or data != self.data:
+                raise ValueError(
+                    f"Журнал {self.path.name} относится к другому файлу "
+                    "данных или его версии; запустите без --resume"
+                )
+            return
+        invoice_id = str(event.get("id"))
+        if kind == "start":
+            self.attempts[invoice_id] = self.attempts.get(invoice_id, 0) + 1
+            self._outstanding[invoice_id] = None
+        elif kind == "done":
+            self._outstanding.pop(invoice_id, None)
+            self.completed[invoice_id] = str(event.get("file"))
+            self.errors.pop(invoice_id, None)
+        elif kind == "failed":
+            self._outstanding.pop(invoice_id, None)
+            self.completed.pop(invoice_id, None)
+            self.errors[invoice_id] = str(event.get("error"))
+
+    def _write(self, event: dict[str, Any]) -> None:
+        """Дописать событие и сразу сбросить его на диск."""
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def filter(self, tasks: Iterable["Task"]) -> Iterator["Task"]:
+        """Пропустить завершенные записи и записи без оставшихся попыток.
+
+        Для каждой пропущенной дальше записи в журнал пишется начало
+        генерации.
+        """
+        for task in tasks:
+            invoice_id, _, output_path = task
+            # PDF, удаленный после прошлого запуска, генерируется заново
+            if (
+                self.completed.get(invoice_id) == output_path.name
+                and output_path.exists()
+            ):
+                self.skipped_completed += 1
+                continue
+            attempts = self.attempts.get(invoice_id, 0)
+            if invoice_id in self.errors and attempts > self.max_retries:
+                self.skipped_exhausted.append(invoice_id)
+                continue
+            self.attempts[invoice_id] = attempts + 1
+            self._write({"event": "start", "id": invoice_id})
+            yield task
+
+    def record(
+        self, invoice_id: str, output_path: Path, error: Optional[str]
+    ) -> None:
+        """Записать результат генерации записи."""
+        if error is None:
+            self.completed[invoice_id] = output_path.name
+            self.errors.pop(invoice_id, None)
+            self._write(
+                {"event": "done", "id": invoice_id, "file": output_path.name}
+            )
+        else:
+            self.completed.pop(invoice_id, None)
+            self.errors[invoice_id] = error
+            self._write({"event": "failed", "id": invoice_id, "error": error})
+
+    def close(self) -> None:
+        """Закрыть журнал."""
+        self._file.close()
@@ -0,0 +1,240 @@
+"""Замеры времени этапов генерации (загрузка, рендеринг, верстка, запись).
+
+По умолчанию замеры выключены и stage() возвращает пустой контекстный
+менеджер, поэтому инструментирование почти ничего не стоит. Включаются
+замеры через enable():
+
+    from pdfgenerator.core import metrics
+
+    collected = metrics.enable()
+    collected.add_hook(lambda name, wall, cpu: print(name, wall))
+    ...
+    print(collected.report())
+"""
+
+import json
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Обработчик замера: (этап, время в секундах, процессорное время в секундах)
+Hook = Callable[[str, float, float], None]
+
+# Этапы в порядке конвейера (для отчета); прочие выводятся после них
+STAGES = (
+    "data.adapter",
+    "data.read",
+    "template.load",
+    "template.render",
+    "weasyprint.import",
+    "pdf.parse",
+    "asset.read",
+    "pdf.layout",
+    "pdf.write",
+    "file.write",
+)
+
+_NULL_CONTEXT = nullcontext()
+
+
+class StageStats:
+    """Накопленные замеры одного этапа."""
+
+    __slots__ = ("calls", "wall", "cpu", "bytes")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.bytes = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Представить замеры словарем."""
+        return {
+            "calls": self.calls,
+            "wall_seconds": self.wall,
+            "cpu_seconds": self.cpu,
+            "bytes": self.bytes,
+        }
+
+
+class Metrics:
+    """Сборщик замеров по этапам."""
+
+    def __init__(self) -> None:
+        self.stages: dict[str, StageStats] = {}
+        self._hooks: list[Hook] = []
+
+    def add_hook(self, hook: Hook) -> None:
+        """Добавить обработчик, вызываемый после каждого замера."""
+        self._hooks.append(hook)
+
+    def record(self, name: str, wall: float, cpu: float = 0.0) -> None:
+        """Добавить замер этапа."""
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        stats.calls += 1
+        stats.wall += wall
+        stats.cpu += cpu
+        for hook in self._hooks:
+            hook(name, wall, cpu)
+
+    def add_bytes(self, name: str, size: int) -> None:
+        """Учесть объем данных, обработанных этапом."""
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        stats.bytes += size
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Замерить время выполнения блока."""
+        wall_start = time.perf_counter()
+        # Время потока, а не процесса: замеры не смешиваются между потоками
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(
+                name,
+                time.perf_counter() - wall_start,
+                time.thread_time() - cpu_start,
+            )
+
+    def timed_iter(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Замерять время получения каждого элемента потока."""
+        iterator = iter(iterable)
+        while True:
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.record(
+                name,
+                time.perf_counter() - wall_start,
+                time.thread_time() - cpu_start,
+            )
+            yield item
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Получить замеры в виде словаря (для передачи между процессами)."""
+        return {name: stats.to_dict() for name, stats in self.stages.items()}
+
+    def merge(self, snapshot: dict[str, dict[str, Any]]) -> None:
+        """Добавить замеры, собранные в другом процессе."""
+        for name, values in snapshot.items():
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.calls += values["calls"]
+            stats.wall += values["wall_seconds"]
+            stats.cpu += values["cpu_seconds"]
+            stats.bytes += values["bytes"]
+
+    def reset(self) -> None:
+        """Сбросить накопленные замеры."""
+        self.stages.clear()
+
+    def _ordered(self) -> list[tuple[str, StageStats]]:
+        """Этапы в порядке конвейера."""
+        order = {name: index for index, name in enumerate(STAGES)}
+        return sorted(
+            self.stages.items(),
+            key=lambda item: (order.get(item[0], len(STAGES)), item[0]),
+        )
+
+    def report(self) -> str:
+        """Сформировать таблицу с разбивкой времени по этапам."""
+        total = sum(stats.wall for stats in self.stages.values())
+        lines = [
+            f"{'этап':<18} {'вызовов':>9} {'время, с':>10} {'доля':>7} "
+            f"{'среднее, мс':>12} {'CPU, с':>9}"
+        ]
+        for name, stats in self._ordered():
+            share = stats.wall / total * 100 if total > 0 else 0.0
+            average = stats.wall / stats.calls * 1000 if stats.calls else 0.0
+            lines.append(
+                f"{name:<18} {stats.calls:>9} {stats.wall:>10.3f} "
+                f"{share:>6.1f}% {average:>12.3f} {stats.cpu:>9.3f}"
+            )
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        """Представить замеры в формате JSON."""
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Представить замеры в текстовом формате Prometheus."""
+        metrics = (
+            ("calls", "calls_total", "Число вызовов этапа"),
+            ("wall", "seconds_total", "Время выполнения этапа"),
+            ("cpu", "cpu_seconds_total", "Процессорное время этапа"),
+            ("bytes", "bytes_total", "Объем данных этапа"),
+        )
+        lines = []
+        for attribute, suffix, description in metrics:
+            metric = f"pdfgen_stage_{suffix}"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, stats in self._ordered():
+                value = getattr(stats, attribute)
+                lines.append(f'{metric}{{stage="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: Path) -> None:
+        """Сохранить замеры в файл (.json - JSON, иначе Prometheus)."""
+        if path.suffix.lower() == ".json":
+            content = self.to_json()
+        else:
+            content = self.to_prometheus()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+# Активный сборщик замеров (None - замеры выключены)
+_active: Optional[Metrics] = None
+
+
+def enable(metrics: Optional[Metrics] = None) -> Metrics:
+    """Включить замеры и вернуть активный сборщик."""
+    global _active
+    _active = metrics or Metrics()
+    return _active
+
+
+def disable() -> None:
+    """Выключить замеры."""
+    global _active
+    _active = None
+
+
+def get_metrics() -> Optional[Metrics]:
+    """Получить активный сборщик замеров (None, если замеры выключены)."""
+    return _active
+
+
+def stage(name: str) -> ContextManager[None]:
+    """Замерить блок как этап name (если замеры включены)."""
+    if _active is None:
+        return _NULL_CONTEXT
+    return _active.timer(name)
+
+
+def timed_iter(name: str, iterable: Iterable[T]) -> Iterable[T]:
+    """Замерять получение элементов потока (если замеры включены)."""
+    if _active is None:
+        return iterable
+    return _active.timed_iter(name, iterable)
+
+
+def add_bytes(name: str, size: int) -> None:
+    """Учесть объем данных этапа (если замеры включены)."""
+    if _active is not None:
+        _active.add_bytes(name, size)
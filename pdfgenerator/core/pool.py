@@ -0,0 +1,241 @@
+"""Пул процессов для параллельной генерации PDF."""
+
+import os
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from ..templates import TemplateRenderer
+from . import metrics
+
+if TYPE_CHECKING:
+    from .generator import PDFGenerator
+
+# Задание: (запись, путь к шаблону, путь к выходному PDF, хеш содержимого
+# уже существующего PDF или None)
+RenderJob = tuple[Mapping[str, Any], str, str, Optional[str]]
+# Результат: (путь к выходному PDF, хеш содержимого, пропущен ли PDF
+# как актуальный, текст ошибки или None)
+RenderResult = tuple[str, Optional[str], bool, Optional[str]]
+# Замеры этапов, собранные воркером за пачку (None - замеры выключены)
+MetricsSnapshot = Optional[dict[str, dict[str, Any]]]
+
+# Состояние процесса-воркера (создается один раз в _init_worker)
+_worker_generator: Optional["PDFGenerator"] = None
+_worker_renderer: Optional[TemplateRenderer] = None
+
+
+def _init_worker(
+    generator_options: dict[str, Any], collect_metrics: bool = False
+) -> None:
+    """Инициализировать воркер: загрузить WeasyPrint и шрифты один раз."""
+    global _worker_generator, _worker_renderer
+
+    from .generator import PDFGenerator
+
+    if collect_metrics:
+        metrics.enable()
+
+    _worker_generator = PDFGenerator(**generator_options)
+    _worker_generator.warm_up()
+    _worker_renderer = TemplateRenderer()
+
+
+def _render_chunk(
+    jobs: list[RenderJob],
+) -> tuple[list[RenderResult], MetricsSnapshot]:
+    """Сгенерировать PDF для пачки заданий внутри воркера."""
+    assert _worker_generator is not None and _worker_renderer is not None
+
+    results: list[RenderResult] = []
+    for record, template_path, output_path, cached_digest in jobs:
+        try:
+            # Шаблон компилируется один раз на воркер (кеш по пути и mtime)
+            template = _worker_renderer.load(Path(template_path))
+            html_content = _worker_renderer.render(template, record)
+            digest = _worker_generator.fingerprint(html_content)
+            if digest == cached_digest and Path(output_path).exists():
+                results.append((output_path, digest, True, None))
+                continue
+            _worker_generator.generate(html_content, Path(output_path))
+            results.append((output_path, digest, False, None))
+        except Exception as e:
+            results.append((output_path, None, False, str(e)))
+
+    # Замеры воркера передаются вместе с результатами и обнуляются, чтобы
+    # родительский процесс получил каждый замер ровно один раз
+    collected = metrics.get_metrics()
+    if collected is None:
+        return results, None
+    snapshot = collected.snapshot()
+    collected.reset()
+    return results, snapshot
+
+
+def _render_one(
+    record: Mapping[str, Any],
+    template_path: str,
+    output_path: Optional[str],
+) -> Optional[bytes]:
+    """Сгенерировать один PDF внутри воркера.
+
+    Если output_path не задан, PDF возвращается в виде байтов.
+    """
+    assert _worker_generator is not None and _worker_renderer is not None
+
+    template = _worker_renderer.load(Path(template_path))
+    html_content = _worker_renderer.render(template, record)
+    if output_path is None:
+        return _worker_generator.generate_bytes(html_content)
+    _worker_generator.generate(html_content, Path(output_path))
+    return None
+
+
+def _render_html(html_content: str) -> bytes:
+    """Сгенерировать PDF из готового HTML внутри воркера."""
+    assert _worker_generator is not None
+    return _worker_generator.generate_bytes(html_content)
+
+
+def _ping() -> None:
+    """Пустое задание: заставляет пул запустить процесс-воркер."""
+
+
+def _chunked(jobs: Iterable[RenderJob], size: int) -> Iterator[list[RenderJob]]:
+    """Разбить поток заданий на пачки заданного размера."""
+    iterator = iter(jobs)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class RenderPool:
+    """Пул процессов с прогретыми экземплярами PDFGenerator."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        chunksize: int = 16,
+        max_pending: Optional[int] = None,
+        generator_options: Optional[dict[str, Any]] = None,
+        collect_metrics: Optional[bool] = None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = max(1, chunksize)
+        # Ограничиваем число пачек "в полете", чтобы не держать в памяти
+        # весь поток заданий
+        self.max_pending = max_pending or self.workers * 2
+        # Параметры PDFGenerator в воркерах
+        self.generator_options = generator_options or {}
+        # По умолчанию замеры в воркерах собираются, если они включены
+        # в текущем процессе
+        if collect_metrics is None:
+            collect_metrics = metrics.get_metrics() is not None
+        self.collect_metrics = collect_metrics
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Пул запускается (и перезапускается) из потоков сервера
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "RenderPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Получить (или запустить) пул процессов."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.generator_options, self.collect_metrics),
+                )
+            return self._executor
+
+    def recover(self) -> bool:
+        """Остановить пул, если один из его процессов упал.
+
+        После падения процесса (OOM, сбой в WeasyPrint) все задания пула
+        завершаются с BrokenProcessPool; следующее задание запустит новый
+        пул. Возвращает True, если пул был остановлен.
+        """
+        with self._lock:
+            executor = self._executor
+            if executor is None:
+                return False
+            try:
+                executor.submit(_ping)
+            except BrokenProcessPool:
+                executor.shutdown(wait=False)
+                self._executor = None
+                return True
+            return False
+
+    def warm_up(self) -> None:
+        """Запустить и прогреть все процессы пула заранее.
+
+        Без этого процессы запускаются по мере поступления заданий, и
+        первые задания ждут загрузки WeasyPrint.
+        """
+        executor = self._get_executor()
+        futures = [executor.submit(_ping) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def submit(
+        self,
+        record: Mapping[str, Any],
+        template_path: str,
+        output_path: Optional[str] = None,
+    ) -> "Future[Optional[bytes]]":
+        """Поставить в очередь генерацию одного PDF.
+
+        Результат future - байты PDF, если output_path не задан, иначе None
+        (PDF записан в output_path).
+        """
+        return self._get_executor().submit(
+            _render_one, record, template_path, output_path
+        )
+
+    def submit_html(self, html_content: str) -> "Future[bytes]":
+        """Поставить в очередь генерацию PDF из готового HTML."""
+        return self._get_executor().submit(_render_html, html_content)
+
+    def imap(self, jobs: Iterable[RenderJob]) -> Iterator[RenderResult]:
+        """Выполнить задания, возвращая результаты в исходном порядке."""
+        executor = self._get_executor()
+        pending: deque[Future[tuple[list[RenderResult], MetricsSnapshot]]] = (
+            deque()
+        )
+
+        for chunk in _chunked(jobs, self.chunksize):
+            pending.append(executor.submit(_render_chunk, chunk))
+            if len(pending) >= self.max_pending:
+                yield from self._collect(pending.popleft())
+
+        while pending:
+            yield from self._collect(pending.popleft())
+
+    def _collect(
+        self, future: "Future[tuple[list[RenderResult], MetricsSnapshot]]"
+    ) -> list[RenderResult]:
+        """Получить результаты пачки и добавить замеры воркера."""
+        results, snapshot = future.result()
+        collected = metrics.get_metrics()
+        if snapshot is not None and collected is not None:
+            collected.merge(snapshot)
+        return results
+
+    def close(self) -> None:
+        """Остановить пул процессов."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,168 @@
+"""Индекс файла данных для поиска счета по invoice ID без чтения файла.
+
+Индекс хранится рядом с файлом данных (.<имя файла>.pdfgen-index) в базе
+SQLite: invoice ID -> позиции строк счета (смещение в байтах для CSV и
+NDJSON, номер строки листа для XLSX, порядковый номер записи для прочих
+форматов). Индекс перестраивается, если изменились размер или время
+изменения файла.
+"""
+
+import os
+import sqlite3
+import tempfile
+from collections.abc import Collection, Iterator, Mapping
+from contextlib import closing
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from . import metrics
+from .invoices import INVOICE_KEYS, find_invoice_key, get_invoice_id
+
+if TYPE_CHECKING:
+    from ..adapters import DataAdapter
+
+INDEX_VERSION = 1
+# Сколько позиций записывать в базу за один раз при построении
+_BATCH_SIZE = 10_000
+
+
+def default_index_path(data_path: Path) -> Path:
+    """Получить путь к индексу файла данных."""
+    return data_path.with_name(f".{data_path.name}.pdfgen-index")
+
+
+class RecordIndex:
+    """Индекс invoice ID -> позиции строк в файле данных."""
+
+    def __init__(
+        self,
+        data_path: Path,
+        adapter: Optional["DataAdapter"] = None,
+        path: Optional[Path] = None,
+    ):
+        if adapter is None:
+            from ..adapters import get_adapter
+
+            adapter = get_adapter(data_path)
+        self.data_path = data_path
+        self.adapter = adapter
+        self.path = path or default_index_path(data_path)
+
+    def _signature(self) -> str:
+        """Отпечаток файла данных, при изменении которого индекс устарел."""
+        stat = self.data_path.stat()
+        return (
+            f"{INDEX_VERSION}:{type(self.adapter).__name__}:"
+            f"{stat.st_size}:{stat.st_mtime_ns}"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def _meta(self, connection: sqlite3.Connection) -> dict[str, str]:
+        return dict(connection.execute("SELECT key, value FROM meta"))
+
+    def is_fresh(self) -> bool:
+        """Проверить, что индекс есть и соответствует файлу данных."""
+        if not self.path.exists():
+            return False
+        try:
+            with closing(self._connect()) as connection:
+                meta = self._meta(connection)
+        except sqlite3.Error:
+            return False
+        return meta.get("signature") == self._signature()
+
+    def _iter_entries(self) -> Iterator[tuple[str, int]]:
+        """Получить пары (invoice ID, позиция) для всех строк файла."""
+        invoice_key: Optional[str] = None
+        # Для индекса из строк нужен только invoice ID
+        records = self.adapter.iter_positions(self.data_path, INVOICE_KEYS)
+        for index, (position, record) in enumerate(records):
+            if index == 0:
+                invoice_key = find_invoice_key([record])
+            yield get_invoice_id(record, invoice_key, index), position
+
+    def build(self) -> int:
+        """Построить индекс заново и вернуть число проиндексированных строк.
+
+        Индекс записывается во временный файл и атомарно заменяет старый.
+        """
+        signature = self._signature()
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=self.path.name, suffix=".tmp"
+        )
+        os.close(fd)
+        count = 0
+        try:
+            with metrics.stage("data.index"), closing(
+                sqlite3.connect(tmp_path)
+            ) as connection:
+                connection.execute("PRAGMA journal_mode = OFF")
+                connection.execute("PRAGMA synchronous = OFF")
+                connection.execute("CREATE TABLE meta (key TEXT, value TEXT)")
+                connection.execute(
+                    "CREATE TABLE positions "
+                    "(invoice_id TEXT NOT NULL, position INTEGER NOT NULL)"
+                )
+                batch: list[tuple[str, int]] = []
+                for entry in self._iter_entries():
+                    batch.append(entry)
+                    if len(batch) >= _BATCH_SIZE:
+                        connection.executemany(
+                            "INSERT INTO positions VALUES (?, ?)", batch
+                        )
+                        count += len(batch)
+                        batch.clear()
+                connection.executemany(
+                    "INSERT INTO positions VALUES (?, ?)", batch
+                )
+                count += len(batch)
+                # Индекс по invoice ID строится после вставки - так быстрее
+                connection.execute(
+                    "CREATE INDEX positions_invoice_id "
+                    "ON positions (invoice_id)"
+                )
+                connection.execute(
+                    "INSERT INTO meta VALUES ('signature', ?)", (signature,)
+                )
+                connection.commit()
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return count
+
+    def ensure(self) -> bool:
+        """Построить индекс, если его нет или он устарел (True - построен)."""
+        if self.is_fresh():
+            return False
+        self.build()
+        return True
+
+    def positions(self, invoice_id: str) -> list[int]:
+        """Получить позиции строк счета в файле данных."""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT position FROM positions WHERE invoice_id = ? "
+                "ORDER BY position",
+                (invoice_id,),
+            ).fetchall()
+        return [position for (position,) in rows]
+
+    def find(
+        self, invoice_id: str, fields: Optional[Collection[str]] = None
+    ) -> Optional[Mapping[str, Any]]:
+        """Прочитать счет по invoice ID (None, если его нет в файле).
+
+        Строки плоского формата (по строке на позицию) собираются в счет.
+        Индекс должен быть актуален (см. ensure).
+        """
+        from ..adapters import group_line_items
+
+        positions = self.positions(invoice_id)
+        if not positions:
+            return None
+        with metrics.stage("data.read"):
+            rows = self.adapter.read_at(self.data_path, positions, fields)
+        return next(iter(group_line_items(rows)), None)
@@ -0,0 +1,111 @@
+"""Кеш сгенерированных PDF на диске (манифест с хешами содержимого)."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+# Имя файла манифеста в директории с результатами
+MANIFEST_NAME = ".render_manifest.json"
+MANIFEST_VERSION = 1
+
+
+class RenderCache:
+    """Манифест: имя PDF файла -> хеш (HTML, стили, версия WeasyPrint).
+
+    Позволяет при повторном запуске пропускать записи, для которых PDF уже
+    сгенерирован из того же содержимого.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        name: str = MANIFEST_NAME,
+        save_every: int = 100,
+    ):
+        self.path = output_dir / name
+        self.save_every = save_every
+        self._entries: dict[str, str] = self._load()
+        self._unsaved = 0
+
+    def __enter__(self) -> "RenderCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.save()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> dict[str, str]:
+        """Прочитать манифест (поврежденный манифест игнорируется)."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != MANIFEST_VERSION
+        ):
+            return {}
+        entries = data.get("entries")
+        return dict(entries) if isinstance(entries, dict) else {}
+
+    def get(self, output_path: Path) -> Optional[str]:
+        """Получить сохраненный хеш для выходного файла."""
+        return self._entries.get(output_path.name)
+
+    def is_fresh(self, output_path: Path, digest: str) -> bool:
+        """Проверить, что PDF существует и сгенерирован из того же хеша."""
+        return self.get(output_path) == digest and output_path.exists()
+
+    def update(self, output_path: Path, digest: str) -> None:
+        """Запомнить хеш сгенерированного PDF."""
+        if self._entries.get(output_path.name) == digest:
+            return
+        self._entries[output_path.name] = digest
+        self._mark_dirty()
+
+    def discard(self, output_path: Path) -> None:
+        """Удалить запись о выходном файле (например, после ошибки)."""
+        if self._entries.pop(output_path.name, None) is not None:
+            self._mark_dirty()
+
+    def prune(self) -> int:
+        """Удалить записи о PDF, которых больше нет на диске."""
+        directory = self.path.parent
+        missing = [
+            name for name in self._entries if not (directory / name).exists()
+        ]
+        for name in missing:
+            del self._entries[name]
+        if missing:
+            self._mark_dirty()
+        return len(missing)
+
+    def _mark_dirty(self) -> None:
+        """Отметить изменение и периодически сохранять манифест."""
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
+
+    def save(self) -> None:
+        """Атомарно сохранить манифест (через временный файл и rename)."""
+        if not self._unsaved and self.path.exists():
+            return
+
+        data = {"version": MANIFEST_VERSION, "entries": self._entries}
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=self.path.name, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._unsaved = 0
@@ -0,0 +1,230 @@
+"""Разбиение пакетной генерации на шарды для нескольких машин.
+
+Запись попадает в шард K из N по стабильному хешу invoice ID, поэтому
+машины, запущенные с --shard 1/N ... N/N на одном файле данных, делят
+записи без координации. Каждый шард пишет свой манифест
+(.shard-K-of-N.json в директории результатов): незавершенный - в начале
+запуска и периодически по ходу генерации, завершенный - в конце. Поэтому
+упавший шард виден как незавершенный, а не как отсутствующий.
+merge_manifests проверяет, что каждая запись сгенерирована ровно одним
+шардом.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections.abc import Collection, Iterable
+from pathlib import Path
+from typing import Any, Optional
+
+MANIFEST_VERSION = 1
+# Манифесты шардов в директории результатов
+MANIFEST_GLOB = ".shard-*-of-*.json"
+
+# Шард: (номер с 1, число шардов)
+Shard = tuple[int, int]
+
+_SHARD_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+
+
+def parse_shard(text: str) -> Shard:
+    """Разобрать шард в виде "K/N" (K от 1 до N)."""
+    match = _SHARD_PATTERN.match(text)
+    if match is None:
+        raise ValueError(f"Шард должен быть в виде K/N: {text}")
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= count:
+        raise ValueError(f"Номер шарда должен быть от 1 до {count}: {text}")
+    return index, count
+
+
+def shard_of(invoice_id: str, count: int) -> int:
+    """Номер шарда (с 1) для invoice ID.
+
+    Хеш не зависит от процесса и платформы (в отличие от hash()), поэтому
+    все машины относят запись к одному шарду.
+    """
+    digest = hashlib.blake2b(invoice_id.encode("utf-8"), digest_size=8)
+    return int.from_bytes(digest.digest(), "big") % count + 1
+
+
+def manifest_name(shard: Shard) -> str:
+    """Имя манифеста шарда."""
+    index, count = shard
+    return f".shard-{index}-of-{count}.json"
+
+
+class ShardManifest:
+    """Манифест шарда: какие записи он сгенерировал и с каким результатом."""
+
+    def __init__(
+        self,
+        output_dir: Path,
+        shard: Shard,
+        data_path: Optional[Path] = None,
+        save_every: int = 100,
+    ):
+        self.path = output_dir / manifest_name(shard)
+        self.shard = shard
+        # Через сколько новых записей сохранять незавершенный манифест
+        self.save_every = save_every
+        self._unsaved = 0
+        self.data: dict[str, Any] = {}
+        if data_path is not None:
+            stat = data_path.stat()
+            # По файлу данных merge_manifests проверяет, что все шарды
+            # обработали одну и ту же версию файла
+            self.data = {
+                "name": data_path.name,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+        # invoice ID -> {"file": имя PDF, "digest": хеш, "error": текст}
+        self.records: dict[str, dict[str, Any]] = {}
+        self.complete = False
+
+    def add(
+        self,
+        invoice_id: str,
+        output_path: Path,
+        digest: Optional[str],
+        error: Optional[str],
+    ) -> None:
+        """Запомнить результат генерации записи."""
+        self.records[invoice_id] = {
+            "file": output_path.name,
+            "digest": digest,
+            "error": error,
+        }
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save(complete=False)
+
+    def save(self, complete: bool = True) -> None:
+        """Атомарно сохранить манифест (через временный файл и rename)."""
+        self.complete = complete
+        data = {
+            "version": MANIFEST_VERSION,
+            "shard": list(self.shard),
+            "data": self.data,
+            "complete": complete,
+            "records": self.records,
+        }
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=self.path.name, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._unsaved = 0
+
+    @classmethod
+    def load(cls, path: Path) -> "ShardManifest":
+        """Прочитать манифест шарда."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != MANIFEST_VERSION
+        ):
+            raise ValueError(f"Неподдерживаемый манифест шарда: {path.name}")
+        index, count = data["shard"]
+        manifest = cls(path.parent, (index, count))
+        manifest.path = path
+        manifest.data = dict(data.get("data") or {})
+        manifest.records = dict(data.get("records") or {})
+        manifest.complete = bool(data.get("complete"))
+        return manifest
+
+
+class MergeReport:
+    """Результат проверки манифестов шардов."""
+
+    def __init__(self) -> None:
+        # Запись -> шарды, которые ее сгенерировали
+        self.owners: dict[str, list[int]] = {}
+        self.failed: list[tuple[str, str]] = []
+        self.missing: list[str] = []
+        self.problems: list[str] = []
+
+    @property
+    def duplicates(self) -> dict[str, list[int]]:
+        """Записи, сгенерированные несколькими шардами."""
+        return {
+            invoice_id: shards
+            for invoice_id, shards in self.owners.items()
+            if len(shards) > 1
+        }
+
+    @property
+    def ok(self) -> bool:
+        """Каждая запись сгенерирована ровно одним шардом без ошибок."""
+        return not (
+            self.problems or self.failed or self.missing or self.duplicates
+        )
+
+
+def merge_manifests(
+    paths: Iterable[Path],
+    expected_ids: Optional[Collection[str]] = None,
+    count: Optional[int] = None,
+) -> MergeReport:
+    """Проверить манифесты шардов одного запуска.
+
+    Проверяется, что есть манифесты всех шардов 1..N, каждый шард
+    завершился, все шарды обработали один и тот же файл данных и каждая
+    запись сгенерирована ровно одним шардом без ошибок. Если задан
+    expected_ids (все invoice ID файла данных), проверяется и то, что
+    ни одна запись не пропущена. Если задан count (N), манифесты других
+    разбиений (например, оставшиеся от прошлых запусков) не учитываются.
+    """
+    report = MergeReport()
+    manifests = [ShardManifest.load(path) for path in paths]
+    if count is not None:
+        manifests = [
+            manifest for manifest in manifests if manifest.shard[1] == count
+        ]
+    if not manifests:
+        report.problems.append("не найдено ни одного манифеста шарда")
+        return report
+
+    counts = {manifest.shard[1] for manifest in manifests}
+    if len(counts) > 1:
+        report.problems.append(
+            f"манифесты разных разбиений: N = {sorted(counts)} "
+            "(укажите число шардов запуска)"
+        )
+    count = max(counts)
+    present = {manifest.shard[0] for manifest in manifests}
+    for index in range(1, count + 1):
+        if index not in present:
+            report.problems.append(f"нет манифеста шарда {index}/{count}")
+
+    data_files = {
+        json.dumps(manifest.data, sort_keys=True) for manifest in manifests
+    }
+    if len(data_files) > 1:
+        report.problems.append("шарды обработали разные версии файла данных")
+
+    for manifest in sorted(manifests, key=lambda m: m.shard):
+        index = manifest.shard[0]
+        if not manifest.complete:
+            report.problems.append(f"шард {index}/{count} не завершен")
+        for invoice_id, entry in manifest.records.items():
+            report.owners.setdefault(invoice_id, []).append(index)
+            if entry.get("error"):
+                report.failed.append((invoice_id, str(entry["error"])))
+
+    if expected_ids is not None:
+        report.missing = sorted(
+            invoice_id
+            for invoice_id in expected_ids
+            if invoice_id not in report.owners
+        )
+    return report
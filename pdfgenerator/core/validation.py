@@ -0,0 +1,122 @@
+"""Проверка сумм счетов (total, tax, grand_total) сразу по всем записям."""
+
+from collections.abc import Mapping, Sequence
+from typing import Any, Optional
+
+from .invoices import find_invoice_key, get_invoice_id
+
+# Поля записи, которые нужны для проверки сумм
+VALIDATION_FIELDS = frozenset(
+    {"total", "tax", "grand_total", "items", "item_name", "quantity", "price"}
+)
+
+
+def _as_floats(values: Sequence[Any]) -> Any:
+    """Преобразовать значения в массив float (нечисловые - NaN)."""
+    import numpy as np
+
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        return np.array([_to_float(value) for value in values], dtype=float)
+
+
+def _to_float(value: Any) -> float:
+    """Преобразовать значение в float (нечисловое - NaN)."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _column(records: Sequence[Mapping[str, Any]], key: str) -> Any:
+    """Получить значения поля всех записей массивом float."""
+    from ..adapters import ColumnarTable
+
+    # У столбцовой таблицы столбец берется целиком, без обхода строк
+    if isinstance(records, ColumnarTable):
+        if key in records.columns:
+            return _as_floats(records.column(key))
+        return _as_floats([None] * len(records))
+    return _as_floats([record.get(key) for record in records])
+
+
+def _items_sum(record: Mapping[str, Any]) -> Optional[float]:
+    """Сумма позиций счета (None, если позиций в записи нет)."""
+    from ..adapters import ItemColumns
+
+    items = record.get("items")
+    if isinstance(items, ItemColumns):
+        return float(items.totals().sum())
+    if isinstance(items, list):
+        return sum(
+            _to_float(item.get("quantity", 0)) * _to_float(item.get("price", 0))
+            for item in items
+        )
+    if "item_name" in record:
+        return _to_float(record.get("quantity", 0)) * _to_float(
+            record.get("price", 0)
+        )
+    return None
+
+
+def _items_sums(records: Sequence[Mapping[str, Any]]) -> Any:
+    """Суммы позиций всех счетов массивом float (нет позиций - NaN)."""
+    from ..adapters import ColumnarTable
+
+    if isinstance(records, ColumnarTable):
+        if "item_name" not in records.columns:
+            return _as_floats([None] * len(records))
+        # Несгруппированные строки-позиции: количество * цена по столбцам
+        if records.is_numeric("quantity") and records.is_numeric("price"):
+            return _column(records, "quantity") * _column(records, "price")
+    return _as_floats([_items_sum(record) for record in records])
+
+
+def validate_totals(
+    records: Sequence[Mapping[str, Any]], tolerance: float = 0.01
+) -> list[tuple[str, str]]:
+    """Проверить суммы всех счетов и вернуть ошибки (invoice ID, описание).
+
+    Проверяется, что total равен сумме позиций (количество * цена), а
+    grand_total - сумме total и tax, с точностью tolerance. Сравнение
+    выполняется одной операцией numpy по всем записям; отсутствующие поля
+    не проверяются.
+    """
+    import numpy as np
+
+    if not records:
+        return []
+
+    totals = _column(records, "total")
+    taxes = _column(records, "tax")
+    grand_totals = _column(records, "grand_total")
+    items_sums = _items_sums(records)
+
+    # Сравнения с NaN (нет поля) дают False, поэтому такие записи
+    # не попадают в ошибки
+    with np.errstate(invalid="ignore"):
+        bad_total = np.abs(totals - items_sums) > tolerance
+        bad_grand_total = np.abs(grand_totals - (totals + taxes)) > tolerance
+
+    invoice_key = find_invoice_key(records)
+    errors: list[tuple[str, str]] = []
+    for index in np.flatnonzero(bad_total | bad_grand_total).tolist():
+        invoice_id = get_invoice_id(records[index], invoice_key, index)
+        if bad_total[index]:
+            errors.append(
+                (
+                    invoice_id,
+                    f"total {totals[index]:.2f} не равен сумме позиций "
+                    f"{items_sums[index]:.2f}",
+                )
+            )
+        if bad_grand_total[index]:
+            errors.append(
+                (
+                    invoice_id,
+                    f"grand_total {grand_totals[index]:.2f} не равен "
+                    f"total + tax {totals[index] + taxes[index]:.2f}",
+                )
+            )
+    return errors
@@ -0,0 +1,396 @@
+"""Наблюдение за директорией данных и генерация PDF для новых записей.
+
+DataWatcher следит за файлами данных в FileManager.data_dir (через inotify
+на Linux, иначе периодическим опросом) и генерирует PDF только для новых
+и изменившихся записей. Состояние (размер и время изменения каждого
+файла, хеши его записей) хранится в output_dir/.watch_state.json, поэтому
+после перезапуска уже сгенерированные счета не генерируются заново.
+
+Файл обрабатывается, когда его размер и время изменения не менялись
+settle секунд: так не читаются файлы, которые еще записываются.
+"""
+
+import hashlib
+import json
+import os
+import select
+import sys
+import tempfile
+import time
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .batch import BatchRenderer, BatchStats
+from .invoices import find_invoice_key, get_invoice_id
+
+# Имя файла состояния в директории с результатами
+STATE_NAME = ".watch_state.json"
+STATE_VERSION = 1
+
+# События inotify, после которых директория просматривается заново
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+)
+
+# Как часто директория просматривается при работе через inotify (на случай
+# пропущенных событий, например на сетевых файловых системах)
+_RESCAN_SECONDS = 60.0
+
+# Отпечаток файла: (размер, время изменения в наносекундах)
+Signature = tuple[int, int]
+
+
+def _json_default(value: Any) -> Any:
+    """Представить для JSON значения, которые json не знает."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, Sequence) and not isinstance(value, str):
+        return list(value)
+    return str(value)
+
+
+def record_digest(record: Mapping[str, Any]) -> str:
+    """Хеш содержимого записи (с позициями счета)."""
+    payload = json.dumps(
+        record, default=_json_default, sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_signature(path: Path) -> Signature:
+    """Получить отпечаток файла."""
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+class WatchState:
+    """Состояние наблюдения: отпечатки файлов данных и хеши их записей."""
+
+    def __init__(self, output_dir: Path, name: str = STATE_NAME):
+        self.path = output_dir / name
+        self.template = ""
+        # Имя файла -> {"size", "mtime_ns", "records": {invoice ID: хеш}}
+        self.files: dict[str, dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Прочитать состояние (поврежденное состояние игнорируется)."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != STATE_VERSION:
+            return
+        files = data.get("files")
+        if isinstance(files, dict):
+            self.files = files
+        self.template = str(data.get("template", ""))
+
+    def reset(self, template: str) -> None:
+        """Забыть все файлы (например, после изменения шаблона)."""
+        self.template = template
+        self.files = {}
+
+    def signature(self, name: str) -> Optional[Signature]:
+        """Отпечаток файла на момент последней обработки."""
+        entry = self.files.get(name)
+        if entry is None:
+            return None
+        return entry["size"], entry["mtime_ns"]
+
+    def records(self, name: str) -> dict[str, str]:
+        """Хеши записей файла на момент последней обработки."""
+        entry = self.files.get(name)
+        return dict(entry["records"]) if entry is not None else {}
+
+    def update(
+        self, name: str, signature: Signature, records: dict[str, str]
+    ) -> None:
+        """Запомнить обработанный файл."""
+        size, mtime_ns = signature
+        self.files[name] = {
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "records": records,
+        }
+
+    def discard(self, name: str) -> None:
+        """Забыть удаленный файл."""
+        self.files.pop(name, None)
+
+    def save(self) -> None:
+        """Атомарно сохранить состояние (через временный файл и rename)."""
+        data = {
+            "version": STATE_VERSION,
+            "template": self.template,
+            "files": self.files,
+        }
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=self.path.name, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class _PollWaiter:
+    """Ожидание изменений периодическим опросом."""
+
+    name = "опрос"
+    idle_timeout: Optional[float] = None
+
+    def wait(self, timeout: float) -> None:
+        time.sleep(timeout)
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifyWaiter:
+    """Ожидание событий inotify в директории (Linux)."""
+
+    name = "inotify"
+    idle_timeout: Optional[float] = _RESCAN_SECONDS
+
+    def __init__(self, directory: Path):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        if libc.inotify_add_watch(fd, os.fsencode(directory), _IN_MASK) < 0:
+            os.close(fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch")
+        self._fd = fd
+
+    def wait(self, timeout: float) -> None:
+        """Дождаться событий в директории (не дольше timeout секунд)."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return
+        # Сами события не разбираются: после них директория
+        # просматривается заново
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def make_waiter(directory: Path, polling: bool = False) -> Any:
+    """Выбрать способ ожидания: inotify, если доступен, иначе опрос."""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return _InotifyWaiter(directory)
+        except (OSError, AttributeError):
+            pass
+    return _PollWaiter()
+
+
+class DataWatcher:
+    """Генерация PDF для новых и изменившихся записей в директории данных."""
+
+    def __init__(
+        self,
+        batch: BatchRenderer,
+        template_path: Path,
+        settle: float = 1.0,
+        interval: float = 1.0,
+        assume_sorted: bool = True,
+        workers: int = 1,
+        on_file: Optional[Callable[[Path, int, BatchStats], None]] = None,
+        on_error: Optional[Callable[[Path, Exception], None]] = None,
+    ):
+        self.batch = batch
+        self.file_manager = batch.file_manager
+        self.template_path = template_path
+        # Сколько секунд файл должен не меняться перед обработкой
+        self.settle = settle
+        # Период опроса директории (без inotify)
+        self.interval = interval
+        self.assume_sorted = assume_sorted
+        self.workers = workers
+        self.on_file = on_file
+        self.on_error = on_error
+        self.state = WatchState(self.file_manager.output_dir)
+        # Файлы, которые изменились, но еще не обработаны:
+        # имя -> (отпечаток, когда он последний раз изменился)
+        self._pending: dict[str, tuple[Signature, float]] = {}
+        # Файлы, которые не удалось обработать: повторная попытка - только
+        # после их изменения
+        self._failed: dict[str, Signature] = {}
+
+    def _template_signature(self) -> str:
+        """Отпечаток шаблона: при его изменении генерируется все заново."""
+        size, mtime_ns = file_signature(self.template_path)
+        return f"{self.template_path.resolve()}:{size}:{mtime_ns}"
+
+    def scan(self, force: bool = False) -> list[Path]:
+        """Просмотреть директорию и вернуть файлы, готовые к обработке.
+
+        С force=True изменившиеся файлы готовы сразу, без ожидания settle.
+        """
+        template = self._template_signature()
+        if template != self.state.template:
+            self.state.reset(template)
+            self._pending.clear()
+
+        now = time.monotonic()
+        seen = set()
+        ready: list[Path] = []
+        for path in self.file_manager.get_data_files():
+            name = path.name
+            seen.add(name)
+            try:
+                signature = file_signature(path)
+            except FileNotFoundError:
+                continue
+            if signature in (
+                self.state.signature(name),
+                self._failed.get(name),
+            ):
+                self._pending.pop(name, None)
+                continue
+            pending = self._pending.get(name)
+            if force:
+                ready.append(path)
+            elif pending is None or pending[0] != signature:
+                # Файл еще меняется: отсчет settle начинается заново
+                self._pending[name] = (signature, now)
+            elif now - pending[1] >= self.settle:
+                ready.append(path)
+
+        for name in [name for name in self.state.files if name not in seen]:
+            self.state.discard(name)
+        for name in [name for name in self._pending if name not in seen]:
+            del self._pending[name]
+        for name in [name for name in self._failed if name not in seen]:
+            del self._failed[name]
+        return ready
+
+    def process(self, path: Path) -> tuple[int, BatchStats]:
+        """Сгенерировать PDF для новых и изменившихся записей файла.
+
+        Возвращает число новых и изменившихся записей и статистику
+        генерации.
+        """
+        name = path.name
+        signature = file_signature(path)
+        template = self.batch.template_renderer.load(self.template_path)
+
+        def read_records() -> Iterator[Mapping[str, Any]]:
+            return self.file_manager.iter_data_file(
+                path,
+                assume_sorted=self.assume_sorted,
+                fields=template.required_fields,
+            )
+
+        # Первый проход потоком: хеши записей и изменившиеся invoice ID
+        previous = self.state.records(name)
+        digests: dict[str, str] = {}
+        changed: set[str] = set()
+        invoice_key = None
+        for index, record in enumerate(read_records()):
+            if index == 0:
+                invoice_key = find_invoice_key([record])
+            invoice_id = get_invoice_id(record, invoice_key, index)
+            digest = record_digest(record)
+            digests[invoice_id] = digest
+            if previous.get(invoice_id) != digest:
+                changed.add(invoice_id)
+
+        stats = BatchStats()
+        if changed:
+            # Второй проход генерирует только изменившиеся записи. Если файл
+            # изменился между проходами, его подпись уже другая, и он будет
+            # обработан еще раз
+            stats = self.batch.run(
+                read_records(),
+                self.template_path,
+                ids=changed,
+                workers=self.workers,
+            )
+            # Прерванный запуск: файл будет обработан заново после изменения
+            if stats.aborted is not None:
+                raise RuntimeError(stats.aborted)
+            # Записи с ошибкой генерации будут обработаны снова при
+            # следующем изменении файла
+            for invoice_id, _ in stats.errors:
+                digests.pop(invoice_id, None)
+
+        self.state.update(name, signature, digests)
+        self.state.save()
+        self._pending.pop(name, None)
+        return len(changed), stats
+
+    def _process_ready(self, ready: Iterable[Path]) -> None:
+        """Обработать готовые файлы, сообщая о результатах через on_file."""
+        for path in ready:
+            try:
+                signature = file_signature(path)
+            except FileNotFoundError:
+                # Файл удален после просмотра директории
+                self._pending.pop(path.name, None)
+                continue
+            try:
+                changed, stats = self.process(path)
+            except Exception as e:
+                # Ошибка в одном файле не останавливает наблюдение
+                self._pending.pop(path.name, None)
+                if not path.exists():
+                    continue  # файл удален во время обработки
+                self._failed[path.name] = signature
+                if self.on_error is not None:
+                    self.on_error(path, e)
+                continue
+            self._failed.pop(path.name, None)
+            if self.on_file is not None:
+                self.on_file(path, changed, stats)
+
+    def run_once(self) -> None:
+        """Обработать все новые и изменившиеся файлы без ожидания settle."""
+        self._process_ready(self.scan(force=True))
+        self.state.save()
+
+    def run(self, waiter: Optional[Any] = None) -> None:
+        """Следить за директорией данных до прерывания (Ctrl+C).
+
+        waiter - способ ожидания изменений (см. make_waiter).
+        """
+        if waiter is None:
+            waiter = make_waiter(self.file_manager.data_dir)
+        try:
+            while True:
+                self._process_ready(self.scan())
+                if self._pending:
+                    # Файлы, ждущие settle, проверяются чаще, чтобы
+                    # обработать их вовремя
+                    timeout = min(self.interval, self.settle / 2) or 0.1
+                else:
+                    timeout = waiter.idle_timeout or self.interval
+                waiter.wait(timeout)
+        finally:
+            waiter.close()
+            self.state.save()
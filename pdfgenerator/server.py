@@ -0,0 +1,423 @@
+"""Сервер генерации PDF с прогретыми процессами WeasyPrint.
+
+Сервер держит пул процессов, в каждом из которых WeasyPrint и шрифты
+загружены один раз, и принимает запросы по HTTP (TCP или Unix-сокет):
+
+    POST /render  {"template": "invoice_template.html", "record": {...}}
+        -> PDF (application/pdf)
+    POST /render  {"template": ..., "record": {...}, "output": "a.pdf"}
+        -> {"path": "<output_dir>/a.pdf"}
+    GET /health   -> {"status": "ok", "workers": 2, "in_flight": 0, ...}
+
+Число одновременно принятых запросов ограничено: сверх workers + queue_size
+сервер сразу отвечает 503 с заголовком Retry-After.
+
+Запущенную генерацию нельзя прервать: после таймаута (504) воркер
+доделывает задание, но PDF пишется во временный файл, который в этом
+случае удаляется, поэтому файл output после ответа 504 не появляется.
+Если процесс-воркер упал, запрос получает 500, а пул перезапускается.
+"""
+
+import http.client
+import json
+import os
+import secrets
+import socket
+import socketserver
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .core.pool import RenderPool
+
+# Максимальный размер тела запроса
+MAX_REQUEST_BYTES = 10 * 1024 * 1024
+# Через сколько секунд клиенту стоит повторить запрос при перегрузке
+RETRY_AFTER_SECONDS = 1
+
+
+class ServerBusyError(RuntimeError):
+    """Очередь запросов заполнена."""
+
+
+class RenderServerError(RuntimeError):
+    """Ошибка, которую вернул сервер генерации."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+
+
+def _resolve_inside(base_dir: Path, name: str) -> Path:
+    """Получить путь к файлу внутри директории (без выхода за ее пределы).
+
+    Сама директория (name "", "." и т.п.) файлом не считается.
+    """
+    base_dir = base_dir.resolve()
+    path = (base_dir / name).resolve()
+    if base_dir not in path.parents:
+        raise ValueError(f"Некорректный путь внутри {base_dir}: {name!r}")
+    return path
+
+
+def _discard(path: Path) -> None:
+    """Удалить временный файл (если он есть)."""
+    with suppress(FileNotFoundError):
+        path.unlink()
+
+
+class RenderService:
+    """Генерация PDF по запросам с ограничением очереди."""
+
+    def __init__(
+        self,
+        templates_dir: Path,
+        output_dir: Path,
+        workers: Optional[int] = None,
+        queue_size: int = 32,
+        timeout: float = 60.0,
+        generator_options: Optional[dict[str, Any]] = None,
+    ):
+        self.templates_dir = Path(templates_dir)
+        self.output_dir = Path(output_dir)
+        self.timeout = timeout
+        self.pool = RenderPool(
+            workers, generator_options=generator_options, collect_metrics=False
+        )
+        # Запросы сверх числа воркеров ждут в очереди пула, но не более
+        # queue_size штук
+        self.capacity = self.pool.workers + max(0, queue_size)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Запустить процессы пула и загрузить в них WeasyPrint."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.pool.warm_up()
+
+    def close(self) -> None:
+        """Остановить пул процессов."""
+        self.pool.close()
+
+    def health(self) -> dict[str, Any]:
+        """Состояние сервиса."""
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "status": "ok",
+            "workers": self.pool.workers,
+            "in_flight": in_flight,
+            "capacity": self.capacity,
+        }
+
+    def _release(self) -> None:
+        """Освободить место в очереди."""
+        with self._lock:
+            self._in_flight -= 1
+
+    def render(
+        self,
+        template_name: str,
+        record: dict[str, Any],
+        output: Optional[str] = None,
+    ) -> Union[bytes, Path]:
+        """Сгенерировать PDF: вернуть байты или путь к записанному файлу."""
+        template_path = _resolve_inside(self.templates_dir, template_name)
+        if not template_path.is_file():
+            raise FileNotFoundError(f"Шаблон не найден: {template_name}")
+        output_path = tmp_path = None
+        if output is not None:
+            output_path = _resolve_inside(self.output_dir, output)
+            if output_path.is_dir():
+                raise ValueError(f"Путь output - директория: {output!r}")
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            # Воркер пишет во временный файл: в output он переносится,
+            # только если генерация уложилась в таймаут
+            tmp_path = output_path.with_name(
+                f".{output_path.name}.{secrets.token_hex(4)}.render"
+            )
+
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise ServerBusyError("Сервер перегружен, повторите запрос")
+            self._in_flight += 1
+
+        try:
+            future = self.pool.submit(
+                record,
+                str(template_path),
+                str(tmp_path) if tmp_path is not None else None,
+            )
+        except BaseException as e:
+            self._release()
+            if isinstance(e, BrokenProcessPool):
+                self.pool.recover()
+            raise
+        # Место в очереди освобождается, когда воркер закончил задание,
+        # даже если клиент уже получил ответ о таймауте
+        future.add_done_callback(lambda _: self._release())
+
+        try:
+            pdf_bytes = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            if tmp_path is not None:
+                # PDF, дописанный после ответа клиенту, не нужен
+                future.add_done_callback(lambda _: _discard(tmp_path))
+            raise TimeoutError(
+                f"Генерация не завершилась за {self.timeout} с"
+            ) from None
+        except BrokenProcessPool:
+            # Следующие запросы получат новый пул процессов
+            self.pool.recover()
+            raise RuntimeError(
+                "процесс генерации завершился аварийно, пул перезапущен"
+            ) from None
+        except BaseException:
+            if tmp_path is not None:
+                _discard(tmp_path)
+            raise
+
+        if output_path is not None:
+            assert tmp_path is not None
+            os.replace(tmp_path, output_path)
+            return output_path
+        assert pdf_bytes is not None
+        return pdf_bytes
+
+
+class _RenderHandler(BaseHTTPRequestHandler):
+    """Обработчик HTTP запросов к RenderService."""
+
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> RenderService:
+        service: RenderService = getattr(self.server, "service")
+        return service
+
+    def address_string(self) -> str:
+        # Для Unix-сокета адрес клиента - не пара (host, port)
+        if isinstance(self.client_address, tuple):
+            return str(self.client_address[0])
+        return "unix"
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str,
+        headers: Optional[dict[str, str]] = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(
+        self,
+        status: int,
+        data: dict[str, Any],
+        headers: Optional[dict[str, str]] = None,
+    ) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self._send(status, body, "application/json; charset=utf-8", headers)
+
+    def _send_error(
+        self,
+        status: int,
+        message: str,
+        headers: Optional[dict[str, str]] = None,
+    ) -> None:
+        self._send_json(status, {"error": message}, headers)
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(200, self.service.health())
+        else:
+            self._send_error(404, f"Неизвестный путь: {self.path}")
+
+    def do_POST(self) -> None:
+        if self.path != "/render":
+            self._send_error(404, f"Неизвестный путь: {self.path}")
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # Длина тела неизвестна, поэтому соединение нельзя
+            # переиспользовать
+            self.close_connection = True
+            self._send_error(400, "Некорректный заголовок Content-Length")
+            return
+        if length > MAX_REQUEST_BYTES:
+            # Тело не читаем, поэтому соединение нельзя переиспользовать
+            self.close_connection = True
+            self._send_error(413, "Слишком большой запрос")
+            return
+
+        try:
+            request = json.loads(self.rfile.read(length) or b"null")
+            if not isinstance(request, dict):
+                raise ValueError("Ожидается JSON объект")
+            template_name = request["template"]
+            record = request["record"]
+            output = request.get("output")
+            if not isinstance(template_name, str):
+                raise ValueError("Поле template должно быть строкой")
+            if not isinstance(record, dict):
+                raise ValueError("Поле record должно быть JSON объектом")
+            if output is not None and not isinstance(output, str):
+                raise ValueError("Поле output должно быть строкой")
+            result = self.service.render(template_name, record, output)
+        except ServerBusyError as e:
+            self._send_error(
+                503, str(e), {"Retry-After": str(RETRY_AFTER_SECONDS)}
+            )
+        except KeyError as e:
+            self._send_error(400, f"Не указано поле {e}")
+        except ValueError as e:
+            self._send_error(400, str(e))
+        except FileNotFoundError as e:
+            self._send_error(404, str(e))
+        except TimeoutError as e:
+            self._send_error(504, str(e))
+        except Exception as e:
+            self._send_error(500, f"Ошибка при генерации PDF: {e}")
+        else:
+            if isinstance(result, Path):
+                self._send_json(200, {"path": str(result)})
+            else:
+                self._send(200, result, "application/pdf")
+
+
+class _TCPRenderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: RenderService):
+        super().__init__(address, _RenderHandler)
+        self.service = service
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+
+    class _UnixRenderServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, path: str, service: RenderService):
+            # Сокет от предыдущего запуска мешает bind
+            self.socket_path = Path(path)
+            self.socket_path.unlink(missing_ok=True)
+            super().__init__(path, _RenderHandler)
+            self.service = service
+
+        def server_close(self) -> None:
+            super().server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+
+def make_server(
+    service: RenderService,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    socket_path: Optional[str] = None,
+) -> socketserver.BaseServer:
+    """Создать HTTP сервер для сервиса (TCP или Unix-сокет)."""
+    if socket_path is None:
+        return _TCPRenderServer((host, port), service)
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        raise ValueError("Unix-сокеты не поддерживаются в этой системе")
+    return _UnixRenderServer(socket_path, service)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP соединение через Unix-сокет."""
+
+    def __init__(self, socket_path: str, timeout: Optional[float]):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class RenderClient:
+    """Клиент сервера генерации PDF."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        socket_path: Optional[str] = None,
+        timeout: Optional[float] = 120.0,
+    ):
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.socket_path is not None:
+            return _UnixHTTPConnection(self.socket_path, self.timeout)
+        return http.client.HTTPConnection(
+            self.host, self.port, timeout=self.timeout
+        )
+
+    def _request(
+        self, method: str, path: str, data: Optional[dict[str, Any]] = None
+    ) -> bytes:
+        """Выполнить запрос и вернуть тело ответа."""
+        connection = self._connect()
+        try:
+            body = (
+                json.dumps(data).encode("utf-8") if data is not None else None
+            )
+            headers = {"Content-Type": "application/json"} if body else {}
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            content = response.read()
+        finally:
+            connection.close()
+
+        if response.status != 200:
+            try:
+                message = json.loads(content)["error"]
+            except (ValueError, KeyError, TypeError):
+                message = content.decode("utf-8", "replace")
+            raise RenderServerError(response.status, message)
+        return content
+
+    def health(self) -> dict[str, Any]:
+        """Получить состояние сервера."""
+        content = self._request("GET", "/health")
+        health: dict[str, Any] = json.loads(content)
+        return health
+
+    def render(self, template: str, record: dict[str, Any]) -> bytes:
+        """Сгенерировать PDF и получить его байты."""
+        return self._request(
+            "POST", "/render", {"template": template, "record": record}
+        )
+
+    def render_to_file(
+        self, template: str, record: dict[str, Any], output: str
+    ) -> Path:
+        """Сгенерировать PDF в файл output (внутри директории сервера)."""
+        content = self._request(
+            "POST",
+            "/render",
+            {"template": template, "record": record, "output": output},
+        )
+        return Path(json.loads(content)["path"])
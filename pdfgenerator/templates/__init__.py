@@ -1,5 +1,5 @@
 """Модуль для работы с HTML шаблонами."""
 
-from .renderer import TemplateRenderer
+from .renderer import CompiledTemplate, TemplateRenderer
 
-__all__ = ["TemplateRenderer"]
+__all__ = ["CompiledTemplate", "TemplateRenderer"]
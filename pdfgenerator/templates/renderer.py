@@ -1,88 +1,231 @@
 """Рендерер для HTML шаблонов."""
 
 import re
-from typing import Any
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional, Union
 
+from ..core import metrics
 
-class TemplateRenderer:
-    """Класс для рендеринга HTML шаблонов с данными."""
+# Плейсхолдеры вида {key} или {key:format}
+# Игнорируем экранированные {{ и }}
+_PLACEHOLDER_PATTERN = re.compile(r"(?<!\{)\{([^}]+)\}(?!\})")
 
-    def render(self, template: str, data: dict[str, Any]) -> str:
-        """Подставить данные в HTML шаблон."""
-        # Обрабатываем items, если они есть
-        processed_data = data.copy()
-
-        # Если есть поле items (список словарей), конвертируем в HTML
-        if "items" in processed_data and isinstance(
-            processed_data["items"], list
-        ):
-            items_html = ""
-            for item in processed_data["items"]:
-                name = item.get("name", "")
-                quantity = item.get("quantity", 0)
-                price = item.get("price", 0.0)
-                item_total = quantity * price
-                items_html += (
-                    f"<tr><td>{name}</td><td>{quantity}</td>"
-                    f"<td>{price:.2f} ₽</td><td>{item_total:.2f} ₽</td></tr>\n"
+# Поля записи, из которых вычисляется items_html
+ITEMS_HTML_FIELDS = frozenset({"items", "item_name", "quantity", "price"})
+
+
+def _format_value(value: Any, format_spec: str) -> str:
+    """Отформатировать значение плейсхолдера."""
+    # Применяем форматирование, если указано
+    if format_spec:
+        try:
+            # Для чисел применяем форматирование
+            if isinstance(value, (int, float)):
+                return format(value, format_spec)
+            return format(str(value), format_spec)
+        except (ValueError, TypeError):
+            return str(value)
+
+    # Без форматирования
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def _item_row(name: Any, quantity: Any, price: float, total: float) -> str:
+    """Строка таблицы позиций счета."""
+    return (
+        f"<tr><td>{name}</td><td>{quantity}</td>"
+        f"<td>{price:.2f} ₽</td><td>{total:.2f} ₽</td></tr>\n"
+    )
+
+
+def _items_html(items: Sequence[Mapping[str, Any]]) -> str:
+    """Построить строки таблицы позиций одной склейкой списка строк.
+
+    Строки форматируются прямо в цикле (как в _item_row): на тысячах
+    позиций вызов функции на строку заметно дороже.
+    """
+    from ..adapters.columnar import ItemColumns
+
+    if isinstance(items, ItemColumns):
+        # Суммы позиций считаются одной операцией numpy; форматирование
+        # f-строками по спискам Python быстрее numpy.char.mod
+        quantities = [
+            int(quantity) if quantity.is_integer() else quantity
+            for quantity in items.quantities.tolist()
+        ]
+        return "".join(
+            [
+                f"<tr><td>{name}</td><td>{quantity}</td>"
+                f"<td>{price:.2f} ₽</td><td>{total:.2f} ₽</td></tr>\n"
+                for name, quantity, price, total in zip(
+                    items.names,
+                    quantities,
+                    items.prices.tolist(),
+                    items.totals().tolist(),
                 )
-            processed_data["items_html"] = items_html
-        # Если данные в плоском формате (CSV с item_name, quantity, price)
-        elif "item_name" in processed_data:
-            name = processed_data.get("item_name", "")
-            quantity = float(processed_data.get("quantity", 0))
-            price = float(processed_data.get("price", 0.0))
-            item_total = quantity * price
-            processed_data["items_html"] = (
-                f"<tr><td>{name}</td><td>{int(quantity)}</td><td>{price:.2f} ₽"
-                f"</td><td>{item_total:.2f} ₽</td></tr>\n"
-            )
+            ]
+        )
+
+    rows: list[str] = []
+    append = rows.append
+    for item in items:
+        quantity = item.get("quantity", 0)
+        # Нечисловое количество или цена - ошибка генерации этого счета
+        price = float(item.get("price", 0.0))
+        total = float(quantity) * price
+        append(
+            f"<tr><td>{item.get('name', '')}</td><td>{quantity}</td>"
+            f"<td>{price:.2f} ₽</td><td>{total:.2f} ₽</td></tr>\n"
+        )
+    return "".join(rows)
 
-        # Если items_html не был создан, создаем пустую строку
-        if "items_html" not in processed_data:
-            processed_data["items_html"] = (
-                "<tr><td colspan='4'>Нет данных</td></tr>"
-            )
 
-        # Используем безопасную замену через регулярные выражения
-        # Это позволяет избежать проблем с фигурными скобками в CSS
-        result = template
+class CompiledTemplate:
+    """Шаблон, заранее разобранный на литералы и плейсхолдеры."""
 
-        # Находим все плейсхолдеры вида {key} или {key:format} в шаблоне
-        # Игнорируем экранированные {{ и }}
-        placeholder_pattern = re.compile(r"(?<!\{)\{([^}]+)\}(?!\})")
+    __slots__ = ("parts", "slots")
 
-        def replace_placeholder(match):
-            placeholder = match.group(1)
+    def __init__(self, template: str):
+        # Литералы и места под значения плейсхолдеров (по умолчанию в них
+        # лежит исходный текст плейсхолдера)
+        self.parts: list[str] = []
+        # (индекс в parts, ключ, формат)
+        self.slots: list[tuple[int, str, str]] = []
+
+        position = 0
+        for match in _PLACEHOLDER_PATTERN.finditer(template):
+            self.parts.append(template[position : match.start()])
             # Разделяем ключ и формат (если есть)
-            if ":" in placeholder:
-                key, format_spec = placeholder.split(":", 1)
-            else:
-                key = placeholder
-                format_spec = None
-
-            if key in processed_data:
-                value = processed_data[key]
-                # Применяем форматирование, если указано
-                if format_spec:
-                    try:
-                        # Для чисел применяем форматирование
-                        if isinstance(value, (int, float)):
-                            formatted_value = format(value, format_spec)
-                        else:
-                            formatted_value = format(str(value), format_spec)
-                    except (ValueError, TypeError):
-                        formatted_value = str(value)
-                else:
-                    # Без форматирования
-                    if isinstance(value, float):
-                        formatted_value = f"{value:.2f}"
-                    else:
-                        formatted_value = str(value)
-                return formatted_value
+            key, _, format_spec = match.group(1).partition(":")
+            self.slots.append((len(self.parts), key, format_spec))
+            self.parts.append(match.group(0))
+            position = match.end()
+        self.parts.append(template[position:])
+
+    @property
+    def fields(self) -> frozenset[str]:
+        """Ключи плейсхолдеров, которые используются в шаблоне."""
+        return frozenset(key for _, key, _ in self.slots)
+
+    @property
+    def required_fields(self) -> frozenset[str]:
+        """Поля записи, нужные для рендеринга шаблона.
+
+        Вычисляемое поле items_html заменяется полями, из которых оно
+        строится (items или item_name, quantity, price).
+        """
+        fields = self.fields
+        if "items_html" in fields:
+            fields = fields | ITEMS_HTML_FIELDS
+        return fields
+
+    def render(
+        self,
+        data: Mapping[str, Any],
+        extra: Optional[Mapping[str, Any]] = None,
+    ) -> str:
+        """Подставить данные в шаблон.
+
+        Значения из extra имеют приоритет над data; запись при этом не
+        копируется, а из data читаются только ключи плейсхолдеров.
+        """
+        parts = self.parts.copy()
+        for index, key, format_spec in self.slots:
+            if extra is not None and key in extra:
+                value = extra[key]
+            elif key in data:
+                value = data[key]
             else:
                 # Если ключ не найден, оставляем плейсхолдер как есть
-                return match.group(0)
+                continue
+            parts[index] = _format_value(value, format_spec)
+        return "".join(parts)
+
+
+@lru_cache(maxsize=32)
+def _compile_string(template: str) -> CompiledTemplate:
+    """Скомпилировать шаблон, переданный строкой (с кешированием)."""
+    return CompiledTemplate(template)
+
+
+class TemplateRenderer:
+    """Класс для рендеринга HTML шаблонов с данными."""
+
+    def __init__(self, cache_size: int = 32):
+        self.cache_size = cache_size
+        # LRU кеш скомпилированных шаблонов: (путь, mtime) -> шаблон
+        self._cache: OrderedDict[tuple[str, int], CompiledTemplate] = (
+            OrderedDict()
+        )
+
+    def load(self, template_path: Path) -> CompiledTemplate:
+        """Загрузить и скомпилировать шаблон (с кешированием по mtime)."""
+        key = (str(template_path.resolve()), template_path.stat().st_mtime_ns)
+        compiled = self._cache.get(key)
+        if compiled is not None:
+            self._cache.move_to_end(key)
+            return compiled
+
+        with metrics.stage("template.load"):
+            compiled = CompiledTemplate(
+                template_path.read_text(encoding="utf-8")
+            )
+
+        self._cache[key] = compiled
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return compiled
+
+    def required_fields(
+        self, template: Union[str, CompiledTemplate]
+    ) -> frozenset[str]:
+        """Поля записи, которые использует шаблон (с учетом items_html)."""
+        if isinstance(template, str):
+            template = _compile_string(template)
+        return template.required_fields
+
+    def render(
+        self, template: Union[str, CompiledTemplate], data: Mapping[str, Any]
+    ) -> str:
+        """Подставить данные в HTML шаблон."""
+        with metrics.stage("template.render"):
+            return self._render(template, data)
+
+    def _render(
+        self, template: Union[str, CompiledTemplate], data: Mapping[str, Any]
+    ) -> str:
+        """Подставить данные в HTML шаблон (без замеров)."""
+        # Вычисляемые поля подставляются поверх записи, без ее копирования
+        extra: Optional[dict[str, Any]] = None
+
+        # Если есть поле items (список словарей или столбцы позиций),
+        # конвертируем в HTML
+        items = data.get("items")
+        if isinstance(items, Sequence) and not isinstance(items, str):
+            extra = {"items_html": _items_html(items)}
+        # Если данные в плоском формате (CSV с item_name, quantity, price)
+        elif "item_name" in data:
+            name = data.get("item_name", "")
+            quantity = float(data.get("quantity", 0))
+            price = float(data.get("price", 0.0))
+            extra = {
+                "items_html": _item_row(
+                    name, int(quantity), price, quantity * price
+                )
+            }
+
+        # Если items_html не был создан, создаем пустую строку
+        if extra is None and "items_html" not in data:
+            extra = {"items_html": "<tr><td colspan='4'>Нет данных</td></tr>"}
 
-        result = placeholder_pattern.sub(replace_placeholder, result)
-        return result
+        # Шаблон разбирается на литералы и плейсхолдеры один раз; это
+        # позволяет избежать проблем с фигурными скобками в CSS и не
+        # сканировать весь шаблон для каждой записи
+        if isinstance(template, str):
+            template = _compile_string(template)
+        return template.render(data, extra)
@@ -1,5 +1,6 @@
 """Модуль для пользовательского интерфейса."""
 
 from .menu import Menu
+from .picker import InvoiceIndex, InvoicePicker
 
-__all__ = ["Menu"]
+__all__ = ["InvoiceIndex", "InvoicePicker", "Menu"]
@@ -0,0 +1,169 @@
+"""Выбор счета в файлах с сотнями тысяч записей: поиск и постраничный вывод."""
+
+import sys
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from typing import Optional
+
+# Символ, который больше любого символа invoice ID (граница поиска по началу)
+_MAX_CHAR = "\U0010ffff"
+
+
+class InvoiceIndex:
+    """Индекс invoice ID: поиск по точному значению, началу и вхождению.
+
+    Поиск по значению и началу - двоичный поиск по отсортированному
+    списку ID; поиск по вхождению - str.find по склеенному тексту всех ID
+    (без учета регистра). Индекс строится один раз на файл данных.
+    Результаты - номера записей в файле.
+    """
+
+    def __init__(self, ids: Sequence[str]):
+        self.ids = list(ids)
+        order = sorted(range(len(self.ids)), key=self.ids.__getitem__)
+        self._sorted_ids = [self.ids[position] for position in order]
+        self._positions = order
+        # Текст для поиска по вхождению строится при первом таком поиске
+        self._text: Optional[str] = None
+        self._starts: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def exact(self, invoice_id: str) -> list[int]:
+        """Номера записей с этим invoice ID."""
+        start = bisect_left(self._sorted_ids, invoice_id)
+        end = bisect_right(self._sorted_ids, invoice_id, start)
+        return sorted(self._positions[start:end])
+
+    def prefix(self, text: str) -> list[int]:
+        """Номера записей, invoice ID которых начинается с text."""
+        start = bisect_left(self._sorted_ids, text)
+        end = bisect_left(self._sorted_ids, text + _MAX_CHAR, start)
+        return self._positions[start:end]
+
+    def substring(self, text: str) -> list[int]:
+        """Номера записей, invoice ID которых содержит text."""
+        if self._text is None:
+            self._build_text()
+        assert self._text is not None
+        needle = text.casefold()
+        if not needle:
+            return list(range(len(self.ids)))
+
+        result: list[int] = []
+        haystack, starts = self._text, self._starts
+        offset = haystack.find(needle)
+        while offset != -1:
+            position = bisect_right(starts, offset) - 1
+            result.append(position)
+            # Следующее вхождение ищется со следующего ID
+            next_start = (
+                starts[position + 1]
+                if position + 1 < len(starts)
+                else len(haystack)
+            )
+            offset = haystack.find(needle, next_start)
+        return result
+
+    def _build_text(self) -> None:
+        """Склеить все ID в один текст (по строке на запись)."""
+        folded = [
+            invoice_id.casefold().replace("\n", " ") for invoice_id in self.ids
+        ]
+        starts = []
+        offset = 0
+        for invoice_id in folded:
+            starts.append(offset)
+            offset += len(invoice_id) + 1
+        self._text = "\n".join(folded)
+        self._starts = starts
+
+    def search(self, text: str) -> list[int]:
+        """Найти записи: по точному ID, иначе по началу, иначе по вхождению."""
+        return self.exact(text) or self.prefix(text) or self.substring(text)
+
+
+class InvoicePicker:
+    """Выбор счета: поиск по invoice ID и постраничный вывод результатов.
+
+    Вместо вывода всех счетов пользователь вводит invoice ID, его начало
+    или часть; выводится только одна страница найденных счетов.
+    """
+
+    def __init__(self, ids: Sequence[str], page_size: int = 20):
+        self.index = InvoiceIndex(ids)
+        self.page_size = page_size
+        self._results: Sequence[int] = range(len(self.index))
+        self._page = 0
+
+    def _print_page(self) -> None:
+        """Вывести текущую страницу результатов."""
+        total = len(self._results)
+        if not total:
+            print("  Ничего не найдено")
+            return
+        start = self._page * self.page_size
+        end = min(start + self.page_size, total)
+        print(f"\n{'='*60}")
+        for number in range(start, end):
+            invoice_id = self.index.ids[self._results[number]]
+            print(f"  #{number + 1 - start}. ID: {invoice_id}")
+        print(f"{'='*60}")
+        print(f"  Найдено: {total}, показаны {start + 1}-{end}")
+
+    def _show(self, results: Sequence[int]) -> None:
+        """Показать первую страницу новых результатов."""
+        self._results = results
+        self._page = 0
+        self._print_page()
+
+    def _turn(self, step: int) -> None:
+        """Перейти на соседнюю страницу результатов."""
+        pages = max(1, -(-len(self._results) // self.page_size))
+        page = self._page + step
+        if 0 <= page < pages:
+            self._page = page
+            self._print_page()
+        else:
+            print("Больше страниц нет")
+
+    def pick(self, prompt: str = "Выберите invoice ID") -> Optional[int]:
+        """Выбрать счет и вернуть номер записи (None - выход)."""
+        print(
+            f"\nСчетов в файле: {len(self.index)}. Введите invoice ID, его "
+            "начало или часть; #N - выбрать из списка, Enter - следующая "
+            "страница, '-' - предыдущая, q - выход."
+        )
+        self._show(self._results)
+        while True:
+            try:
+                choice = input(f"{prompt}: ").strip()
+            except KeyboardInterrupt:
+                print("\n\nОперация отменена.")
+                sys.exit(0)
+
+            if choice.lower() == "q":
+                return None
+            if not choice:
+                self._turn(1)
+            elif choice == "-":
+                self._turn(-1)
+            elif choice.startswith("#"):
+                try:
+                    number = int(choice[1:]) - 1
+                except ValueError:
+                    print("Пожалуйста, введите номер из списка: #1, #2, ...")
+                    continue
+                position = self._page * self.page_size + number
+                if 0 <= number < self.page_size and position < len(
+                    self._results
+                ):
+                    return self._results[position]
+                print("Такого номера нет на странице")
+            else:
+                results = self.index.search(choice)
+                # Единственный найденный счет выбирается сразу
+                if len(results) == 1:
+                    return results[0]
+                self._show(results)